@@ -0,0 +1,233 @@
+"""
+Servidor HTTP/1.1 basado en un bucle de eventos asyncio.
+
+Un servidor con hilos dedica un hilo (y su pila) a cada conexión abierta. AsyncHTTPServer
+atiende todas las conexiones desde un único hilo con un bucle de eventos, así que una
+conexión inactiva sólo cuesta sus buffers. Está pensado para muchos clientes con
+conexiones persistentes que hacen peticiones de vez en cuando.
+
+La lógica de la aplicación es una función app(method, path, headers) que devuelve
+(código, Content-Type, cuerpo) o (código, Content-Type, cuerpo, cabeceras), la misma que
+usan los manejadores de http.server; las cabeceras de la petición llegan en un
+diccionario con los nombres en minúsculas. El servidor ofrece la misma interfaz que
+HTTPServer (serve_forever, shutdown, server_close, server_name, server_port), así que
+se puede usar en su lugar. Si la aplicación devuelve una CachedResponse, se envían
+directamente sus bytes ya codificados.
+
+Los cuerpos de las peticiones no se usan: se descartan por trozos, sin guardarlos
+enteros en memoria, y los mayores que max_body_size se rechazan con 413.
+"""
+
+from email.utils import formatdate
+from http import HTTPStatus
+import asyncio
+import socket
+import threading
+from response_cache import CachedResponse
+
+
+def build_response(code, content_type, body, headers=None, connection=None, include_body=True):
+    """
+    Construye la respuesta HTTP/1.1 completa en bytes; `connection` es el valor de la
+    cabecera Connection ("close", "keep-alive" o None para no enviarla)
+    """
+    head = (
+        f"HTTP/1.1 {code} {HTTPStatus(code).phrase}\r\n"
+        f"Date: {formatdate(usegmt=True)}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+    )
+    for name, value in (headers or {}).items():
+        head += f"{name}: {value}\r\n"
+    if connection:
+        head += f"Connection: {connection}\r\n"
+    head = (head + "\r\n").encode("latin-1")
+    return head + body if include_body else head
+
+
+class AsyncHTTPServer:
+    """
+    Servidor HTTP con un bucle de eventos asyncio y la interfaz de HTTPServer
+    """
+
+    # Segundos que se espera a la siguiente petición antes de cerrar la conexión
+    timeout = 5
+
+    # Número máximo de peticiones atendidas en una misma conexión
+    max_requests_per_connection = 100
+
+    # Tamaño máximo de la línea de petición más las cabeceras
+    max_header_size = 64 * 1024
+
+    # Tamaño máximo del cuerpo de una petición; los mayores se rechazan con 413
+    max_body_size = 1024 * 1024
+
+    # Bytes del cuerpo que se leen de cada vez al descartarlo
+    body_chunk_size = 64 * 1024
+
+    request_queue_size = 1024
+
+    def __init__(self, server_address, app, reuse_port=False):
+        self.app = app
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            self.socket.bind(server_address)
+            self.socket.listen(self.request_queue_size)
+        except OSError:
+            self.socket.close()
+            raise
+        self.socket.setblocking(False)
+        self.server_address = self.socket.getsockname()
+        host, port = self.server_address[:2]
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+
+        self._loop = None
+        self._stop = None
+        self._shutdown_request = False
+        self._writers = set()
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self):
+        """
+        Atiende peticiones hasta que se llama a shutdown()
+        """
+        self._is_shut_down.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._loop = None
+            self._shutdown_request = False
+            self._is_shut_down.set()
+
+    def shutdown(self):
+        """
+        Detiene serve_forever() y espera a que termine. Se llama desde otro hilo.
+        """
+        # Si el bucle todavía no ha arrancado, _serve() verá la marca y terminará enseguida
+        self._shutdown_request = True
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._stop.set)
+        self._is_shut_down.wait()
+
+    def server_close(self):
+        """
+        Cierra el socket de escucha
+        """
+        self.socket.close()
+
+    def connection_count(self):
+        """
+        Devuelve el número de conexiones abiertas
+        """
+        return len(self._writers)
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._shutdown_request:
+            self._stop.set()
+        server = await asyncio.start_server(
+            self._handle_connection, sock=self.socket.dup(), limit=self.max_header_size
+        )
+        async with server:
+            await self._stop.wait()
+            server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            handled = 0
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+                except asyncio.LimitOverrunError:
+                    writer.write(self._error(431))
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").lstrip("\r\n").split("\r\n")
+                parts = lines[0].split()
+                if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+                    writer.write(self._error(400))
+                    break
+                method, path, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                # Descarta el cuerpo para no confundirlo con la siguiente petición, por
+                # trozos para no guardarlo entero en memoria
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(self._error(400))
+                    break
+                if length > self.max_body_size:
+                    writer.write(self._error(413))
+                    break
+                if not await self._discard(reader, length):
+                    break
+
+                handled += 1
+                connection = headers.get("connection", "").lower()
+                if version == "HTTP/1.1":
+                    keep_alive = connection != "close"
+                else:
+                    keep_alive = connection == "keep-alive"
+                if handled >= self.max_requests_per_connection:
+                    keep_alive = False
+                # Como KeepAliveMixin: a HTTP/1.0 hay que confirmarle que la conexión sigue
+                if not keep_alive:
+                    connection = "close"
+                else:
+                    connection = "keep-alive" if version != "HTTP/1.1" else None
+
+                response = self.app(method, path, headers)
+                if isinstance(response, CachedResponse):
+                    writer.write(response.encode(connection=connection,
+                                                 include_body=method != "HEAD"))
+                else:
+                    code, content_type, body, *extra = response
+                    extra_headers = extra[0] if extra else None
+                    writer.write(build_response(code, content_type, body, extra_headers, connection,
+                                                include_body=method != "HEAD"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _discard(self, reader, length):
+        """
+        Lee y descarta `length` bytes del cuerpo; devuelve False si la conexión se corta
+        """
+        while length > 0:
+            try:
+                chunk = await asyncio.wait_for(reader.read(min(length, self.body_chunk_size)),
+                                               self.timeout)
+            except (asyncio.TimeoutError, ConnectionError):
+                return False
+            if not chunk:
+                return False
+            length -= len(chunk)
+        return True
+
+    def _error(self, code):
+        body = HTTPStatus(code).phrase.encode("utf-8")
+        return build_response(code, "text/plain; charset=utf-8", body, connection="close")
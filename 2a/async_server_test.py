@@ -0,0 +1,168 @@
+import pytest
+import threading
+import socket
+import requests
+import xml.etree.ElementTree as ET
+import ej2a2
+import ej2a3
+from async_server import AsyncHTTPServer
+
+
+def start(module):
+    server = module.create_server(host="localhost", port=0, backend="async")
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, thread
+
+
+@pytest.fixture
+def json_server():
+    """
+    Fixture para iniciar y detener el servidor asyncio de la API JSON
+    """
+    server, thread = start(ej2a2)
+    yield f"http://localhost:{server.server_port}", server
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+@pytest.fixture
+def xml_server():
+    """
+    Fixture para iniciar y detener el servidor asyncio de la API XML
+    """
+    server, thread = start(ej2a3)
+    yield f"http://localhost:{server.server_port}", server
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_create_server_async(json_server):
+    """
+    create_server devuelve el servidor asyncio con backend="async"
+    """
+    _, server = json_server
+    assert isinstance(server, AsyncHTTPServer)
+
+
+def test_unknown_backend():
+    """
+    Un backend desconocido debe lanzar ValueError
+    """
+    with pytest.raises(ValueError):
+        ej2a2.create_server(host="localhost", port=0, backend="fork")
+
+
+def test_json_product(json_server):
+    """
+    Las respuestas JSON son las mismas que con el servidor de hilos
+    """
+    url, _ = json_server
+    response = requests.get(url + "/product/1")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "name": "Laptop", "price": 999.99}
+
+    assert requests.get(url + "/product/999").status_code == 404
+    assert requests.get(url + "/invalid").status_code == 404
+
+
+def test_xml_product(xml_server):
+    """
+    Las respuestas XML son las mismas que con el servidor de hilos
+    """
+    url, _ = xml_server
+    response = requests.get(url + "/product/2")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/xml"
+    root = ET.fromstring(response.content)
+    assert root.find("name").text == "Smartphone"
+
+    response = requests.get(url + "/invalid")
+    assert response.status_code == 404
+    assert "<error>" in response.text
+
+
+def test_keep_alive_session(json_server):
+    """
+    Una sesión reutiliza la conexión entre peticiones
+    """
+    url, server = json_server
+    with requests.Session() as session:
+        for product_id in (1, 2, 3, 999):
+            session.get(f"{url}/product/{product_id}")
+        assert server.connection_count() == 1
+
+
+def test_method_not_allowed(json_server):
+    """
+    Los métodos que la ruta no admite devuelven 405 con la cabecera Allow
+    """
+    url, _ = json_server
+    response = requests.post(url + "/product/1")
+    assert response.status_code == 405
+    assert response.headers["Allow"] == "GET, HEAD"
+
+
+def test_many_idle_connections(json_server):
+    """
+    Cientos de conexiones inactivas no impiden atender nuevas peticiones
+    """
+    url, server = json_server
+    idle = [socket.create_connection(("localhost", server.server_port)) for _ in range(300)]
+    try:
+        response = requests.get(url + "/product/3", timeout=2)
+        assert response.status_code == 200
+        assert server.connection_count() >= 300
+    finally:
+        for sock in idle:
+            sock.close()
+
+
+def raw_request(server, request):
+    """
+    Envía una petición tal cual y devuelve la cabecera de la respuesta
+    """
+    with socket.create_connection(("localhost", server.server_port), timeout=2) as sock:
+        sock.sendall(request)
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            response += chunk
+    return response.split(b"\r\n\r\n")[0].decode("latin-1")
+
+
+def test_request_body_is_discarded(json_server):
+    """
+    El cuerpo de una petición se descarta y la siguiente petición de la conexión se atiende
+    """
+    url, _ = json_server
+    with requests.Session() as session:
+        response = session.post(url + "/product/1", data=b"x" * 200000)
+        assert response.status_code == 405
+        assert session.get(url + "/product/1").status_code == 200
+
+
+def test_large_body_is_rejected(json_server):
+    """
+    Un Content-Length mayor que max_body_size se rechaza con 413 sin leer el cuerpo
+    """
+    _, server = json_server
+    head = raw_request(server, b"POST /product/1 HTTP/1.1\r\nHost: x\r\n"
+                               b"Content-Length: 10000000000\r\n\r\n")
+    assert head.startswith("HTTP/1.1 413")
+    assert "Connection: close" in head
+
+
+def test_http10_keep_alive(json_server):
+    """
+    A un cliente HTTP/1.0 que pide keep-alive se le confirma con la cabecera Connection
+    """
+    _, server = json_server
+    head = raw_request(server, b"GET /product/1 HTTP/1.0\r\nConnection: keep-alive\r\n\r\n")
+    assert head.startswith("HTTP/1.1 200")
+    assert "Connection: keep-alive" in head
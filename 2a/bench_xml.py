@@ -0,0 +1,38 @@
+"""
+Benchmark de la serialización XML de productos.
+
+Compara el camino original (dict_to_xml + prettify) con to_xml en modo compacto y con
+sangría, y con la respuesta servida desde XMLCache.
+
+Uso:
+    python bench_xml.py [repeticiones]
+"""
+
+import sys
+import timeit
+from ej2a3 import dict_to_xml, prettify, products
+from xml_writer import XMLCache, to_xml
+
+
+def main(number=20000):
+    product = products[0]
+    cache = XMLCache("product")
+    cache.get(product)
+
+    cases = [
+        ("dict_to_xml + prettify", lambda: prettify(dict_to_xml("product", product))),
+        ("to_xml (sangría)", lambda: to_xml("product", product, "  ")),
+        ("to_xml (compacto)", lambda: to_xml("product", product)),
+        ("XMLCache.get", lambda: cache.get(product)),
+    ]
+
+    baseline = None
+    print(f"{'Método':<26}{'µs/petición':>14}{'mejora':>10}")
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+        baseline = baseline or seconds
+        print(f"{name:<26}{seconds * 1e6:>14.2f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
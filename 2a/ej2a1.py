@@ -13,9 +13,44 @@ Tu tarea es completar la implementación de la clase MyHTTPRequestHandler.
 Nota: Si deseas cambiar el idioma del ejercicio, edita el archivo de test correspondiente (ej2a1_test.py).
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
+import functools
+from keepalive import KeepAliveMixin
+from pool_server import enable_pool_reports, report_pool_usage
+from prefork import run_prefork
+from response_cache import CachedResponse
+from router import Router
+from serving import make_server
 
-class MyHTTPRequestHandler(BaseHTTPRequestHandler):
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+# Las dos respuestas son constantes: se codifican una vez y se envían con una sola escritura
+HELLO = CachedResponse(200, TEXT_CONTENT_TYPE, "¡Hola mundo!".encode("utf-8"))
+NOT_FOUND = CachedResponse(404, TEXT_CONTENT_TYPE, "Not Found".encode("utf-8"))
+
+router = Router()
+
+
+@router.route("/")
+def hello():
+    # 200 OK con el mensaje "¡Hola mundo!"
+    return HELLO
+
+
+@router.errorhandler(404)
+def not_found():
+    # 404 Not Found
+    return NOT_FOUND
+
+
+def hello_response(method, path, headers=None):
+    """
+    Resuelve una petición y devuelve la respuesta como (código, Content-Type, cuerpo[, cabeceras])
+    """
+    return router.dispatch(method, path)
+
+
+class MyHTTPRequestHandler(KeepAliveMixin, BaseHTTPRequestHandler):
     """
     Manejador de peticiones HTTP personalizado
     """
@@ -28,42 +63,51 @@ class MyHTTPRequestHandler(BaseHTTPRequestHandler):
 
         Para otras rutas, devuelve un código de estado 404 (Not Found).
         """
-        # Implementa aquí la lógica para responder a las peticiones GET
-        # 1. Verifica la ruta solicitada (self.path)
-        # 2. Si la ruta es "/", envía una respuesta 200 con el mensaje "¡Hola mundo!"
-        # 3. Si la ruta es cualquier otra, envía una respuesta 404
-        if self.path == "/":
-            # 200 OK
-            self.send_response(200)
-            self.send_header("Content-Type", "text/plain; charset=utf-8")
-            self.end_headers()
-
-            mensaje = "¡Hola mundo!"
-            self.wfile.write(mensaje.encode("utf-8"))
-        else:
-            # 404 Not Found
-            self.send_response(404)
-            self.send_header("Content-Type", "text/plain; charset=utf-8")
-            self.end_headers()
-
-            mensaje = "Not Found"
-            self.wfile.write(mensaje.encode("utf-8"))
-
-
-def create_server(host="localhost", port=8000):
+        self.send_app_response(hello_response(self.command, self.path, self.headers))
+
+    # El enrutador decide qué métodos admite cada ruta y responde 405 a los demás
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+
+def create_server(host="localhost", port=8000, workers=0, queue_size=64, backend="thread",
+                  reuse_port=False):
     """
     Crea y configura el servidor HTTP
+
+    Con workers=0 las peticiones se atienden de una en una. Con workers > 0 se usa
+    un grupo de `workers` hilos y una cola de hasta `queue_size` conexiones pendientes.
+    Las conexiones persistentes (HTTP/1.1) sólo se mantienen con workers > 0: con un
+    único hilo, una conexión abierta bloquearía al resto de clientes.
+
+    Con backend="async" se devuelve un AsyncHTTPServer: un único hilo con un bucle de
+    eventos asyncio, pensado para mantener miles de conexiones abiertas a la vez.
     """
     server_address = (host, port)
-    httpd = HTTPServer(server_address, MyHTTPRequestHandler)
-    return httpd
+    return make_server(server_address, MyHTTPRequestHandler, hello_response, workers=workers,
+                       queue_size=queue_size, backend=backend, reuse_port=reuse_port)
 
 def run_server(server):
     """
     Inicia el servidor HTTP
     """
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    enable_pool_reports(server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_pool_usage(server)
+        server.server_close()
+
+def run_server_prefork(processes=None, reuse_port=False, **options):
+    """
+    Inicia el servidor en varios procesos que comparten el puerto
+
+    Las opciones se pasan a create_server. Por defecto se crea un proceso por núcleo.
+    """
+    factory = functools.partial(create_server, **options)
+    run_prefork(factory, processes=processes, reuse_port=reuse_port)
 
 if __name__ == '__main__':
     server = create_server()
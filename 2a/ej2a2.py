@@ -18,9 +18,16 @@ Ejemplo:
 2. Una solicitud `GET /product/999` debe devolver un mensaje de error con código 404.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
 import json
-import re
+import functools
+from keepalive import KeepAliveMixin
+from pool_server import enable_pool_reports, report_pool_usage
+from prefork import run_prefork
+from product_store import ProductStore
+from response_cache import CachedResponse
+from router import Router
+from serving import make_server
 
 # Lista de productos predefinida
 products = [
@@ -29,8 +36,60 @@ products = [
     {"id": 3, "name": "Tablet", "price": 349.99}
 ]
 
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
 
-class ProductAPIHandler(BaseHTTPRequestHandler):
+
+def encode_json(product):
+    return json.dumps(product).encode("utf-8")
+
+
+# Productos indexados por id, con el JSON de cada uno generado una sola vez
+store = ProductStore(products, encoders={"json": encode_json})
+
+# Las respuestas de error no cambian: se codifican una vez y se envían con una sola escritura
+PRODUCT_NOT_FOUND = CachedResponse(404, JSON_CONTENT_TYPE, encode_json({"error": "Product not found"}))
+NOT_FOUND = CachedResponse(404, JSON_CONTENT_TYPE, encode_json({"error": "Not found"}))
+METHOD_NOT_ALLOWED = CachedResponse(405, JSON_CONTENT_TYPE, encode_json({"error": "Method not allowed"}))
+
+router = Router()
+
+
+@router.route("/product/<int:product_id>")
+def get_product(product_id):
+    """
+    Devuelve el producto en JSON con código 200, o un error 404 si no existe
+    """
+    # Buscar el producto por id (O(1)) y obtener su JSON ya serializado
+    body = store.body(product_id, "json")
+
+    if body is not None:
+        # Producto encontrado -> 200 + JSON
+        return 200, JSON_CONTENT_TYPE, body
+
+    # Producto no encontrado -> 404 + JSON de error
+    return PRODUCT_NOT_FOUND
+
+
+@router.errorhandler(404)
+def not_found():
+    # Ruta no válida -> 404
+    return NOT_FOUND
+
+
+@router.errorhandler(405)
+def method_not_allowed():
+    return METHOD_NOT_ALLOWED
+
+
+def product_response(method, path, headers=None):
+    """
+    Resuelve una petición y devuelve la respuesta como (código, Content-Type, cuerpo[, cabeceras]).
+    No depende del servidor, así que la usan tanto ProductAPIHandler como AsyncHTTPServer.
+    """
+    return router.dispatch(method, path)
+
+
+class ProductAPIHandler(KeepAliveMixin, BaseHTTPRequestHandler):
     """
     Manejador de peticiones HTTP para la API de productos
     """
@@ -41,58 +100,50 @@ class ProductAPIHandler(BaseHTTPRequestHandler):
         Debes implementar la lógica para responder a la petición GET en la ruta /product/<id>
         con los datos del producto en formato JSON si existe, o un error 404 si no existe.
         """
-        # Implementa aquí la lógica para responder a las peticiones GET
-        # 1. Usa una expresión regular para verificar si la ruta coincide con /product/<id>
-        # 2. Si coincide, extrae el ID del producto de la ruta
-        # 3. Busca el producto en la lista
-        # 4. Si el producto existe, devuélvelo en formato JSON con código 200
-        # 5. Si el producto no existe, devuelve un mensaje de error con código 404
-        # 1. Comprobar si la ruta encaja con /product/<id>
-        match = re.match(r"^/product/(\d+)$", self.path)
-        
-        if not match:
-            # Ruta no válida -> 404
-            self.send_response(404)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.end_headers()
-            body = {"error": "Not found"}
-            self.wfile.write(json.dumps(body).encode("utf-8"))
-            return
-
-        # 2. Extraer el id del producto
-        product_id = int(match.group(1))
-
-        # 3. Buscar el producto en la lista
-        product = next((p for p in products if p["id"] == product_id), None)
-
-        if product is not None:
-            # 4. Producto encontrado -> 200 + JSON
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.end_headers()
-            self.wfile.write(json.dumps(product).encode("utf-8"))
-        else:
-            # 5. Producto no encontrado -> 404 + JSON de error
-            self.send_response(404)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.end_headers()
-            body = {"error": "Product not found"}
-            self.wfile.write(json.dumps(body).encode("utf-8"))
-
-def create_server(host="localhost", port=8000):
+        self.send_app_response(product_response(self.command, self.path, self.headers))
+
+    # El enrutador decide qué métodos admite cada ruta y responde 405 a los demás
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+def create_server(host="localhost", port=8000, workers=0, queue_size=64, backend="thread",
+                  reuse_port=False):
     """
     Crea y configura el servidor HTTP
+
+    Con workers=0 las peticiones se atienden de una en una. Con workers > 0 se usa
+    un grupo de `workers` hilos y una cola de hasta `queue_size` conexiones pendientes.
+    Las conexiones persistentes (HTTP/1.1) sólo se mantienen con workers > 0: con un
+    único hilo, una conexión abierta bloquearía al resto de clientes.
+
+    Con backend="async" se devuelve un AsyncHTTPServer: un único hilo con un bucle de
+    eventos asyncio, pensado para mantener miles de conexiones abiertas a la vez.
     """
     server_address = (host, port)
-    httpd = HTTPServer(server_address, ProductAPIHandler)
-    return httpd
+    return make_server(server_address, ProductAPIHandler, product_response, workers=workers, queue_size=queue_size,
+                       backend=backend, reuse_port=reuse_port)
 
 def run_server(server):
     """
     Inicia el servidor HTTP
     """
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    enable_pool_reports(server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_pool_usage(server)
+        server.server_close()
+
+def run_server_prefork(processes=None, reuse_port=False, **options):
+    """
+    Inicia el servidor en varios procesos que comparten el puerto
+
+    Las opciones se pasan a create_server. Por defecto se crea un proceso por núcleo.
+    """
+    factory = functools.partial(create_server, **options)
+    run_prefork(factory, processes=processes, reuse_port=reuse_port)
 
 if __name__ == '__main__':
     server = create_server()
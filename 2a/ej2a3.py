@@ -18,10 +18,17 @@ Ejemplo:
 2. Una solicitud `GET /product/999` debe devolver un mensaje de error con código 404.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import re
+from http.server import BaseHTTPRequestHandler
+import functools
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
+from keepalive import KeepAliveMixin
+from pool_server import enable_pool_reports, report_pool_usage
+from prefork import run_prefork
+from response_cache import CachedResponse
+from router import Router
+from serving import make_server
+from xml_writer import XMLCache, to_xml
 
 # Lista de productos predefinida
 products = [
@@ -30,6 +37,8 @@ products = [
     {"id": 3, "name": "Tablet", "price": 349.99}
 ]
 
+XML_CONTENT_TYPE = "application/xml"
+
 def dict_to_xml(tag, d):
     """
     Convierte un diccionario en un elemento XML
@@ -48,7 +57,61 @@ def prettify(elem):
     reparsed = minidom.parseString(rough_string)
     return reparsed.toprettyxml(indent="  ").encode()
 
-class ProductAPIHandler(BaseHTTPRequestHandler):
+# Sangría de las respuestas XML: None para XML compacto, "  " para el formato de prettify
+XML_INDENT = None
+
+# Bytes XML de cada producto, generados la primera vez que se piden
+product_xml = XMLCache("product", indent=XML_INDENT)
+
+# Las respuestas de error no cambian, así que se generan una sola vez
+NOT_FOUND_XML = to_xml("error", {"message": "Not found"}, XML_INDENT)
+PRODUCT_NOT_FOUND_XML = to_xml("error", {"message": "Product not found"}, XML_INDENT)
+METHOD_NOT_ALLOWED_XML = to_xml("error", {"message": "Method not allowed"}, XML_INDENT)
+
+# Respuestas completas de error, codificadas una vez y enviadas con una sola escritura
+NOT_FOUND = CachedResponse(404, XML_CONTENT_TYPE, NOT_FOUND_XML)
+PRODUCT_NOT_FOUND = CachedResponse(404, XML_CONTENT_TYPE, PRODUCT_NOT_FOUND_XML)
+METHOD_NOT_ALLOWED = CachedResponse(405, XML_CONTENT_TYPE, METHOD_NOT_ALLOWED_XML)
+
+router = Router()
+
+
+@router.route("/product/<int:product_id>")
+def get_product(product_id):
+    """
+    Devuelve el producto en XML con código 200, o un error 404 si no existe
+    """
+    # Buscar el producto en la lista
+    product = next((p for p in products if p["id"] == product_id), None)
+
+    if product is not None:
+        # Producto encontrado -> 200 + XML
+        return 200, XML_CONTENT_TYPE, product_xml.get(product)
+
+    # Producto no encontrado -> 404 + XML de error
+    return PRODUCT_NOT_FOUND
+
+
+@router.errorhandler(404)
+def not_found():
+    # Ruta no válida -> 404
+    return NOT_FOUND
+
+
+@router.errorhandler(405)
+def method_not_allowed():
+    return METHOD_NOT_ALLOWED
+
+
+def product_response(method, path, headers=None):
+    """
+    Resuelve una petición y devuelve la respuesta como (código, Content-Type, cuerpo[, cabeceras]).
+    No depende del servidor, así que la usan tanto ProductAPIHandler como AsyncHTTPServer.
+    """
+    return router.dispatch(method, path)
+
+
+class ProductAPIHandler(KeepAliveMixin, BaseHTTPRequestHandler):
     """
     Manejador de peticiones HTTP para la API de productos en XML
     """
@@ -59,61 +122,50 @@ class ProductAPIHandler(BaseHTTPRequestHandler):
         Debes implementar la lógica para responder a la petición GET en la ruta /product/<id>
         con los datos del producto en formato XML si existe, o un error 404 si no existe.
         """
-        # Implementa aquí la lógica para responder a las peticiones GET
-        # 1. Usa una expresión regular para verificar si la ruta coincide con /product/<id>
-        # 2. Si coincide, extrae el ID del producto de la ruta
-        # 3. Busca el producto en la lista
-        # 4. Si el producto existe:
-        #    a. Convierte el producto a XML usando dict_to_xml y prettify
-        #    b. Devuelve el XML con código 200 y Content-Type application/xml
-        # 5. Si el producto no existe, devuelve un mensaje de error XML con código 404
-        match = re.match(r"^/product/(\d+)$", self.path)
-        
-        if not match:
-            # Ruta no válida -> 404
-            self.send_response(404)
-            self.send_header("Content-Type", "application/xml; charset=utf-8")
-            self.end_headers()
-            error_elem = dict_to_xml("error", {"message": "Not found"})
-            self.wfile.write(prettify(error_elem))
-
-        # 2. Extraer el id del producto
-        product_id = int(match.group(1))
-
-        # 3. Buscar el producto en la lista
-        product = next((p for p in products if p["id"] == product_id), None)
-
-        if product is not None:
-            # 4. Producto encontrado -> 200 + JSON
-            self.send_response(200)
-            self.send_header("Content-Type", "application/xml; charset=utf-8")
-            self.end_headers()
-            
-            product_elem = dict_to_xml("product", product)
-            self.wfile.write(prettify(product_elem))
-        else:
-            # 5. Producto no encontrado -> 404 + JSON de error
-            self.send_response(404)
-            self.send_header("Content-Type", "application/xml; charset=utf-8")
-            self.end_headers()
-            
-            error_elem = dict_to_xml("error", {"message": "Product not found"})
-            self.wfile.write(prettify(error_elem))
-
-def create_server(host="localhost", port=8000):
+        self.send_app_response(product_response(self.command, self.path, self.headers))
+
+    # El enrutador decide qué métodos admite cada ruta y responde 405 a los demás
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+def create_server(host="localhost", port=8000, workers=0, queue_size=64, backend="thread",
+                  reuse_port=False):
     """
     Crea y configura el servidor HTTP
+
+    Con workers=0 las peticiones se atienden de una en una. Con workers > 0 se usa
+    un grupo de `workers` hilos y una cola de hasta `queue_size` conexiones pendientes.
+    Las conexiones persistentes (HTTP/1.1) sólo se mantienen con workers > 0: con un
+    único hilo, una conexión abierta bloquearía al resto de clientes.
+
+    Con backend="async" se devuelve un AsyncHTTPServer: un único hilo con un bucle de
+    eventos asyncio, pensado para mantener miles de conexiones abiertas a la vez.
     """
     server_address = (host, port)
-    httpd = HTTPServer(server_address, ProductAPIHandler)
-    return httpd
+    return make_server(server_address, ProductAPIHandler, product_response, workers=workers, queue_size=queue_size,
+                       backend=backend, reuse_port=reuse_port)
 
 def run_server(server):
     """
     Inicia el servidor HTTP
     """
     print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
-    server.serve_forever()
+    enable_pool_reports(server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_pool_usage(server)
+        server.server_close()
+
+def run_server_prefork(processes=None, reuse_port=False, **options):
+    """
+    Inicia el servidor en varios procesos que comparten el puerto
+
+    Las opciones se pasan a create_server. Por defecto se crea un proceso por núcleo.
+    """
+    factory = functools.partial(create_server, **options)
+    run_prefork(factory, processes=processes, reuse_port=reuse_port)
 
 if __name__ == '__main__':
     server = create_server()
@@ -0,0 +1,129 @@
+"""
+Conexiones persistentes HTTP/1.1 para los manejadores basados en http.server.
+
+Por defecto BaseHTTPRequestHandler habla HTTP/1.0 y cierra la conexión después de cada
+respuesta, así que cada petición paga una conexión TCP nueva. KeepAliveMixin activa
+HTTP/1.1, envía siempre Content-Length para que el cliente sepa dónde termina cada
+respuesta, cierra las conexiones inactivas y limita las peticiones por conexión.
+
+Las peticiones encadenadas (pipelining) se atienden en orden: el socket se lee con
+buffer, así que las peticiones que llegan juntas se procesan una detrás de otra, y
+cada respuesta se envía con una sola escritura.
+
+Las respuestas constantes (CachedResponse) se envían con los bytes que ya tienen
+codificados en lugar de construirlas cabecera a cabecera; ver response_cache.
+
+Las conexiones sólo se mantienen abiertas si el servidor atiende varias a la vez
+(PooledHTTPServer o ThreadingHTTPServer). Con HTTPServer hay un único hilo, y un cliente
+que deja su conexión abierta bloquearía a todos los demás hasta que venciera el timeout.
+"""
+
+from socketserver import ThreadingMixIn
+from response_cache import CachedResponse
+
+
+class KeepAliveMixin:
+    """
+    Mixin para BaseHTTPRequestHandler que mantiene abiertas las conexiones
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    # Segundos que se espera a la siguiente petición antes de cerrar la conexión
+    timeout = 5
+
+    # Número máximo de peticiones atendidas en una misma conexión
+    max_requests_per_connection = 100
+
+    # La respuesta completa (cabeceras y cuerpo) se acumula y se envía de una vez
+    wbufsize = 64 * 1024
+
+    def setup(self):
+        super().setup()
+        self.requests_handled = 0
+
+    def handle_one_request(self):
+        self.requests_handled += 1
+        super().handle_one_request()
+
+    def send_body(self, code, content_type, body, headers=None):
+        """
+        Envía una respuesta completa con su Content-Length y las cabeceras adicionales
+        """
+        self.discard_request_body()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_connection_header()
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_app_response(self, response):
+        """
+        Envía la respuesta que devuelve la aplicación: (código, Content-Type, cuerpo[, cabeceras])
+        """
+        if isinstance(response, CachedResponse) and self.request_version != "HTTP/0.9":
+            self.send_cached(response)
+        else:
+            self.send_body(*response)
+
+    def send_cached(self, response):
+        """
+        Envía una respuesta constante con una sola escritura de sus bytes ya codificados
+        """
+        self.discard_request_body()
+        connection = self.connection_header()
+        if connection == "close":
+            self.close_connection = True
+        self.log_request(response.code)
+        self.wfile.write(response.encode(self.protocol_version, self.version_string(), connection,
+                                         include_body=self.command != "HEAD"))
+
+    def send_connection_header(self):
+        """
+        Indica al cliente si la conexión sigue abierta tras esta respuesta
+        """
+        connection = self.connection_header()
+        if connection:
+            self.send_header("Connection", connection)
+
+    def connection_header(self):
+        """
+        Devuelve el valor de la cabecera Connection de la respuesta, o None si no hace falta
+        """
+        if not self.server_keeps_connections():
+            return "close"
+        if self.requests_handled >= self.max_requests_per_connection:
+            return "close"
+        if not self.close_connection and self.request_version == "HTTP/1.0":
+            return "keep-alive"
+        return None
+
+    def server_keeps_connections(self):
+        """
+        Indica si el servidor puede mantener conexiones abiertas sin bloquear a otros clientes
+        """
+        return (getattr(self.server, "persistent_connections", False)
+                or isinstance(self.server, ThreadingMixIn))
+
+    def discard_request_body(self):
+        """
+        Lee y descarta el cuerpo de la petición para no confundirlo con la siguiente
+        """
+        length = self.headers.get("Content-Length")
+        if not length:
+            return
+        try:
+            remaining = int(length)
+        except ValueError:
+            self.close_connection = True
+            return
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                self.close_connection = True
+                return
+            remaining -= len(chunk)
@@ -0,0 +1,129 @@
+import pytest
+import threading
+import socket
+import http.client
+import json
+from ej2a2 import create_server, ProductAPIHandler
+
+
+@pytest.fixture
+def server():
+    """
+    Fixture para iniciar y detener el servidor HTTP durante las pruebas
+    """
+    server = create_server(host="localhost", port=0, workers=2)
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def read_response(conn):
+    response = conn.getresponse()
+    return response, response.read()
+
+
+def test_connection_is_reused(server):
+    """
+    Varias peticiones, incluidas las 404, deben viajar por la misma conexión
+    """
+    conn = http.client.HTTPConnection("localhost", server.server_port)
+    conn.request("GET", "/product/1")
+    response, body = read_response(conn)
+    assert response.status == 200
+    assert response.headers["Content-Length"] == str(len(body))
+    sock = conn.sock
+
+    conn.request("GET", "/product/999")
+    response, body = read_response(conn)
+    assert response.status == 404
+    assert conn.sock is sock, "La conexión debe seguir abierta tras un 404"
+
+    conn.request("GET", "/invalid")
+    response, body = read_response(conn)
+    assert response.status == 404
+
+    conn.request("GET", "/product/2")
+    response, body = read_response(conn)
+    assert response.status == 200
+    assert json.loads(body)["name"] == "Smartphone"
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_max_requests_per_connection(server, monkeypatch):
+    """
+    Al alcanzar el límite de peticiones el servidor cierra la conexión
+    """
+    monkeypatch.setattr(ProductAPIHandler, "max_requests_per_connection", 2)
+    conn = http.client.HTTPConnection("localhost", server.server_port)
+    conn.request("GET", "/product/1")
+    response, _ = read_response(conn)
+    assert response.headers.get("Connection") is None
+
+    conn.request("GET", "/product/1")
+    response, _ = read_response(conn)
+    assert response.headers["Connection"] == "close"
+    conn.close()
+
+
+def test_pipelined_requests(server):
+    """
+    Las peticiones enviadas juntas se responden en orden por la misma conexión
+    """
+    request = "GET /product/{} HTTP/1.1\r\nHost: localhost\r\n\r\n"
+    with socket.create_connection(("localhost", server.server_port)) as sock:
+        sock.sendall((request.format(1) + request.format(999) + request.format(3)).encode())
+        rfile = sock.makefile("rb")
+        statuses = []
+        for _ in range(3):
+            status = int(rfile.readline().split()[1])
+            headers = {}
+            line = rfile.readline()
+            while line != b"\r\n":
+                key, value = line.decode().split(":", 1)
+                headers[key.lower()] = value.strip()
+                line = rfile.readline()
+            body = rfile.read(int(headers["content-length"]))
+            statuses.append((status, json.loads(body)))
+
+    assert statuses[0] == (200, {"id": 1, "name": "Laptop", "price": 999.99})
+    assert statuses[1][0] == 404
+    assert statuses[2][1]["name"] == "Tablet"
+
+
+def test_idle_connection_is_closed(server, monkeypatch):
+    """
+    Una conexión inactiva se cierra al vencer el timeout
+    """
+    monkeypatch.setattr(ProductAPIHandler, "timeout", 0.2)
+    with socket.create_connection(("localhost", server.server_port)) as sock:
+        sock.settimeout(2)
+        assert sock.recv(1) == b"", "El servidor debe cerrar la conexión inactiva"
+
+
+def test_single_thread_server_closes_connections():
+    """
+    Sin grupo de hilos el servidor cierra la conexión tras cada respuesta
+    """
+    server = create_server(host="localhost", port=0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection("localhost", server.server_port)
+        conn.request("GET", "/product/1")
+        response, _ = read_response(conn)
+        assert response.status == 200
+        assert response.headers["Connection"] == "close"
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
@@ -0,0 +1,180 @@
+"""
+Servidor HTTP concurrente con un grupo fijo de hilos (worker pool).
+
+HTTPServer atiende las peticiones de una en una en el mismo hilo, así que un cliente
+lento bloquea a todos los demás. PooledHTTPServer reparte las conexiones aceptadas
+entre un número fijo de hilos a través de una cola acotada. Si la cola está llena,
+el servidor no crea más hilos: responde 503 (Service Unavailable) y cierra la conexión.
+
+pool_stats() devuelve el uso del grupo en cualquier momento. Con report_interval, el
+propio bucle de serve_forever lo muestra cada report_interval segundos mientras el
+servidor está en marcha (sólo si ha cambiado desde el último informe).
+"""
+
+from http.server import HTTPServer
+import queue
+import threading
+import time
+
+# Segundos entre informes del uso del grupo con enable_pool_reports()
+POOL_REPORT_INTERVAL = 10.0
+
+# Respuesta que se envía cuando la cola de peticiones está llena
+REJECT_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"Content-Length: 19\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+    b"Service Unavailable"
+)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    Servidor HTTP que atiende las peticiones con un grupo fijo de hilos
+    """
+
+    # Cada conexión ocupa un hilo del grupo, así que las demás no se bloquean si
+    # una queda abierta esperando la siguiente petición
+    persistent_connections = True
+
+    # Segundos entre informes del uso del grupo desde serve_forever (None: sin informes)
+    report_interval = None
+
+    def __init__(self, server_address, RequestHandlerClass, workers=8, queue_size=64,
+                 bind_and_activate=True):
+        if workers < 1:
+            raise ValueError("workers debe ser mayor que 0")
+        if queue_size < 1:
+            raise ValueError("queue_size debe ser mayor que 0")
+        self.workers = workers
+        self.queue_size = queue_size
+        self._requests = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._busy = 0
+        self._handled = 0
+        self._rejected = 0
+        self._threads = []
+        self._last_report = time.monotonic()
+        self._last_reported = None
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+    def start_workers(self):
+        """
+        Crea los hilos del grupo si todavía no existen
+        """
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"http-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def process_request(self, request, client_address):
+        """
+        Encola la conexión para que la atienda un hilo libre, o la rechaza si la cola está llena
+        """
+        # Los hilos se crean con la primera conexión y no en el constructor, para que el
+        # servidor se pueda crear en un proceso y servir en otro tras un fork()
+        self.start_workers()
+        try:
+            self._requests.put_nowait((request, client_address))
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            self.reject_request(request, client_address)
+            self.shutdown_request(request)
+
+    def reject_request(self, request, client_address):
+        """
+        Avisa al cliente de que el servidor está saturado
+        """
+        try:
+            request.sendall(REJECT_RESPONSE)
+        except OSError:
+            pass
+
+    def _worker(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            request, client_address = item
+            with self._stats_lock:
+                self._busy += 1
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._stats_lock:
+                    self._busy -= 1
+                    self._handled += 1
+
+    def pool_stats(self):
+        """
+        Devuelve el estado actual del grupo de hilos
+        """
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queued": self._requests.qsize(),
+                "queue_size": self.queue_size,
+                "handled": self._handled,
+                "rejected": self._rejected,
+            }
+
+    def service_actions(self):
+        """
+        serve_forever la llama en cada vuelta (cada poll_interval): muestra el uso del
+        grupo cada report_interval segundos si ha cambiado desde el último informe
+        """
+        super().service_actions()
+        if self.report_interval is None:
+            return
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+        stats = self.pool_stats()
+        if stats != self._last_reported:
+            self._last_reported = stats
+            report_pool_usage(self)
+
+    def server_close(self):
+        """
+        Cierra el socket y detiene los hilos del grupo
+        """
+        super().server_close()
+        for _ in self._threads:
+            self._requests.put(None)
+        for thread in self._threads:
+            thread.join(1)
+        self._threads = []
+
+
+def enable_pool_reports(server, interval=POOL_REPORT_INTERVAL):
+    """
+    Hace que un PooledHTTPServer muestre el uso del grupo cada `interval` segundos
+    mientras atiende peticiones
+    """
+    if isinstance(server, PooledHTTPServer):
+        server.report_interval = interval
+
+
+def report_pool_usage(server):
+    """
+    Muestra el uso del grupo de hilos si el servidor es un PooledHTTPServer
+    """
+    if not isinstance(server, PooledHTTPServer):
+        return
+    stats = server.pool_stats()
+    print(
+        f"Pool: {stats['busy']}/{stats['workers']} hilos ocupados, "
+        f"{stats['queued']}/{stats['queue_size']} en cola, "
+        f"{stats['handled']} atendidas, {stats['rejected']} rechazadas"
+    )
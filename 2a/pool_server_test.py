@@ -0,0 +1,130 @@
+import pytest
+import threading
+import requests
+import time
+from http.server import BaseHTTPRequestHandler
+from pool_server import PooledHTTPServer
+from ej2a2 import create_server
+
+# Se libera para dejar terminar las peticiones lentas
+release = threading.Event()
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """
+    Manejador que bloquea las peticiones a /slow hasta que se libera el evento
+    """
+
+    def do_GET(self):
+        if self.path == "/slow":
+            release.wait(5)
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def stop(server, thread):
+    release.set()
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_slow_client_does_not_block_others():
+    """
+    Una petición lenta no debe bloquear a las demás
+    """
+    release.clear()
+    server = PooledHTTPServer(("localhost", 0), SlowHandler, workers=2, queue_size=4)
+    thread = start(server)
+    url = f"http://localhost:{server.server_port}"
+    try:
+        slow = threading.Thread(target=requests.get, args=(url + "/slow",), daemon=True)
+        slow.start()
+        time.sleep(0.2)
+
+        start_time = time.monotonic()
+        response = requests.get(url + "/fast", timeout=2)
+        assert response.status_code == 200
+        assert time.monotonic() - start_time < 1, "La petición rápida no debe esperar a la lenta"
+        assert server.pool_stats()["busy"] == 1
+    finally:
+        stop(server, thread)
+
+
+def test_full_queue_is_rejected():
+    """
+    Con todos los hilos ocupados y la cola llena, el servidor responde 503
+    """
+    release.clear()
+    server = PooledHTTPServer(("localhost", 0), SlowHandler, workers=1, queue_size=1)
+    thread = start(server)
+    url = f"http://localhost:{server.server_port}/slow"
+    try:
+        for _ in range(2):
+            threading.Thread(target=requests.get, args=(url,), daemon=True).start()
+            time.sleep(0.2)
+
+        response = requests.get(url, timeout=2)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        stats = server.pool_stats()
+        assert stats["busy"] == 1
+        assert stats["queued"] == 1
+        assert stats["rejected"] == 1
+    finally:
+        stop(server, thread)
+
+
+def test_create_server_with_workers():
+    """
+    create_server devuelve un servidor con grupo de hilos cuando se indica workers
+    """
+    server = create_server(host="localhost", port=0, workers=3, queue_size=5)
+    thread = start(server)
+    try:
+        assert isinstance(server, PooledHTTPServer)
+        response = requests.get(f"http://localhost:{server.server_port}/product/1")
+        assert response.status_code == 200
+        assert response.json()["name"] == "Laptop"
+        stats = server.pool_stats()
+        assert stats["workers"] == 3
+        assert stats["queue_size"] == 5
+    finally:
+        stop(server, thread)
+
+
+def test_pool_usage_is_reported_while_serving(capsys):
+    """
+    Con report_interval, serve_forever muestra el uso del grupo mientras atiende peticiones
+    """
+    release.clear()
+    server = PooledHTTPServer(("localhost", 0), SlowHandler, workers=2, queue_size=4)
+    server.report_interval = 0.1
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05},
+                              daemon=True)
+    thread.start()
+    url = f"http://localhost:{server.server_port}"
+    try:
+        slow = threading.Thread(target=requests.get, args=(url + "/slow",), daemon=True)
+        slow.start()
+        time.sleep(0.5)
+        assert "Pool: 1/2 hilos ocupados" in capsys.readouterr().out
+        # Sin cambios en el grupo no se repite el informe
+        time.sleep(0.3)
+        assert capsys.readouterr().out == ""
+    finally:
+        stop(server, thread)
@@ -0,0 +1,163 @@
+"""
+Servidor pre-fork: varios procesos atendiendo el mismo puerto.
+
+Un único proceso de Python sólo aprovecha un núcleo por culpa del GIL. run_prefork crea
+N procesos hijo con fork() que atienden el mismo puerto, de una de estas dos formas:
+
+- Socket heredado (por defecto): el proceso maestro crea el servidor y los hijos
+  heredan el socket de escucha; el núcleo reparte las conexiones entre ellos.
+- SO_REUSEPORT (reuse_port=True): cada hijo crea su propio servidor con SO_REUSEPORT
+  sobre el mismo puerto y el núcleo reparte las conexiones entre los sockets.
+
+El proceso maestro no atiende peticiones: vigila a los hijos, vuelve a crear los que
+terminan inesperadamente y, al recibir SIGTERM o SIGINT, los detiene ordenadamente.
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+
+# Segundos que se espera a que los hijos terminen antes de matarlos con SIGKILL
+GRACEFUL_TIMEOUT = 10
+
+# Si un hijo muere antes de este tiempo, se espera un poco antes de volver a crearlo
+MIN_CHILD_LIFETIME = 1
+
+
+_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+class _Stop(Exception):
+    pass
+
+
+def _raise_stop(signum, frame):
+    raise _Stop()
+
+
+def _serve_child(server_factory, server, reuse_port):
+    """
+    Cuerpo de un proceso hijo: atiende peticiones hasta recibir SIGTERM
+    """
+    # El maestro se encarga de Ctrl+C y avisa a los hijos con SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, _SIGNALS)
+    status = 1
+    try:
+        if reuse_port:
+            server = server_factory(reuse_port=True)
+
+        # shutdown() espera a que termine serve_forever(), así que se llama desde otro hilo.
+        # La petición en curso se completa antes de salir.
+        def stop(signum, frame):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        server.serve_forever()
+        server.server_close()
+        status = 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+
+def run_prefork(server_factory, processes=None, reuse_port=False):
+    """
+    Atiende peticiones con `processes` procesos hijo (por defecto, uno por núcleo)
+
+    server_factory es una función sin argumentos obligatorios que crea el servidor;
+    con reuse_port=True se llama en cada hijo con reuse_port=True.
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("run_prefork necesita os.fork(), que no existe en este sistema")
+    processes = processes or os.cpu_count() or 1
+
+    # Con el socket heredado, el maestro crea el servidor una sola vez antes del fork
+    server = None if reuse_port else server_factory()
+
+    children = {}
+
+    def spawn():
+        # Las señales se bloquean durante el fork para que el hijo no herede el
+        # manejador del maestro antes de instalar el suyo
+        sys.stdout.flush()
+        sys.stderr.flush()
+        signal.pthread_sigmask(signal.SIG_BLOCK, _SIGNALS)
+        try:
+            pid = os.fork()
+            if pid == 0:
+                _serve_child(server_factory, server, reuse_port)
+            children[pid] = time.monotonic()
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, _SIGNALS)
+
+    previous = {sig: signal.signal(sig, _raise_stop) for sig in _SIGNALS}
+    try:
+        for _ in range(processes):
+            spawn()
+        print(f"Proceso maestro {os.getpid()} con {processes} procesos hijo")
+
+        while True:
+            pid, status = os.wait()
+            started = children.pop(pid, None)
+            if started is None:
+                continue
+            print(f"El proceso {pid} terminó ({_describe(status)}); se crea uno nuevo")
+            if time.monotonic() - started < MIN_CHILD_LIFETIME:
+                time.sleep(MIN_CHILD_LIFETIME)
+            spawn()
+    except _Stop:
+        pass
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        _stop_children(children)
+        if server is not None:
+            server.server_close()
+
+
+def _stop_children(children):
+    """
+    Envía SIGTERM a los hijos y espera a que terminen; los que no lo hacen reciben SIGKILL
+    """
+    for pid in children:
+        _kill(pid, signal.SIGTERM)
+
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT
+    while children and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(0.05)
+        else:
+            children.pop(pid, None)
+
+    for pid in children:
+        _kill(pid, signal.SIGKILL)
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    children.clear()
+
+
+def _kill(pid, sig):
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _describe(status):
+    if os.WIFSIGNALED(status):
+        return f"señal {os.WTERMSIG(status)}"
+    return f"código {os.waitstatus_to_exitcode(status)}"
@@ -0,0 +1,115 @@
+import pytest
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import requests
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Necesita fork() y /proc")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def children_of(pid):
+    """
+    Devuelve los PID de los procesos hijo de `pid` leyendo /proc
+    """
+    children = set()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid:
+            children.add(int(entry))
+    return children
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def responds(url):
+    try:
+        return requests.get(url, timeout=1).status_code == 200
+    except requests.ConnectionError:
+        return False
+
+
+@pytest.fixture(params=[False, True], ids=["inherited", "reuse_port"])
+def prefork(request):
+    """
+    Lanza ej2a2 con 2 procesos hijo en un proceso aparte
+    """
+    port = free_port()
+    code = (
+        "import ej2a2\n"
+        "ej2a2.ProductAPIHandler.log_message = lambda *args: None\n"
+        f"ej2a2.run_server_prefork(processes=2, reuse_port={request.param}, port={port}, workers=2)\n"
+    )
+    master = subprocess.Popen([sys.executable, "-c", code], cwd=HERE,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    url = f"http://localhost:{port}/product/1"
+    assert wait_until(lambda: responds(url)), "El servidor pre-fork no arrancó"
+    assert wait_until(lambda: len(children_of(master.pid)) == 2)
+
+    yield master, url
+
+    if master.poll() is None:
+        master.kill()
+        master.wait()
+
+
+def test_workers_serve_requests(prefork):
+    """
+    Los procesos hijo atienden las peticiones en el puerto compartido
+    """
+    master, url = prefork
+    for _ in range(20):
+        response = requests.get(url)
+        assert response.status_code == 200
+        assert response.json()["name"] == "Laptop"
+
+
+def test_crashed_worker_is_restarted(prefork):
+    """
+    El maestro vuelve a crear los hijos que mueren
+    """
+    master, url = prefork
+    before = children_of(master.pid)
+    victim = min(before)
+    os.kill(victim, signal.SIGKILL)
+
+    assert wait_until(lambda: len(children_of(master.pid) - {victim}) == 2)
+    assert victim not in children_of(master.pid)
+    assert responds(url)
+
+
+def test_graceful_shutdown(prefork):
+    """
+    SIGTERM al maestro detiene todos los procesos
+    """
+    master, url = prefork
+    children = children_of(master.pid)
+    master.send_signal(signal.SIGTERM)
+    assert master.wait(timeout=15) == 0
+    for pid in children:
+        assert not os.path.exists(f"/proc/{pid}"), "Los hijos deben terminar con el maestro"
+    assert not responds(url)
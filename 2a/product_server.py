@@ -0,0 +1,220 @@
+"""
+API de productos en JSON y XML desde un único servidor.
+
+ej2a2 (JSON) y ej2a3 (XML) son dos servidores, cada uno con su propia lista de productos.
+Este servidor atiende los dos formatos con un único ProductStore y elige el formato de
+cada respuesta así:
+
+1. Por la extensión de la ruta: `/product/1.json` o `/product/1.xml`.
+2. Si no hay extensión, por la cabecera Accept (`application/json`, `application/xml`,
+   `text/xml`), respetando los valores q. El q de cada tipo es el del rango más
+   específico que lo incluye (`text/xml` antes que `text/*` y que `*/*`), y q=0
+   significa que ese tipo no se acepta.
+3. Sin extensión ni Accept, o con `*/*`, se responde en JSON.
+
+Si la cabecera Accept no admite ninguno de los dos formatos, se responde 406 (Not Acceptable).
+Cada formato tiene su propia caché de bytes en el ProductStore.
+"""
+
+from http.server import BaseHTTPRequestHandler
+import functools
+import json
+from ej2a2 import products
+from keepalive import KeepAliveMixin
+from pool_server import enable_pool_reports, report_pool_usage
+from prefork import run_prefork
+from product_store import ProductStore
+from response_cache import CachedResponse
+from router import Router
+from serving import make_server
+from xml_writer import to_xml
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+XML_CONTENT_TYPE = "application/xml"
+
+# Formato -> (Content-Type, función que serializa un diccionario con la etiqueta indicada)
+FORMATS = {
+    "json": (JSON_CONTENT_TYPE, lambda tag, d: json.dumps(d).encode("utf-8")),
+    "xml": (XML_CONTENT_TYPE, lambda tag, d: to_xml(tag, d)),
+}
+
+# Tipos MIME que se sirven -> formato; con el mismo q gana el primero de la lista
+MEDIA_TYPES = {
+    "application/json": "json",
+    "application/xml": "xml",
+    "text/xml": "xml",
+}
+
+DEFAULT_FORMAT = "json"
+
+store = ProductStore(
+    products,
+    encoders={fmt: functools.partial(encode, "product") for fmt, (_, encode) in FORMATS.items()},
+)
+
+
+def error_body(fmt, message):
+    """
+    Devuelve los bytes de un mensaje de error en el formato indicado
+    """
+    if fmt == "xml":
+        return FORMATS[fmt][1]("error", {"message": message})
+    return FORMATS[fmt][1]("error", {"error": message})
+
+
+# Las respuestas de error no cambian, así que se generan una sola vez por formato
+ERROR_BODIES = {
+    fmt: {
+        "not_found": error_body(fmt, "Not found"),
+        "product_not_found": error_body(fmt, "Product not found"),
+        "method_not_allowed": error_body(fmt, "Method not allowed"),
+    }
+    for fmt in FORMATS
+}
+
+
+# Respuesta cuando Accept no admite ninguno de los formatos
+NOT_ACCEPTABLE = CachedResponse(
+    406, "text/plain; charset=utf-8",
+    b"Supported formats: application/json, application/xml",
+    {"Vary": "Accept"},
+)
+
+
+def negotiate(accept):
+    """
+    Elige el formato a partir de la cabecera Accept; devuelve None si no se admite ninguno
+    """
+    if not accept:
+        return DEFAULT_FORMAT
+    # Rango de la cabecera -> (q, posición); si se repite cuenta el primero
+    ranges = {}
+    for position, media_range in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.setdefault(media_type.lower(), (q, position))
+
+    best, best_key = None, None
+    for media_type, fmt in MEDIA_TYPES.items():
+        # El q de cada tipo es el de su rango más específico: tipo exacto, tipo/* o */*
+        main_type = media_type.split("/")[0]
+        for candidate in (media_type, main_type + "/*", "*/*"):
+            if candidate in ranges:
+                q, position = ranges[candidate]
+                break
+        else:
+            continue
+        # Gana el mayor q; con el mismo q, el que aparece antes en la cabecera
+        if q > 0 and (best is None or (-q, position) < best_key):
+            best, best_key = fmt, (-q, position)
+    return best
+
+
+def split_extension(path):
+    """
+    Separa la extensión de formato de la ruta: "/product/1.xml?x=1" -> ("/product/1?x=1", "xml")
+    """
+    route, sep, query = path.partition("?")
+    stem, dot, extension = route.rpartition(".")
+    if dot and extension in FORMATS and "/" not in extension:
+        return stem + sep + query, extension
+    return path, None
+
+
+router = Router()
+
+
+@router.route("/product/<int:product_id>")
+def get_product(product_id, fmt):
+    """
+    Devuelve el producto en el formato elegido, o un error 404 si no existe
+    """
+    body = store.body(product_id, fmt)
+    if body is None:
+        return 404, FORMATS[fmt][0], ERROR_BODIES[fmt]["product_not_found"]
+    return 200, FORMATS[fmt][0], body
+
+
+@router.errorhandler(404)
+def not_found(fmt):
+    return 404, FORMATS[fmt][0], ERROR_BODIES[fmt]["not_found"]
+
+
+@router.errorhandler(405)
+def method_not_allowed(fmt):
+    return 405, FORMATS[fmt][0], ERROR_BODIES[fmt]["method_not_allowed"]
+
+
+def product_response(method, path, headers=None):
+    """
+    Resuelve una petición y devuelve la respuesta como (código, Content-Type, cuerpo, cabeceras)
+    """
+    path, fmt = split_extension(path)
+    extra = {}
+    if fmt is None:
+        # La respuesta depende de Accept: las cachés intermedias deben tenerlo en cuenta
+        extra["Vary"] = "Accept"
+        fmt = negotiate(headers.get("accept") if headers else None)
+        if fmt is None:
+            return NOT_ACCEPTABLE
+
+    code, content_type, body, *more = router.dispatch(method, path, fmt=fmt)
+    if more:
+        extra.update(more[0])
+    return code, content_type, body, extra
+
+
+class ProductAPIHandler(KeepAliveMixin, BaseHTTPRequestHandler):
+    """
+    Manejador de peticiones HTTP para la API de productos en JSON y XML
+    """
+
+    def do_GET(self):
+        self.send_app_response(product_response(self.command, self.path, self.headers))
+
+    # El enrutador decide qué métodos admite cada ruta y responde 405 a los demás
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+
+def create_server(host="localhost", port=8000, workers=0, queue_size=64, backend="thread",
+                  reuse_port=False):
+    """
+    Crea y configura el servidor HTTP (las opciones son las de ej2a2.create_server)
+    """
+    server_address = (host, port)
+    return make_server(server_address, ProductAPIHandler, product_response, workers=workers,
+                       queue_size=queue_size, backend=backend, reuse_port=reuse_port)
+
+def run_server(server):
+    """
+    Inicia el servidor HTTP
+    """
+    print(f"Servidor iniciado en http://{server.server_name}:{server.server_port}")
+    enable_pool_reports(server)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report_pool_usage(server)
+        server.server_close()
+
+def run_server_prefork(processes=None, reuse_port=False, **options):
+    """
+    Inicia el servidor en varios procesos que comparten el puerto
+
+    Las opciones se pasan a create_server. Por defecto se crea un proceso por núcleo.
+    """
+    factory = functools.partial(create_server, **options)
+    run_prefork(factory, processes=processes, reuse_port=reuse_port)
+
+if __name__ == '__main__':
+    server = create_server()
+    run_server(server)
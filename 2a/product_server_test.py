@@ -0,0 +1,115 @@
+import pytest
+import threading
+import requests
+import xml.etree.ElementTree as ET
+from product_server import create_server, negotiate, split_extension, store
+
+
+@pytest.fixture
+def url():
+    """
+    Fixture para iniciar y detener el servidor JSON/XML durante las pruebas
+    """
+    server = create_server(host="localhost", port=0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield f"http://localhost:{server.server_port}"
+
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_negotiate():
+    """
+    Se elige el formato con mayor q de la cabecera Accept
+    """
+    assert negotiate(None) == "json"
+    assert negotiate("*/*") == "json"
+    assert negotiate("application/xml") == "xml"
+    assert negotiate("text/html, text/xml;q=0.9, application/json;q=0.5") == "xml"
+    assert negotiate("application/json;q=0.4, application/xml;q=0.8") == "xml"
+    assert negotiate("text/html") is None
+    assert negotiate("application/*") == "json"
+    assert negotiate("text/*") == "xml"
+    assert negotiate("application/json;q=0, */*") == "xml"
+    assert negotiate("*/*;q=0.1, application/xml;q=0") == "json"
+    assert negotiate("text/*;q=0.5, text/xml;q=0, application/json;q=0") is None
+
+
+def test_split_extension():
+    """
+    La extensión de formato se separa de la ruta conservando la query string
+    """
+    assert split_extension("/product/1.xml?x=1") == ("/product/1?x=1", "xml")
+    assert split_extension("/product/1.json") == ("/product/1", "json")
+    assert split_extension("/product/1") == ("/product/1", None)
+    assert split_extension("/product/1.csv") == ("/product/1.csv", None)
+
+
+def test_json_by_default(url):
+    """
+    Sin Accept se responde en JSON
+    """
+    response = requests.get(url + "/product/1", headers={"Accept": None})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/json; charset=utf-8"
+    assert response.headers["Vary"] == "Accept"
+    assert response.json() == {"id": 1, "name": "Laptop", "price": 999.99}
+
+
+def test_xml_by_accept(url):
+    """
+    Con Accept: application/xml se responde en XML
+    """
+    response = requests.get(url + "/product/2", headers={"Accept": "application/xml"})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/xml"
+    assert ET.fromstring(response.content).find("name").text == "Smartphone"
+
+
+def test_format_by_extension(url):
+    """
+    La extensión tiene prioridad sobre la cabecera Accept
+    """
+    response = requests.get(url + "/product/3.xml", headers={"Accept": "application/json"})
+    assert response.headers["Content-Type"] == "application/xml"
+    assert "Vary" not in response.headers
+
+    response = requests.get(url + "/product/3.json")
+    assert response.json()["name"] == "Tablet"
+
+
+def test_errors_in_requested_format(url):
+    """
+    Los errores se devuelven en el formato pedido
+    """
+    response = requests.get(url + "/product/999.xml")
+    assert response.status_code == 404
+    assert "<error>" in response.text
+
+    response = requests.get(url + "/invalid", headers={"Accept": "application/json"})
+    assert response.status_code == 404
+    assert "error" in response.json()
+
+    response = requests.get(url + "/product/1", headers={"Accept": "text/html"})
+    assert response.status_code == 406
+
+
+def test_shared_store_invalidation(url):
+    """
+    Un cambio en el almacén se ve en los dos formatos
+    """
+    store.insert({"id": 50, "name": "Monitor", "price": 199.99})
+    try:
+        assert requests.get(url + "/product/50.json").json()["price"] == 199.99
+        assert ET.fromstring(requests.get(url + "/product/50.xml").content).find("price").text == "199.99"
+
+        store.update(50, price=149.99)
+        assert requests.get(url + "/product/50.json").json()["price"] == 149.99
+        assert ET.fromstring(requests.get(url + "/product/50.xml").content).find("price").text == "149.99"
+    finally:
+        store.delete(50)
+    assert requests.get(url + "/product/50").status_code == 404
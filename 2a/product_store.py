@@ -0,0 +1,99 @@
+"""
+Almacén de productos indexado por id con caché de respuestas ya serializadas.
+
+Los productos se guardan en un diccionario por id, así que buscar uno es O(1) en lugar
+de recorrer la lista. Para cada formato registrado (por ejemplo "json" y "xml") se
+guardan los bytes de cada producto la primera vez que se piden; insertar, actualizar
+o borrar un producto descarta sus bytes en todos los formatos.
+
+Los productos que se pasan al almacén se copian, de modo que sólo cambian a través de
+sus métodos y la caché no puede quedarse desactualizada.
+"""
+
+import threading
+
+
+class ProductStore:
+    """
+    Productos indexados por id con sus respuestas serializadas en cada formato
+    """
+
+    def __init__(self, products=(), encoders=None):
+        # encoders: formato -> función que recibe un producto y devuelve bytes
+        self.encoders = dict(encoders or {})
+        self._products = {}
+        self._bodies = {fmt: {} for fmt in self.encoders}
+        self._lock = threading.Lock()
+        for product in products:
+            self.insert(product)
+
+    def __len__(self):
+        return len(self._products)
+
+    def __iter__(self):
+        return iter(list(self._products.values()))
+
+    def __contains__(self, product_id):
+        return product_id in self._products
+
+    def get(self, product_id):
+        """
+        Devuelve el producto con ese id, o None si no existe
+        """
+        return self._products.get(product_id)
+
+    def body(self, product_id, fmt):
+        """
+        Devuelve los bytes del producto en el formato indicado, o None si no existe
+        """
+        bodies = self._bodies[fmt]
+        body = bodies.get(product_id)
+        if body is None:
+            product = self._products.get(product_id)
+            if product is None:
+                return None
+            body = self.encoders[fmt](product)
+            with self._lock:
+                # Sólo se guarda si el producto no ha cambiado mientras se serializaba
+                if self._products.get(product_id) is product:
+                    bodies[product_id] = body
+        return body
+
+    def insert(self, product):
+        """
+        Añade un producto; lanza ValueError si ya existe uno con el mismo id
+        """
+        product = dict(product)
+        with self._lock:
+            if product["id"] in self._products:
+                raise ValueError(f"Ya existe un producto con id {product['id']}")
+            self._products[product["id"]] = product
+        return product
+
+    def update(self, product_id, **fields):
+        """
+        Modifica los campos de un producto; devuelve None si no existe
+        """
+        with self._lock:
+            current = self._products.get(product_id)
+            if current is None:
+                return None
+            # Se sustituye el diccionario en lugar de modificarlo para que las lecturas
+            # concurrentes vean el producto antiguo o el nuevo, nunca uno a medias
+            product = {**current, **fields, "id": product_id}
+            self._products[product_id] = product
+            self._discard(product_id)
+        return product
+
+    def delete(self, product_id):
+        """
+        Borra un producto; devuelve el producto borrado o None si no existía
+        """
+        with self._lock:
+            product = self._products.pop(product_id, None)
+            self._discard(product_id)
+        return product
+
+    def _discard(self, product_id):
+        for bodies in self._bodies.values():
+            bodies.pop(product_id, None)
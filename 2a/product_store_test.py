@@ -0,0 +1,59 @@
+import json
+import pytest
+from product_store import ProductStore
+
+
+@pytest.fixture
+def store():
+    products = [
+        {"id": 1, "name": "Laptop", "price": 999.99},
+        {"id": 2, "name": "Smartphone", "price": 699.99},
+    ]
+    return ProductStore(products, encoders={"json": lambda p: json.dumps(p).encode()})
+
+
+def test_get_by_id(store):
+    """
+    Los productos se buscan por id
+    """
+    assert store.get(2)["name"] == "Smartphone"
+    assert store.get(999) is None
+    assert len(store) == 2
+    assert 1 in store
+
+
+def test_body_is_cached(store):
+    """
+    El cuerpo serializado se genera una vez y se reutiliza
+    """
+    body = store.body(1, "json")
+    assert json.loads(body) == {"id": 1, "name": "Laptop", "price": 999.99}
+    assert store.body(1, "json") is body
+    assert store.body(999, "json") is None
+
+
+def test_update_and_delete_invalidate(store):
+    """
+    Actualizar o borrar un producto descarta su cuerpo serializado
+    """
+    store.body(1, "json")
+    store.update(1, price=899.99)
+    assert json.loads(store.body(1, "json"))["price"] == 899.99
+
+    assert store.update(999, price=1) is None
+    assert store.delete(1)["id"] == 1
+    assert store.body(1, "json") is None
+    assert store.get(1) is None
+
+
+def test_insert(store):
+    """
+    Insertar un id repetido es un error; los productos se copian al insertarlos
+    """
+    product = {"id": 3, "name": "Tablet", "price": 349.99}
+    store.insert(product)
+    product["price"] = 0
+    assert store.get(3)["price"] == 349.99
+
+    with pytest.raises(ValueError):
+        store.insert({"id": 3, "name": "Otro", "price": 1})
@@ -0,0 +1,88 @@
+"""
+Respuestas constantes codificadas una sola vez.
+
+Respuestas como el saludo de `/` o los errores 404 y 405 son siempre iguales, pero
+send_response y send_header las construyen cabecera a cabecera en cada petición y
+vuelven a codificar el cuerpo. CachedResponse guarda la respuesta completa (línea de
+estado, cabeceras y cuerpo) en bytes la primera vez que se envía y después sólo tiene
+que insertar la fecha actual en la cabecera Date, así que se envía con una sola escritura.
+
+Hay una variante codificada por cada combinación de cabecera Server, cabecera Connection
+(ninguna, keep-alive o close) y si se incluye el cuerpo (HEAD), así que las variantes
+son pocas y se generan bajo demanda.
+
+CachedResponse es una tupla (código, Content-Type, cuerpo, cabeceras), así que los
+manejadores pueden devolverla igual que cualquier otra respuesta: KeepAliveMixin y
+AsyncHTTPServer la reconocen y envían sus bytes directamente.
+"""
+
+from email.utils import formatdate
+from http import HTTPStatus
+import time
+
+# (segundo, fecha formateada) de la última cabecera Date generada
+_date_cache = (None, b"")
+
+
+def http_date():
+    """
+    Devuelve la fecha actual para la cabecera Date; se formatea como mucho una vez por segundo
+    """
+    global _date_cache
+    now = int(time.time())
+    second, value = _date_cache
+    if second != now:
+        value = formatdate(now, usegmt=True).encode("ascii")
+        _date_cache = (now, value)
+    return value
+
+
+class CachedResponse(tuple):
+    """
+    Respuesta constante (código, Content-Type, cuerpo, cabeceras) con sus bytes ya codificados
+    """
+
+    def __new__(cls, code, content_type, body, headers=None):
+        return super().__new__(cls, (code, content_type, body, dict(headers or {})))
+
+    def __init__(self, code, content_type, body, headers=None):
+        # (protocolo, Server, Connection, con cuerpo) -> (bytes antes de la fecha, bytes después)
+        self._encoded = {}
+
+    @property
+    def code(self):
+        return self[0]
+
+    @property
+    def body(self):
+        return self[2]
+
+    def encode(self, protocol="HTTP/1.1", server=None, connection=None, include_body=True):
+        """
+        Devuelve la respuesta completa en bytes con la fecha actual en la cabecera Date
+        """
+        key = (protocol, server, connection, include_body)
+        parts = self._encoded.get(key)
+        if parts is None:
+            parts = self._encoded[key] = self._build(*key)
+        before, after = parts
+        return b"".join((before, http_date(), after))
+
+    def _build(self, protocol, server, connection, include_body):
+        code, content_type, body, headers = self
+        before = f"{protocol} {code} {HTTPStatus(code).phrase}\r\n"
+        if server:
+            before += f"Server: {server}\r\n"
+        before += "Date: "
+
+        after = (
+            "\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+        )
+        for name, value in headers.items():
+            after += f"{name}: {value}\r\n"
+        if connection:
+            after += f"Connection: {connection}\r\n"
+        after = (after + "\r\n").encode("latin-1")
+        return before.encode("latin-1"), after + body if include_body else after
@@ -0,0 +1,109 @@
+import pytest
+import threading
+import socket
+import http.client
+import response_cache
+from response_cache import CachedResponse
+from ej2a1 import create_server, HELLO
+
+
+@pytest.fixture(params=[{"workers": 2}, {"backend": "async"}], ids=["pool", "async"])
+def server(request):
+    """
+    Fixture para iniciar y detener el servidor de ej2a1 con cada tipo de servidor
+    """
+    server = create_server(host="localhost", port=0, **request.param)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join(1)
+
+
+def test_encode():
+    """
+    La respuesta se codifica completa con la fecha actual
+    """
+    response = CachedResponse(404, "text/plain", b"Not Found", {"X-Test": "1"})
+    data = response.encode(server="Test/1.0", connection="close")
+    head, body = data.split(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    assert lines[0] == "HTTP/1.1 404 Not Found"
+    assert lines[1] == "Server: Test/1.0"
+    assert lines[2] == "Date: " + response_cache.http_date().decode()
+    assert lines[3:] == ["Content-Type: text/plain", "Content-Length: 9", "X-Test: 1",
+                         "Connection: close"]
+    assert body == b"Not Found"
+
+    # HEAD: mismas cabeceras, sin cuerpo
+    assert response.encode(server="Test/1.0", connection="close", include_body=False) == head + b"\r\n\r\n"
+
+
+def test_date_is_refreshed(monkeypatch):
+    """
+    La cabecera Date cambia aunque el resto de la respuesta esté guardado
+    """
+    response = CachedResponse(200, "text/plain", b"ok")
+    monkeypatch.setattr(response_cache.time, "time", lambda: 0)
+    assert b"Date: Thu, 01 Jan 1970 00:00:00 GMT\r\n" in response.encode()
+    monkeypatch.setattr(response_cache.time, "time", lambda: 86400)
+    assert b"Date: Fri, 02 Jan 1970 00:00:00 GMT\r\n" in response.encode()
+
+
+def test_is_a_response_tuple():
+    """
+    Se puede usar como cualquier otra respuesta (código, Content-Type, cuerpo, cabeceras)
+    """
+    code, content_type, body, headers = HELLO
+    assert code == HELLO.code == 200
+    assert body == HELLO.body == "¡Hola mundo!".encode("utf-8")
+    assert headers == {}
+
+
+def test_served_over_keep_alive(server):
+    """
+    Las respuestas guardadas mantienen la conexión abierta y respetan HEAD
+    """
+    conn = http.client.HTTPConnection("localhost", server.server_port)
+    for path in ["/", "/invalid", "/"]:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        body = response.read()
+        assert response.headers["Content-Length"] == str(len(body))
+        assert response.headers["Date"]
+    assert body.decode("utf-8") == "¡Hola mundo!"
+    sock = conn.sock
+
+    conn.request("HEAD", "/invalid")
+    response = conn.getresponse()
+    assert response.status == 404
+    assert response.read() == b""
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_connection_close_on_single_thread():
+    """
+    Con un único hilo la respuesta guardada cierra la conexión
+    """
+    server = create_server(host="localhost", port=0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        with socket.create_connection(("localhost", server.server_port), timeout=5) as sock:
+            sock.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            data = b""
+            while chunk := sock.recv(4096):
+                data += chunk
+        assert data.startswith(b"HTTP/1.1 200 OK\r\n")
+        assert b"\r\nConnection: close\r\n" in data
+        assert data.endswith("¡Hola mundo!".encode("utf-8"))
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
@@ -0,0 +1,205 @@
+"""
+Enrutador de peticiones para los servidores basados en http.server.
+
+Las rutas se registran una vez al importar el módulo y se guardan en un árbol (trie)
+por segmentos de la ruta: /product/<int:product_id> se guarda como el segmento fijo
+"product" seguido de un parámetro entero. Buscar una ruta recorre el árbol segmento a
+segmento con diccionarios, así que el coste depende de la longitud de la ruta y no
+del número de rutas registradas.
+
+Ejemplo:
+
+    router = Router()
+
+    @router.route("/product/<int:product_id>")
+    def get_product(product_id):
+        ...
+
+    @router.errorhandler(404)
+    def not_found():
+        ...
+
+    code, content_type, body, *headers = router.dispatch("GET", "/product/1?fields=name")
+
+Los manejadores devuelven (código, Content-Type, cuerpo) o (código, Content-Type,
+cuerpo, cabeceras). match lanza NotFound si ninguna ruta coincide y MethodNotAllowed
+(con los métodos permitidos) si la ruta existe pero no para ese método; dispatch
+convierte esos casos en respuestas 404 y 405 con los manejadores de error registrados.
+"""
+
+from http import HTTPStatus
+from urllib.parse import unquote
+
+
+class NotFound(Exception):
+    """
+    Ninguna ruta coincide con la petición
+    """
+
+
+class MethodNotAllowed(Exception):
+    """
+    La ruta existe pero no admite el método de la petición
+    """
+
+    def __init__(self, allowed):
+        super().__init__(f"Métodos permitidos: {', '.join(allowed)}")
+        self.allowed = allowed
+
+
+def _to_int(segment):
+    # Sólo dígitos ASCII: int() aceptaría también "+1", " 1" o "١"
+    if not segment.isascii() or not segment.isdigit():
+        raise ValueError(segment)
+    return int(segment)
+
+
+def _to_str(segment):
+    return segment
+
+
+# Conversores de parámetros: reciben el segmento y devuelven el valor o lanzan ValueError
+CONVERTERS = {
+    "int": _to_int,
+    "str": _to_str,
+}
+
+
+class _Node:
+    __slots__ = ("static", "params", "handlers")
+
+    def __init__(self):
+        self.static = {}
+        self.params = []
+        self.handlers = {}
+
+
+def split_path(path):
+    """
+    Separa la ruta en segmentos, sin la query string, las barras sobrantes ni %-escapes
+    """
+    path = path.split("?", 1)[0].split("#", 1)[0]
+    return [unquote(segment) for segment in path.split("/") if segment]
+
+
+class Router:
+    """
+    Tabla de rutas organizada como un árbol de segmentos
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._error_handlers = {}
+
+    def add(self, method, pattern, handler):
+        """
+        Registra `handler` para las peticiones `method` a `pattern`
+        """
+        node = self._root
+        for segment in split_path(pattern):
+            if segment.startswith("<") and segment.endswith(">"):
+                converter_name, _, name = segment[1:-1].rpartition(":")
+                converter = CONVERTERS.get(converter_name or "str")
+                if converter is None:
+                    raise ValueError(f"Tipo de parámetro desconocido en {pattern}: {converter_name}")
+                for param_converter, param_name, child in node.params:
+                    if param_converter is converter and param_name == name:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.params.append((converter, name, child))
+                    node = child
+            else:
+                node = node.static.setdefault(segment, _Node())
+
+        method = method.upper()
+        if method in node.handlers:
+            raise ValueError(f"Ruta duplicada: {method} {pattern}")
+        node.handlers[method] = handler
+
+    def route(self, pattern, methods=("GET",)):
+        """
+        Decorador para registrar una función como manejador de una ruta
+        """
+        def decorator(handler):
+            for method in methods:
+                self.add(method, pattern, handler)
+            return handler
+        return decorator
+
+    def errorhandler(self, code):
+        """
+        Decorador para registrar la respuesta de un error (404 o 405)
+        """
+        def decorator(handler):
+            self._error_handlers[code] = handler
+            return handler
+        return decorator
+
+    def dispatch(self, method, path, **context):
+        """
+        Resuelve la petición y devuelve la respuesta del manejador correspondiente
+
+        Los argumentos de `context` se pasan a todos los manejadores, también a los de error.
+        """
+        try:
+            handler, params = self.match(method, path)
+        except NotFound:
+            return self._error(404, context)
+        except MethodNotAllowed as e:
+            code, content_type, body, *headers = self._error(405, context)
+            headers = {**(headers[0] if headers else {}), "Allow": ", ".join(e.allowed)}
+            return code, content_type, body, headers
+        return handler(**params, **context)
+
+    def _error(self, code, context):
+        handler = self._error_handlers.get(code)
+        if handler is not None:
+            return handler(**context)
+        return code, "text/plain; charset=utf-8", HTTPStatus(code).phrase.encode("utf-8")
+
+    def match(self, method, path):
+        """
+        Devuelve (manejador, parámetros) para la petición
+        """
+        found = self._find(self._root, split_path(path), 0, {})
+        if found is None:
+            raise NotFound(path)
+        node, params = found
+
+        method = method.upper()
+        handler = node.handlers.get(method)
+        if handler is None and method == "HEAD":
+            handler = node.handlers.get("GET")
+        if handler is None:
+            raise MethodNotAllowed(self._allowed(node))
+        return handler, params
+
+    def _find(self, node, segments, index, params):
+        if index == len(segments):
+            return (node, params) if node.handlers else None
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._find(child, segments, index + 1, params)
+            if found is not None:
+                return found
+
+        for converter, name, child in node.params:
+            try:
+                value = converter(segment)
+            except ValueError:
+                continue
+            found = self._find(child, segments, index + 1, {**params, name: value})
+            if found is not None:
+                return found
+        return None
+
+    @staticmethod
+    def _allowed(node):
+        allowed = set(node.handlers)
+        if "GET" in allowed:
+            allowed.add("HEAD")
+        return sorted(allowed)
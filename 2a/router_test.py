@@ -0,0 +1,124 @@
+import pytest
+import threading
+import requests
+from router import Router, NotFound, MethodNotAllowed
+from ej2a2 import create_server
+
+
+@pytest.fixture
+def router():
+    router = Router()
+    router.add("GET", "/", lambda: "root")
+    router.add("GET", "/product/<int:product_id>", lambda product_id: product_id)
+    router.add("DELETE", "/product/<int:product_id>", lambda product_id: -product_id)
+    router.add("GET", "/product/latest", lambda: "latest")
+    router.add("GET", "/user/<name>/posts", lambda name: name)
+    return router
+
+
+def test_static_and_typed_params(router):
+    """
+    Los parámetros se convierten a su tipo y las rutas fijas tienen prioridad
+    """
+    handler, params = router.match("GET", "/product/42")
+    assert params == {"product_id": 42}
+    assert handler(**params) == 42
+
+    handler, params = router.match("GET", "/product/latest")
+    assert handler(**params) == "latest"
+
+    handler, params = router.match("GET", "/user/ana/posts")
+    assert params == {"name": "ana"}
+
+
+def test_query_string_and_trailing_slash(router):
+    """
+    La query string y la barra final no afectan a la ruta
+    """
+    assert router.match("GET", "/product/7?fields=name")[1] == {"product_id": 7}
+    assert router.match("GET", "/product/7/")[1] == {"product_id": 7}
+    assert router.match("GET", "/?page=2")[0]() == "root"
+
+
+def test_not_found(router):
+    """
+    Las rutas que no existen o con parámetros inválidos lanzan NotFound
+    """
+    for path in ("/nope", "/product/abc", "/product/-1", "/product/1/extra", "/user/ana"):
+        with pytest.raises(NotFound):
+            router.match("GET", path)
+
+
+def test_method_not_allowed(router):
+    """
+    Una ruta existente con un método no registrado lanza MethodNotAllowed
+    """
+    with pytest.raises(MethodNotAllowed) as info:
+        router.match("POST", "/product/1")
+    assert info.value.allowed == ["DELETE", "GET", "HEAD"]
+
+    assert router.match("HEAD", "/product/1")[0](product_id=1) == 1
+
+
+def test_dispatch_error_handlers():
+    """
+    dispatch responde 404 y 405 con los manejadores de error registrados
+    """
+    router = Router()
+
+    @router.route("/item/<int:item_id>")
+    def item(item_id):
+        return 200, "text/plain", str(item_id).encode()
+
+    @router.errorhandler(404)
+    def not_found():
+        return 404, "text/plain", b"missing"
+
+    assert router.dispatch("GET", "/item/5") == (200, "text/plain", b"5")
+    assert router.dispatch("GET", "/other") == (404, "text/plain", b"missing")
+    code, _, _, headers = router.dispatch("PUT", "/item/5")
+    assert code == 405
+    assert headers == {"Allow": "GET, HEAD"}
+
+
+def test_many_routes():
+    """
+    Con cientos de rutas cada petición sigue llegando a su manejador
+    """
+    router = Router()
+    for i in range(500):
+        router.add("GET", f"/resource{i}/<int:item_id>", lambda item_id, i=i: (i, item_id))
+    for i in (0, 250, 499):
+        handler, params = router.match("GET", f"/resource{i}/9")
+        assert handler(**params) == (i, 9)
+
+
+def test_duplicate_route():
+    """
+    Registrar dos veces la misma ruta y método es un error
+    """
+    router = Router()
+    router.add("GET", "/a/<int:x>", lambda x: x)
+    with pytest.raises(ValueError):
+        router.add("GET", "/a/<int:x>", lambda x: x)
+
+
+def test_server_method_not_allowed():
+    """
+    El servidor de hilos también responde 405 con la cabecera Allow
+    """
+    server = create_server(host="localhost", port=0)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        url = f"http://localhost:{server.server_port}/product/1"
+        response = requests.delete(url)
+        assert response.status_code == 405
+        assert response.headers["Allow"] == "GET, HEAD"
+        assert response.json() == {"error": "Method not allowed"}
+        assert requests.get(url + "?fields=name").json()["id"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(1)
@@ -0,0 +1,46 @@
+"""
+Construcción de los servidores de los ejercicios 2a.
+
+Los create_server de ej2a1, ej2a2 y ej2a3 sólo se diferencian en el manejador y en la
+función de la aplicación, así que delegan en make_server la elección del servidor:
+HTTPServer, PooledHTTPServer o AsyncHTTPServer.
+"""
+
+from http.server import HTTPServer
+from async_server import AsyncHTTPServer
+from pool_server import PooledHTTPServer
+
+
+def make_server(server_address, handler_class, app=None, workers=0, queue_size=64,
+                backend="thread", reuse_port=False):
+    """
+    Crea el servidor HTTP adecuado para las opciones indicadas
+
+    - backend="thread" con workers=0: HTTPServer, una petición cada vez.
+    - backend="thread" con workers > 0: PooledHTTPServer con `workers` hilos y una cola
+      de `queue_size` conexiones.
+    - backend="async": AsyncHTTPServer, que necesita la función `app`.
+
+    Con reuse_port=True el socket se abre con SO_REUSEPORT, para que varios procesos
+    puedan escuchar en el mismo puerto.
+    """
+    if backend == "async":
+        if app is None:
+            raise ValueError("El backend async necesita una función app")
+        return AsyncHTTPServer(server_address, app, reuse_port=reuse_port)
+    if backend != "thread":
+        raise ValueError(f"Backend desconocido: {backend}")
+
+    if workers:
+        server = PooledHTTPServer(server_address, handler_class, workers=workers,
+                                  queue_size=queue_size, bind_and_activate=False)
+    else:
+        server = HTTPServer(server_address, handler_class, bind_and_activate=False)
+    server.allow_reuse_port = reuse_port
+    try:
+        server.server_bind()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    return server
@@ -0,0 +1,82 @@
+"""
+Serialización XML directa para las respuestas de la API de productos.
+
+dict_to_xml + prettify construyen un árbol de ElementTree, lo convierten a texto, lo
+vuelven a parsear con minidom y lo formatean otra vez. Para un diccionario plano basta
+con escribir las etiquetas directamente: iter_xml genera el documento por fragmentos
+(sin construir ningún árbol) y to_xml lo devuelve en bytes.
+
+Hay dos modos: compacto (indent=None, por defecto) y con sangría (indent="  "), que
+produce el mismo texto que prettify.
+
+XMLCache guarda los bytes ya generados de cada elemento y los vuelve a generar cuando
+el elemento cambia.
+"""
+
+from xml.sax.saxutils import escape
+
+XML_DECLARATION = '<?xml version="1.0" ?>'
+
+# Igual que minidom, también se escapan las comillas dobles en el texto
+_ENTITIES = {'"': "&quot;"}
+
+
+def iter_xml(tag, d, indent=None):
+    """
+    Genera el documento XML de un diccionario plano fragmento a fragmento
+    """
+    if indent is None:
+        yield XML_DECLARATION
+        yield f"<{tag}>"
+        for key, val in d.items():
+            yield f"<{key}>{escape(str(val), _ENTITIES)}</{key}>"
+        yield f"</{tag}>"
+        return
+
+    yield XML_DECLARATION + "\n"
+    yield f"<{tag}>\n"
+    for key, val in d.items():
+        yield f"{indent}<{key}>{escape(str(val), _ENTITIES)}</{key}>\n"
+    yield f"</{tag}>\n"
+
+
+def to_xml(tag, d, indent=None):
+    """
+    Devuelve el documento XML de un diccionario plano en bytes UTF-8
+    """
+    return "".join(iter_xml(tag, d, indent)).encode("utf-8")
+
+
+class XMLCache:
+    """
+    Caché de los bytes XML de cada elemento, indexada por su id
+    """
+
+    def __init__(self, tag, indent=None, key="id"):
+        self.tag = tag
+        self.indent = indent
+        self.key = key
+        self._entries = {}
+
+    def get(self, item):
+        """
+        Devuelve los bytes XML del elemento, generándolos sólo si ha cambiado
+        """
+        # Se guarda una copia de los campos junto a los bytes: si el diccionario se ha
+        # modificado desde entonces, la copia ya no coincide y se vuelve a serializar
+        fields = tuple(item.items())
+        entry = self._entries.get(item[self.key])
+        if entry is not None and entry[0] == fields:
+            return entry[1]
+        body = to_xml(self.tag, item, self.indent)
+        self._entries[item[self.key]] = (fields, body)
+        return body
+
+    def invalidate(self, item_id=None):
+        """
+        Descarta los bytes de un elemento, o de todos si no se indica id
+        """
+        if item_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(item_id, None)
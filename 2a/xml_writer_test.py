@@ -0,0 +1,49 @@
+import xml.etree.ElementTree as ET
+from xml_writer import XMLCache, to_xml
+from ej2a3 import dict_to_xml, prettify, products
+
+
+def test_indented_matches_prettify():
+    """
+    Con sangría, to_xml produce exactamente lo mismo que dict_to_xml + prettify
+    """
+    items = products + [{"id": 9, "name": 'A & <b> "q"', "price": 1}]
+    for item in items:
+        assert to_xml("product", item, "  ") == prettify(dict_to_xml("product", item))
+
+
+def test_compact_is_equivalent():
+    """
+    El modo compacto tiene los mismos elementos y textos
+    """
+    item = {"id": 9, "name": "Café & <té>", "price": 2.5}
+    root = ET.fromstring(to_xml("product", item))
+    assert root.tag == "product"
+    assert [(child.tag, child.text) for child in root] == [
+        ("id", "9"), ("name", "Café & <té>"), ("price", "2.5")
+    ]
+
+
+def test_cache_reuses_bytes():
+    """
+    La caché devuelve los mismos bytes mientras el producto no cambia
+    """
+    cache = XMLCache("product")
+    item = {"id": 1, "name": "Laptop", "price": 999.99}
+    first = cache.get(item)
+    assert cache.get(item) is first
+
+
+def test_cache_detects_changes():
+    """
+    Si el producto cambia, la caché vuelve a generar su XML
+    """
+    cache = XMLCache("product")
+    item = {"id": 1, "name": "Laptop", "price": 999.99}
+    cache.get(item)
+    item["price"] = 899.99
+    assert ET.fromstring(cache.get(item)).find("price").text == "899.99"
+
+    first = cache.get(item)
+    cache.invalidate(1)
+    assert cache.get(item) is not first
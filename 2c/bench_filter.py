@@ -0,0 +1,97 @@
+"""
+Benchmark del filtrado de /products: listas por comprensión frente a ColumnarCatalog.
+
+Para cada tamaño se genera un catálogo aleatorio (10 categorías, precios entre 0 y 1000)
+y se mide la consulta category + min_price + max_price (alrededor del 1% de los
+productos) con:
+
+- lista por comprensión: un filtro por campo sobre la lista de diccionarios, como
+  hacía get_products en ej2c3 antes de usar índices
+- ColumnarCatalog.filter_ids: la máscara vectorizada, devolviendo sólo los ids
+- ColumnarCatalog.filter: la máscara más la creación de los productos encontrados
+
+Las columnas se generan directamente con NumPy. La lista de diccionarios sólo se crea
+hasta --list-limit productos: 10 millones de diccionarios ocupan varios GB.
+
+Uso:
+    python bench_filter.py                                   # 10k, 1M y 10M
+    python bench_filter.py --sizes 10000,100000 --repeat 10
+"""
+
+import argparse
+import time
+import timeit
+import numpy as np
+from columnar import ColumnarCatalog
+
+CATEGORIES = [f"category{i}" for i in range(10)]
+QUERY = {"category": "category3", "min_price": 100.0, "max_price": 200.0}
+
+
+def make_columns(size, seed=0):
+    """
+    Genera las columnas de un catálogo aleatorio
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, size + 1, dtype=np.int64)
+    prices = np.round(rng.uniform(0, 1000, size), 2)
+    codes = rng.integers(0, len(CATEGORIES), size, dtype=np.int32)
+    names = [f"Product {i}" for i in range(1, size + 1)]
+    return ids, names, prices, codes
+
+
+def list_filter(products, category, min_price, max_price):
+    """
+    Filtrado original de ej2c3: una lista nueva por cada filtro
+    """
+    filtered = products
+    filtered = [p for p in filtered if p["category"] == category]
+    filtered = [p for p in filtered if p["price"] >= min_price]
+    filtered = [p for p in filtered if p["price"] <= max_price]
+    return filtered
+
+
+def measure(func, repeat):
+    number = max(1, repeat)
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main(sizes, repeat, list_limit):
+    print(f"{'productos':>12}{'lista ms':>12}{'ids ms':>12}{'productos ms':>14}"
+          f"{'mejora ids':>12}{'resultados':>12}")
+    for size in sizes:
+        ids, names, prices, codes = make_columns(size)
+        start = time.perf_counter()
+        catalog = ColumnarCatalog.from_columns(ids, names, prices, codes, CATEGORIES)
+        build = time.perf_counter() - start
+
+        ids_time = measure(lambda: catalog.filter_ids(**QUERY), repeat)
+        rows_time = measure(lambda: catalog.filter(**QUERY), repeat)
+        found = len(catalog.filter_ids(**QUERY))
+
+        list_time = None
+        if size <= list_limit:
+            products = [
+                {"id": i, "name": n, "price": p, "category": CATEGORIES[c]}
+                for i, n, p, c in zip(ids.tolist(), names, prices.tolist(), codes.tolist())
+            ]
+            assert len(list_filter(products, **QUERY)) == found
+            list_time = measure(lambda: list_filter(products, **QUERY), repeat)
+            del products
+
+        list_ms = f"{list_time * 1000:>12.2f}" if list_time else f"{'-':>12}"
+        speedup = f"{list_time / ids_time:>11.1f}x" if list_time else f"{'-':>12}"
+        print(f"{size:>12}{list_ms}{ids_time * 1000:>12.2f}{rows_time * 1000:>14.2f}"
+              f"{speedup}{found:>12}   (construcción {build:.1f} s)")
+        del catalog, ids, names, prices, codes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark del filtrado de productos")
+    parser.add_argument("--sizes", default="10000,1000000,10000000",
+                        help="tamaños del catálogo separados por comas")
+    parser.add_argument("--repeat", type=int, default=5, help="consultas por medición")
+    parser.add_argument("--list-limit", type=int, default=1000000,
+                        help="tamaño máximo para el que se crea la lista de diccionarios")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")], args.repeat, args.list_limit)
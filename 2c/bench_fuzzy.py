@@ -0,0 +1,83 @@
+"""
+Benchmark de la búsqueda aproximada por nombre: FuzzyIndex frente a comparar con
+todos los nombres.
+
+Los nombres se generan combinando marcas, productos y modelos ("Acme Smartphone X12"),
+así que el vocabulario es mucho menor que el catálogo. Se compara:
+
+- recorrido: la similitud de trigramas de la búsqueda con cada palabra de cada nombre,
+  que es lo que haría cualquier búsqueda sin índice (sólo hasta --scan-limit productos)
+- índice: FuzzyIndex.search con limit=20
+
+Uso:
+    python bench_fuzzy.py                          # 10k, 100k y 1M productos
+    python bench_fuzzy.py --sizes 10000 --query "wireles hedphones"
+"""
+
+import argparse
+import random
+import time
+import timeit
+from fuzzy import FuzzyIndex, word_trigrams, words
+
+BRANDS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark", "Wayne"]
+ITEMS = ["Smartphone", "Laptop", "Tablet", "Headphones", "Speaker", "Monitor", "Keyboard",
+         "Mouse", "Camera", "Printer", "Router", "Charger", "Watch", "Desk", "Chair", "Lamp",
+         "Blender", "Toaster", "Kettle", "Microwave"]
+ADJECTIVES = ["Wireless", "Portable", "Smart", "Ergonomic", "Compact", "Pro", "Mini", "Ultra"]
+
+
+def make_names(size, seed=0):
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(ITEMS)} "
+        f"{rng.choice('XYZ')}{rng.randrange(100)}"
+        for _ in range(size)
+    ]
+
+
+def scan(names, query, threshold=0.3, limit=20):
+    """
+    Búsqueda sin índice: puntúa todas las palabras de todos los nombres
+    """
+    terms = [word_trigrams(term) for term in words(query)]
+    scored = []
+    for key, name in enumerate(names):
+        grams = [word_trigrams(word) for word in words(name)]
+        total = sum(max((len(t & g) / len(t | g) for g in grams), default=0.0) for t in terms)
+        if total / len(terms) >= threshold:
+            scored.append((-total / len(terms), key))
+    scored.sort()
+    return [key for _, key in scored[:limit]]
+
+
+def main(sizes, query, scan_limit, number):
+    print(f"{'productos':>10}{'recorrido ms':>14}{'índice ms':>12}{'vocabulario':>13}"
+          f"{'construcción s':>16}")
+    for size in sizes:
+        names = make_names(size)
+        start = time.perf_counter()
+        index = FuzzyIndex(enumerate(names))
+        build = time.perf_counter() - start
+
+        search_time = min(timeit.repeat(lambda: index.search(query, limit=20), number=number,
+                                        repeat=3)) / number
+        scan_ms = f"{'-':>14}"
+        if size <= scan_limit:
+            expected = [key for key, _ in index.search(query, limit=20)]
+            assert scan(names, query) == expected
+            scan_time = min(timeit.repeat(lambda: scan(names, query), number=1, repeat=1))
+            scan_ms = f"{scan_time * 1000:>14.1f}"
+        print(f"{size:>10}{scan_ms}{search_time * 1000:>12.2f}{len(index):>13}{build:>16.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda aproximada")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="tamaños del catálogo separados por comas")
+    parser.add_argument("--query", default="smarphone", help="texto buscado")
+    parser.add_argument("--scan-limit", type=int, default=100000,
+                        help="tamaño máximo para el que se mide el recorrido completo")
+    parser.add_argument("--number", type=int, default=5, help="búsquedas por medición")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")], args.query, args.scan_limit, args.number)
@@ -0,0 +1,112 @@
+"""
+Benchmark de la persistencia de tareas (task_log.py).
+
+Escritura: varios hilos crean tareas a la vez en un TaskStore con registro y fsync. Se
+informa de las escrituras por segundo y de cuántas escrituras comparte cada fsync
+gracias al group commit (con un solo hilo, una por fsync), y se compara con el almacén
+sólo en memoria.
+
+Arranque en frío: se crea un directorio con --tasks tareas y se mide lo que tarda en
+abrirse reproduciendo todo el registro frente a cargando un snapshot y reproduciendo
+sólo la cola del registro (las últimas --tail escrituras).
+
+Uso:
+    python bench_task_log.py                       # 1, 4 y 16 hilos; 100.000 tareas
+    python bench_task_log.py --threads 1,8 -d 5 --tasks 1000000
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from task_log import TaskLog
+from task_store import TaskStore
+
+
+def write_throughput(store, threads, duration):
+    """
+    Devuelve las escrituras por segundo de `threads` hilos creando tareas
+    """
+    stop = time.perf_counter() + duration
+    counts = [0] * threads
+
+    def worker(index):
+        while time.perf_counter() < stop:
+            store.add(f"Tarea {index}-{counts[index]}")
+            counts[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def create(store, count, batch_size=1000):
+    """
+    Crea exactamente `count` tareas en lotes de como mucho batch_size
+    """
+    while count > 0:
+        size = min(batch_size, count)
+        store.apply([("create", None, "Tarea de prueba")] * size)
+        count -= size
+
+
+def cold_start(tasks, tail, snapshot):
+    """
+    Devuelve (segundos, cambios reproducidos) al abrir un directorio con `tasks` tareas
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        # El snapshot se guarda justo tras las primeras tasks - tail escrituras y la cola
+        # se escribe después, sin llegar a otro snapshot
+        log = TaskLog(directory, snapshot_every=tasks - tail if snapshot else tasks * 2,
+                      fsync=False)
+        store = TaskStore(log)
+        create(store, tasks - tail)
+        log.snapshot_every = tasks * 2
+        create(store, tail)
+        store.close()
+
+        start = time.perf_counter()
+        store = TaskStore(TaskLog(directory))
+        elapsed = time.perf_counter() - start
+        store.close()
+        # Se vuelve a leer sólo para contar los cambios reproducidos
+        log = TaskLog(directory)
+        _, _, replayed = log.recover()
+        log.close()
+        return elapsed, replayed
+
+
+def main(threads_list, duration, tasks, tail):
+    print(f"{'hilos':>6}{'memoria esc/s':>16}{'registro esc/s':>17}{'esc/fsync':>12}")
+    for threads in threads_list:
+        memory = write_throughput(TaskStore(), threads, duration)
+        with tempfile.TemporaryDirectory() as directory:
+            log = TaskLog(directory)
+            store = TaskStore(log)
+            durable = write_throughput(store, threads, duration)
+            store.close()
+            per_sync = log.entries / max(1, log.syncs)
+        print(f"{threads:>6}{memory:>16.0f}{durable:>17.0f}{per_sync:>12.1f}")
+
+    print()
+    print(f"{'arranque':<24}{'segundos':>10}{'reproducidos':>14}")
+    for label, snapshot in (("registro completo", False), ("snapshot + cola", True)):
+        elapsed, replayed = cold_start(tasks, tail, snapshot)
+        print(f"{label:<24}{elapsed:>10.3f}{replayed:>14}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de la persistencia de tareas")
+    parser.add_argument("--threads", default="1,4,16", help="hilos escritores separados por comas")
+    parser.add_argument("-d", "--duration", type=float, default=3.0, help="segundos por medición")
+    parser.add_argument("--tasks", type=int, default=100000, help="tareas para el arranque en frío")
+    parser.add_argument("--tail", type=int, default=1000,
+                        help="escrituras posteriores al snapshot en el arranque en frío")
+    args = parser.parse_args()
+    if not 0 <= args.tail < args.tasks:
+        parser.error("--tail debe estar entre 0 y --tasks - 1")
+    main([int(n) for n in args.threads.split(",")], args.duration, args.tasks, args.tail)
@@ -0,0 +1,74 @@
+"""
+Benchmark de las consultas top-k de /products (sort=price&order=desc&limit=k).
+
+Para cada tamaño de catálogo se comparan:
+
+- orden completo: sorted() de todos los productos y quedarse con los k primeros
+- índice de precios: ProductCatalog recorre k posiciones del índice ordenado
+- montículo: ProductCatalog con un filtro de categoría selecciona los k primeros de sus
+  candidatos con heapq.nlargest
+- columnas: ColumnarCatalog elige los k primeros con np.partition
+
+El recorrido del índice no depende del tamaño del catálogo (O(log n + k)); el montículo
+es O(n log k) sobre los candidatos y el orden completo, O(n log n).
+
+Uso:
+    python bench_topk.py                         # 10k, 100k y 1M productos, k = 20
+    python bench_topk.py --sizes 10000,100000 -k 100
+"""
+
+import argparse
+import random
+import timeit
+from catalog import ProductCatalog
+from columnar import ColumnarCatalog
+
+CATEGORIES = [f"category{i}" for i in range(10)]
+
+
+def make_products(size, seed=0):
+    rng = random.Random(seed)
+    return [
+        {"id": i, "name": f"Item {i}", "price": round(rng.uniform(0, 1000), 2),
+         "category": rng.choice(CATEGORIES)}
+        for i in range(1, size + 1)
+    ]
+
+
+def measure(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main(sizes, k, number):
+    print(f"{'productos':>10}{'orden ms':>12}{'índice ms':>12}{'montículo ms':>14}"
+          f"{'columnas ms':>13}")
+    for size in sizes:
+        products = make_products(size)
+        catalog = ProductCatalog(products)
+        columnar = ColumnarCatalog(products)
+        query = {"sort": "price", "descending": True, "limit": k}
+
+        def full_sort():
+            return sorted(products, key=lambda p: (p["price"], p["id"]), reverse=True)[:k]
+
+        expected = full_sort()
+        assert catalog.page(**query)[0] == expected
+        assert columnar.page(**query)[0] == expected
+
+        times = [
+            measure(full_sort, number),
+            measure(lambda: catalog.page(**query), number),
+            measure(lambda: catalog.page(category="category3", **query), number),
+            measure(lambda: columnar.page(**query), number),
+        ]
+        print(f"{size:>10}" + "".join(f"{t * 1000:>{w}.3f}" for t, w in zip(times, (12, 12, 14, 13))))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de las consultas top-k")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="tamaños del catálogo separados por comas")
+    parser.add_argument("-k", type=int, default=20, help="número de productos de la página")
+    parser.add_argument("--number", type=int, default=5, help="consultas por medición")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")], args.k, args.number)
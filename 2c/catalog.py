@@ -0,0 +1,665 @@
+"""
+Catálogo de productos indexado por id para las APIs de productos de Flask.
+
+Buscar un producto con next(p for p in products if p["id"] == product_id) recorre la
+lista entera, así que el tiempo crece con el tamaño del catálogo. ProductCatalog guarda
+los productos en un diccionario por id (búsqueda O(1)) y, si se le da una función de
+serialización, guarda también el cuerpo de la respuesta de cada producto ya codificado.
+
+Para filtrar sin recorrer todo el catálogo se mantienen además índices secundarios:
+
+- category: diccionario categoría -> ids (índice hash).
+- price: precios ordenados, con empates por id, y sus ids en el mismo orden, así que
+  un rango [min_price, max_price] son dos búsquedas con bisect.
+- name: índice invertido de trigramas (grupos de 3 caracteres) de los nombres en
+  minúsculas. Un nombre que contiene la cadena buscada contiene todos sus trigramas,
+  así que los candidatos son la intersección de sus listas; después se comprueba la
+  subcadena. Las búsquedas de menos de 3 caracteres no tienen trigramas y se comprueban
+  sobre los candidatos del resto de filtros.
+
+Para los recuentos por faceta (facets()) se mantienen también los precios ordenados de
+cada categoría: el número de productos de una categoría en un rango de precios son dos
+búsquedas con bisect, sin recorrer los productos. Con esas listas y la suma de los
+precios de cada categoría, que se actualiza en cada escritura, price_stats() devuelve
+count, sum, min, max y avg por categoría en O(1): el mínimo y el máximo son el primer y
+el último elemento de la lista, también después de borrar.
+
+Al combinar filtros se recorre el conjunto de candidatos más pequeño y se comprueba si
+cada id está en los demás, de más a menos selectivo, en lugar de aplicar cada filtro a
+todo el catálogo. La selectividad de cada filtro sale de los propios índices (el tamaño
+de cada categoría y de cada trigrama, y el número de precios de un rango, dos búsquedas
+con bisect), así que es exacta. explain() devuelve el plan elegido con las filas
+estimadas y reales de cada paso.
+
+Cada producto tiene una posición (su orden de inserción) que no cambia al actualizarlo.
+page() pagina por posición (keyset): cada página empieza detrás de la posición del
+último producto de la anterior, así que insertar o borrar productos entre dos páginas
+no repite ni salta resultados.
+
+Los resultados también se pueden ordenar por id, name o price (con empates por id, en
+el mismo sentido, y los productos sin ese campo al final). Para una página de k
+resultados no se ordena todo el resultado: ordenados por precio sin más filtros que el
+precio, se recorren k posiciones del índice de precios; en el resto de casos se
+seleccionan los k primeros con un montículo (heapq.nsmallest / nlargest). En ese caso
+el cursor de la página es la clave (valor, id) del último producto.
+
+search() busca por nombre de forma aproximada (tolerante a erratas) con un FuzzyIndex
+de las palabras de los nombres, que se crea en la primera búsqueda y a partir de
+entonces se mantiene en cada escritura.
+
+Insertar, actualizar o borrar un producto mantiene los índices, descarta el cuerpo
+guardado e incrementa `version`, que permite invalidar las cachés de resultados. Los
+productos se copian al entrar en el catálogo, así que sólo cambian a través de sus
+métodos.
+"""
+
+import bisect
+import heapq
+import itertools
+import math
+import sys
+import threading
+from fuzzy import DEFAULT_THRESHOLD, FuzzyIndex
+
+
+def trigrams(text):
+    """
+    Devuelve el conjunto de trigramas de un texto en minúsculas
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def is_nan(value):
+    """
+    Indica si un límite de precio es NaN (None no lo es)
+    """
+    return value is not None and math.isnan(value)
+
+
+class _Slice:
+    """
+    Tramo [lo, hi) de una lista que sólo se copia si se recorre: el paso del precio
+    de un plan que sólo se usa para comprobar no cuesta nada
+    """
+
+    __slots__ = ("items", "lo", "hi")
+
+    def __init__(self, items, lo, hi):
+        self.items = items
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __iter__(self):
+        return iter(self.items[self.lo:self.hi])
+
+
+class ProductCatalog:
+    """
+    Productos indexados por id con su respuesta codificada
+    """
+
+    def __init__(self, products=(), encode=None):
+        # encode: función que recibe un producto y devuelve los bytes de su respuesta
+        self.encode = encode
+        self._by_id = {}
+        self._bodies = {}
+        self._lock = threading.RLock()
+        # Se incrementa en cada escritura
+        self.version = 0
+        # Orden de inserción de cada id, para devolver los resultados en el orden del catálogo
+        self._position = {}
+        self._next_position = 0
+        # Posiciones de los productos en orden y el id que ocupa cada una
+        self._order = []
+        self._at = {}
+        # Índices secundarios
+        self._by_category = {}
+        self._price_keys = []
+        self._price_ids = []
+        self._category_prices = {}
+        self._category_sums = {}
+        self._by_trigram = {}
+        self._names = {}
+        self._fuzzy = None
+        with self._lock:
+            for product in products:
+                self._add(product, index_price=False)
+            # La lista de precios se ordena una sola vez en lugar de insertar uno a uno
+            pairs = sorted((p["price"], p["id"]) for p in self._by_id.values() if "price" in p)
+            self._price_keys = [price for price, _ in pairs]
+            self._price_ids = [product_id for _, product_id in pairs]
+            for category, ids in self._by_category.items():
+                prices = sorted(self._by_id[i]["price"] for i in ids if "price" in self._by_id[i])
+                if prices:
+                    self._category_prices[category] = prices
+                    self._category_sums[category] = math.fsum(prices)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    def __contains__(self, product_id):
+        return product_id in self._by_id
+
+    def get(self, product_id):
+        """
+        Devuelve el producto con ese id, o None si no existe
+        """
+        return self._by_id.get(product_id)
+
+    def body(self, product_id):
+        """
+        Devuelve la respuesta codificada del producto, o None si no existe
+        """
+        body = self._bodies.get(product_id)
+        if body is None:
+            product = self._by_id.get(product_id)
+            if product is None:
+                return None
+            body = self.encode(product)
+            with self._lock:
+                # Sólo se guarda si el producto no ha cambiado mientras se codificaba
+                if self._by_id.get(product_id) is product:
+                    self._bodies[product_id] = body
+        return body
+
+    def bodies(self, product_ids):
+        """
+        Devuelve (respuestas codificadas, ids que no existen) de varios productos en una
+        sola pasada, en el orden pedido y sin repetir ids
+        """
+        found = []
+        missing = []
+        for product_id in dict.fromkeys(product_ids):
+            body = self.body(product_id)
+            if body is None:
+                missing.append(product_id)
+            else:
+                found.append(body)
+        return found, missing
+
+    def insert(self, product):
+        """
+        Añade un producto; lanza ValueError si ya existe uno con el mismo id
+        """
+        with self._lock:
+            product = self._add(product)
+            self.version += 1
+            return product
+
+    def update(self, product_id, **fields):
+        """
+        Modifica los campos de un producto; devuelve None si no existe
+        """
+        with self._lock:
+            current = self._by_id.get(product_id)
+            if current is None:
+                return None
+            # Se sustituye el diccionario en lugar de modificarlo para que las lecturas
+            # concurrentes vean el producto antiguo o el nuevo, nunca uno a medias
+            product = {**current, **fields, "id": product_id}
+            self._unindex(current)
+            self._by_id[product_id] = product
+            self._index(product)
+            self._bodies.pop(product_id, None)
+            self.version += 1
+        return product
+
+    def delete(self, product_id):
+        """
+        Borra un producto; devuelve el producto borrado o None si no existía
+        """
+        with self._lock:
+            product = self._by_id.pop(product_id, None)
+            self._bodies.pop(product_id, None)
+            if product is not None:
+                position = self._position.pop(product_id)
+                del self._order[bisect.bisect_left(self._order, position)]
+                del self._at[position]
+                self._unindex(product)
+                self.version += 1
+        return product
+
+    def filter(self, category=None, min_price=None, max_price=None, name=None, sort=None,
+               descending=False):
+        """
+        Devuelve los productos que cumplen todos los filtros dados
+
+        - category: categoría exacta
+        - min_price / max_price: precio dentro del rango (ambos incluidos)
+        - name: el nombre contiene la cadena, sin distinguir mayúsculas
+
+        Sin `sort` se devuelven en el orden del catálogo; con sort ("id", "name" o
+        "price") se ordenan por ese campo y por id.
+        """
+        with self._lock:
+            ids = self._select_any(category, min_price, max_price, name, sort, descending)
+            return [self._by_id[i] for i in ids]
+
+    def iter_filter(self, category=None, min_price=None, max_price=None, name=None, sort=None,
+                    descending=False):
+        """
+        Como filter, pero devuelve los productos de uno en uno
+
+        Sólo se guardan los ids encontrados; los productos borrados mientras se recorre
+        el resultado se omiten.
+        """
+        with self._lock:
+            ids = self._select_any(category, min_price, max_price, name, sort, descending)
+        for product_id in ids:
+            product = self._by_id.get(product_id)
+            if product is not None:
+                yield product
+
+    def page(self, category=None, min_price=None, max_price=None, name=None, after=None,
+             limit=100, sort=None, descending=False):
+        """
+        Devuelve una página de resultados: (productos, clave para la siguiente página)
+
+        `after` es la clave devuelta por la página anterior (None para la primera): la
+        posición del último producto o, si se ordena por un campo, su (valor, id). Si no
+        quedan más resultados, la clave devuelta es None.
+        """
+        with self._lock:
+            ids = self._select_any(category, min_price, max_price, name, sort, descending,
+                                   after, limit + 1)
+            more = len(ids) > limit
+            ids = ids[:limit]
+            products = [self._by_id[i] for i in ids]
+            if not more:
+                return products, None
+            if sort is None:
+                return products, self._position[ids[-1]]
+            return products, (products[-1].get(sort), ids[-1])
+
+    def facets(self, category=None, min_price=None, max_price=None, name=None,
+               buckets=(0, 100, 250, 500, 1000)):
+        """
+        Devuelve cuántos productos cumplen los filtros, en total, por categoría y por
+        intervalo de precio
+
+        `buckets` son los límites de los intervalos en orden creciente: (0, 100, 500)
+        da [0, 100), [100, 500) y [500, ∞). El resultado es un diccionario con "total",
+        "categories" (categoría -> número, sin las que no tienen productos) y
+        "price_buckets" (una lista de {"min", "max", "count"}; max es None en el último).
+        """
+        edges = list(buckets)
+        with self._lock:
+            if name is not None:
+                # La búsqueda por nombre no tiene recuentos precalculados: se cuentan los
+                # candidatos de los índices
+                ids = self._select(category, min_price, max_price, name, ordered=False)
+                categories = {}
+                bucket_counts = [0] * len(edges)
+                for product_id in ids:
+                    product = self._by_id[product_id]
+                    if product.get("category") is not None:
+                        categories[product["category"]] = categories.get(product["category"], 0) + 1
+                    if "price" in product:
+                        index = bisect.bisect_right(edges, product["price"]) - 1
+                        if index >= 0:
+                            bucket_counts[index] += 1
+                total = len(ids)
+            else:
+                if category is None:
+                    prices, scopes = self._price_keys, self._by_category
+                else:
+                    prices = self._category_prices.get(category, [])
+                    scopes = {category: self._by_category[category]} if category in self._by_category else {}
+                unfiltered = min_price is None and max_price is None
+                categories = {}
+                for scope, ids in scopes.items():
+                    # Sin rango de precios cuentan también los productos sin precio
+                    count = len(ids) if unfiltered else self._count_prices(
+                        self._category_prices.get(scope, []), min_price, max_price)
+                    if count:
+                        categories[scope] = count
+                if unfiltered:
+                    total = len(self._by_id) if category is None else categories.get(category, 0)
+                else:
+                    total = self._count_prices(prices, min_price, max_price)
+                bucket_counts = [
+                    self._count_prices(prices, low if min_price is None else max(low, min_price),
+                                       max_price, high)
+                    for low, high in zip(edges, edges[1:] + [None])
+                ]
+        return {
+            "total": total,
+            "categories": categories,
+            "price_buckets": [
+                {"min": low, "max": high, "count": count}
+                for low, high, count in zip(edges, edges[1:] + [None], bucket_counts)
+            ],
+        }
+
+    def search(self, query, category=None, min_price=None, max_price=None,
+               threshold=DEFAULT_THRESHOLD, limit=100):
+        """
+        Devuelve los productos cuyo nombre se parece a `query`, como una lista de
+        (producto, puntuación) de mayor a menor puntuación (con empates por id)
+
+        Sólo se devuelven los que tienen puntuación >= threshold y cumplen el resto de
+        filtros; como mucho `limit`.
+        """
+        with self._lock:
+            if self._fuzzy is None:
+                self._fuzzy = FuzzyIndex(
+                    (product_id, product["name"]) for product_id, product in self._by_id.items()
+                    if "name" in product)
+            accept = None
+            if category is not None or min_price is not None or max_price is not None:
+                def accept(product_id):
+                    product = self._by_id[product_id]
+                    if category is not None and product.get("category") != category:
+                        return False
+                    if min_price is None and max_price is None:
+                        return True
+                    if "price" not in product:
+                        return False
+                    return ((min_price is None or product["price"] >= min_price)
+                            and (max_price is None or product["price"] <= max_price))
+            matches = self._fuzzy.search(query, threshold, limit, accept)
+            return [(self._by_id[product_id], score) for product_id, score in matches]
+
+    def price_stats(self, category=None):
+        """
+        Devuelve count, sum, min, max y avg de los precios de una categoría, o un
+        diccionario categoría -> estadísticas de todas si no se indica ninguna
+
+        Una categoría sin productos con precio devuelve None. sum y avg se redondean a
+        céntimos. No recorre los productos: usa los agregados que se actualizan en cada
+        escritura.
+        """
+        with self._lock:
+            if category is not None:
+                return self._category_stats(category)
+            return {scope: self._category_stats(scope) for scope in self._category_prices}
+
+    def _category_stats(self, category):
+        prices = self._category_prices.get(category)
+        if not prices:
+            return None
+        total = self._category_sums[category]
+        return {
+            "count": len(prices),
+            "sum": round(total, 2),
+            "min": prices[0],
+            "max": prices[-1],
+            "avg": round(total / len(prices), 2),
+        }
+
+    @staticmethod
+    def _count_prices(prices, min_price, max_price, below=None):
+        """
+        Cuenta los precios de una lista ordenada que están en [min_price, max_price] y
+        son menores que `below`
+        """
+        if is_nan(min_price) or is_nan(max_price):
+            return 0
+        lo = 0 if min_price is None else bisect.bisect_left(prices, min_price)
+        hi = len(prices) if max_price is None else bisect.bisect_right(prices, max_price)
+        if below is not None:
+            hi = min(hi, bisect.bisect_left(prices, below))
+        return max(0, hi - lo)
+
+    def _select_any(self, category, min_price, max_price, name, sort, descending, after=None,
+                    limit=None):
+        if sort is None:
+            return self._select(category, min_price, max_price, name, after, limit)
+        return self._select_sorted(category, min_price, max_price, name, sort, descending,
+                                   after, limit)
+
+    def _select_sorted(self, category, min_price, max_price, name, sort, descending,
+                       after=None, limit=None):
+        """
+        Devuelve los ids que cumplen los filtros ordenados por (sort, id), empezando detrás
+        de la clave `after` y como mucho `limit`
+        """
+        if (sort == "price" and category is None and name is None
+                and (after is None or after[0] is not None)
+                and (min_price is not None or max_price is not None
+                     or len(self._price_ids) == len(self._by_id))):
+            return self._walk_prices(min_price, max_price, descending, after, limit)
+
+        # Los productos sin el campo van detrás de los demás en los dos sentidos, como
+        # los NaN de ColumnarCatalog
+        missing = -1 if descending else 1
+
+        def key(product_id):
+            product = self._by_id[product_id]
+            if sort not in product:
+                return missing, 0, product_id
+            return 0, product[sort], product_id
+
+        ids = self._select(category, min_price, max_price, name, ordered=False)
+        if after is not None:
+            value, product_id = after
+            after = (missing, 0, product_id) if value is None else (0, value, product_id)
+            if descending:
+                ids = [i for i in ids if key(i) < after]
+            else:
+                ids = [i for i in ids if key(i) > after]
+        if limit is None or limit >= len(ids):
+            return sorted(ids, key=key, reverse=descending)
+        # Selección parcial con un montículo de `limit` elementos: O(n log k)
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(limit, ids, key=key)
+
+    def _walk_prices(self, min_price, max_price, descending, after, limit):
+        """
+        Devuelve los ids del rango de precios en el orden del índice de precios
+        """
+        lo, hi = self._price_range(min_price, max_price)
+        if after is not None:
+            # Posición en el índice de la clave (precio, id) del último producto devuelto
+            price, product_id = after
+            start = bisect.bisect_left(self._price_keys, price, lo, hi)
+            end = bisect.bisect_right(self._price_keys, price, start, hi)
+            if descending:
+                hi = bisect.bisect_left(self._price_ids, product_id, start, end)
+            else:
+                lo = bisect.bisect_right(self._price_ids, product_id, start, end)
+        indexes = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        if limit is not None:
+            indexes = indexes[:limit]
+        return [self._price_ids[k] for k in indexes]
+
+    def _select(self, category, min_price, max_price, name, after=None, limit=None,
+                ordered=True):
+        """
+        Devuelve los ids que cumplen los filtros en el orden del catálogo, empezando
+        detrás de la posición `after` y como mucho `limit` (se llama con el cerrojo tomado)
+
+        Con ordered=False los ids pueden venir en cualquier orden.
+        """
+        plan = self._plan(category, min_price, max_price, name)
+        sources = [(size, ids, check) for size, _, _, ids, check in plan if ids is not None]
+        predicates = [check for _, _, _, ids, check in plan if ids is None]
+
+        if not sources:
+            # Sin índices que usar se recorre el catálogo desde la posición `after`
+            start = 0 if after is None else bisect.bisect_right(self._order, after)
+            ids = (self._at[self._order[k]] for k in range(start, len(self._order)))
+            ids = (i for i in ids if all(check(i) for check in predicates))
+            return list(itertools.islice(ids, limit))
+
+        # Se recorre el conjunto más pequeño y se comprueba el resto
+        sources.sort(key=lambda source: source[0])
+        size, ids, _ = sources[0]
+        if size == 0:
+            return []
+        checks = [check for _, _, check in sources[1:]] + predicates
+        if after is not None:
+            checks.append(lambda i: self._position[i] > after)
+        matches = [i for i in ids if all(check(i) for check in checks)]
+        if ordered:
+            matches.sort(key=self._position.__getitem__)
+        return matches[:limit]
+
+    def _plan(self, category, min_price, max_price, name):
+        """
+        Devuelve el plan de una consulta: sus pasos (filas, filtro, acceso, ids, comprobación)
+        de más a menos selectivo (se llama con el cerrojo tomado)
+
+        Las filas de cada índice son exactas: el tamaño del conjunto de la categoría o del
+        trigrama y el número de precios del rango, que son dos búsquedas con bisect. La
+        comprobación de la subcadena del nombre no tiene índice (ids None) y va la última.
+        """
+        plan = []
+        if category is not None:
+            ids = self._by_category.get(category, set())
+            plan.append((len(ids), "category", "category index", ids, ids.__contains__))
+
+        if min_price is not None or max_price is not None:
+            lo, hi = self._price_range(min_price, max_price)
+            # Precios mínimo y máximo del rango encontrado (si está vacío no se comprueba nada)
+            low = self._price_keys[lo] if lo < hi else None
+            high = self._price_keys[hi - 1] if lo < hi else None
+
+            def in_range(product_id):
+                product = self._by_id[product_id]
+                return "price" in product and low <= product["price"] <= high
+
+            plan.append((hi - lo, "price", "price index", _Slice(self._price_ids, lo, hi),
+                         in_range))
+
+        if name is not None:
+            needle = name.lower()
+            for gram in sorted(trigrams(needle)):
+                ids = self._by_trigram.get(gram, set())
+                plan.append((len(ids), "name", f"trigram {gram!r}", ids, ids.__contains__))
+        plan.sort(key=lambda step: step[0])
+
+        if name is not None:
+            # Los trigramas sólo descartan candidatos: la subcadena se comprueba siempre
+            grams = [size for size, field, _, _, _ in plan if field == "name"]
+            estimate = min(grams) if grams else len(self._by_id)
+            plan.append((estimate, "name", "substring", None, lambda i: needle in self._names[i]))
+        return plan
+
+    def explain(self, category=None, min_price=None, max_price=None, name=None):
+        """
+        Devuelve el plan con el que se resuelve una consulta con las filas estimadas y
+        reales de cada paso
+
+        El primer paso recorre el índice más selectivo (o todo el catálogo si no hay
+        ninguno) y los siguientes comprueban el resto de filtros de más a menos selectivo.
+        El total estimado supone que los filtros son independientes.
+        """
+        with self._lock:
+            plan = self._plan(category, min_price, max_price, name)
+            total = len(self._by_id)
+            if plan and plan[0][3] is not None:
+                size, field, access, ids, _ = plan[0]
+                plan = plan[1:]
+            else:
+                size, field, access, ids = total, None, "full scan", self._by_id
+            rows = list(ids)
+            steps = [{"operation": "scan", "filter": field, "access": access,
+                      "estimated_rows": size, "actual_rows": len(rows)}]
+            for size, field, access, _, check in plan:
+                rows = [i for i in rows if check(i)]
+                steps.append({"operation": "check", "filter": field, "access": access,
+                              "estimated_rows": size, "actual_rows": len(rows)})
+
+            # Selectividad de cada filtro: la de su paso más selectivo
+            estimates = {}
+            for step in steps:
+                if step["filter"] is not None:
+                    estimates[step["filter"]] = min(estimates.get(step["filter"], total),
+                                                    step["estimated_rows"])
+            estimate = total
+            for rows_estimate in estimates.values():
+                estimate = estimate * rows_estimate / total if total else 0
+            return {"plan": steps, "estimated_rows": round(estimate), "actual_rows": len(rows)}
+
+    def _price_range(self, min_price, max_price):
+        """
+        Devuelve los límites [lo, hi) de los precios dentro del rango en la lista ordenada
+        """
+        # Ningún precio se compara como mayor o menor que NaN: el rango está vacío
+        if is_nan(min_price) or is_nan(max_price):
+            return 0, 0
+        lo = 0 if min_price is None else bisect.bisect_left(self._price_keys, min_price)
+        hi = (len(self._price_keys) if max_price is None
+              else bisect.bisect_right(self._price_keys, max_price))
+        return lo, max(lo, hi)
+
+    def _price_index(self, price, product_id):
+        """
+        Devuelve la posición de (precio, id) en el índice de precios, ordenado por ambos
+        """
+        start = bisect.bisect_left(self._price_keys, price)
+        end = bisect.bisect_right(self._price_keys, price, start)
+        # Entre los productos con el mismo precio, los ids están ordenados
+        return bisect.bisect_left(self._price_ids, product_id, start, end)
+
+    def _add(self, product, index_price=True):
+        product = dict(product)
+        if isinstance(product.get("category"), str):
+            # Todos los productos de una categoría comparten la misma cadena
+            product["category"] = sys.intern(product["category"])
+        if product["id"] in self._by_id:
+            raise ValueError(f"Ya existe un producto con id {product['id']}")
+        self._by_id[product["id"]] = product
+        self._position[product["id"]] = self._next_position
+        self._order.append(self._next_position)
+        self._at[self._next_position] = product["id"]
+        self._next_position += 1
+        self._index(product, index_price)
+        return product
+
+    def _index(self, product, index_price=True):
+        product_id = product["id"]
+        category = product.get("category")
+        if category is not None:
+            self._by_category.setdefault(category, set()).add(product_id)
+        if index_price and "price" in product:
+            index = self._price_index(product["price"], product_id)
+            self._price_keys.insert(index, product["price"])
+            self._price_ids.insert(index, product_id)
+            if category is not None:
+                bisect.insort(self._category_prices.setdefault(category, []), product["price"])
+                self._category_sums[category] = self._category_sums.get(category, 0.0) + product["price"]
+        if "name" in product:
+            name = product["name"].lower()
+            self._names[product_id] = name
+            for gram in trigrams(name):
+                self._by_trigram.setdefault(gram, set()).add(product_id)
+            if self._fuzzy is not None:
+                self._fuzzy.add(product_id, product["name"])
+
+    def _unindex(self, product):
+        product_id = product["id"]
+        category = product.get("category")
+        if category is not None:
+            ids = self._by_category[category]
+            ids.discard(product_id)
+            if not ids:
+                del self._by_category[category]
+        if "price" in product:
+            index = self._price_index(product["price"], product_id)
+            del self._price_keys[index]
+            del self._price_ids[index]
+            if category is not None:
+                prices = self._category_prices[category]
+                del prices[bisect.bisect_left(prices, product["price"])]
+                self._category_sums[category] -= product["price"]
+                if not prices:
+                    del self._category_prices[category]
+                    del self._category_sums[category]
+        if "name" in product:
+            name = self._names.pop(product_id)
+            for gram in trigrams(name):
+                ids = self._by_trigram[gram]
+                ids.discard(product_id)
+                if not ids:
+                    del self._by_trigram[gram]
+            if self._fuzzy is not None:
+                self._fuzzy.remove(product_id, product["name"])
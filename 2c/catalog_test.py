@@ -0,0 +1,275 @@
+import json
+import pytest
+from catalog import ProductCatalog
+
+
+@pytest.fixture
+def catalog():
+    products = [
+        {"id": 1, "name": "Laptop", "price": 999.99},
+        {"id": 2, "name": "Smartphone", "price": 699.99},
+    ]
+    return ProductCatalog(products, encode=lambda p: json.dumps(p).encode())
+
+
+def test_get_by_id(catalog):
+    """Products are looked up by id"""
+    assert catalog.get(2)["name"] == "Smartphone"
+    assert catalog.get(999) is None
+    assert len(catalog) == 2
+    assert [p["id"] for p in catalog] == [1, 2]
+
+
+def test_body_is_cached(catalog):
+    """The encoded body is built once and reused"""
+    body = catalog.body(1)
+    assert json.loads(body) == {"id": 1, "name": "Laptop", "price": 999.99}
+    assert catalog.body(1) is body
+    assert catalog.body(999) is None
+
+
+def test_writes_keep_index_and_bodies_in_sync(catalog):
+    """Insert, update and delete update the index and drop stale bodies"""
+    catalog.body(1)
+    catalog.update(1, price=899.99)
+    assert json.loads(catalog.body(1))["price"] == 899.99
+
+    catalog.insert({"id": 3, "name": "Tablet", "price": 349.99})
+    assert json.loads(catalog.body(3))["name"] == "Tablet"
+    with pytest.raises(ValueError):
+        catalog.insert({"id": 3, "name": "Other", "price": 1})
+
+    assert catalog.delete(1)["id"] == 1
+    assert catalog.body(1) is None
+    assert catalog.update(1, price=1) is None
+
+
+def test_filter_matches_full_scan():
+    """Indexed filters return the same products, in order, as scanning the list"""
+    import random
+    rng = random.Random(0)
+    words = ["pro", "mini", "smart", "desk", "chair", "phone", "max", "ab"]
+    products = [
+        {"id": i, "name": " ".join(rng.sample(words, 2)).title(),
+         "price": round(rng.uniform(1, 1000), 2), "category": rng.choice("abc")}
+        for i in range(300)
+    ]
+    catalog = ProductCatalog(products)
+    for i in range(0, 300, 7):
+        catalog.update(i, price=round(rng.uniform(1, 1000), 2), category=rng.choice("abcd"))
+        products[i] = catalog.get(i)
+    for i in range(0, 300, 11):
+        catalog.delete(i)
+    products = [p for p in products if p["id"] % 11]
+
+    def scan(category=None, min_price=None, max_price=None, name=None):
+        return [p for p in products
+                if (category is None or p["category"] == category)
+                and (min_price is None or p["price"] >= min_price)
+                and (max_price is None or p["price"] <= max_price)
+                and (name is None or name.lower() in p["name"].lower())]
+
+    queries = [
+        {}, {"category": "a"}, {"category": "z"}, {"min_price": 500}, {"max_price": 100.5},
+        {"min_price": 200, "max_price": 300}, {"min_price": 900, "max_price": 100},
+        {"name": "PRO"}, {"name": "ab"}, {"name": "t ch"}, {"name": "nothing"},
+        {"category": "b", "min_price": 250, "name": "mart"},
+        {"category": "d", "max_price": 700, "name": "a"},
+    ]
+    for query in queries:
+        assert catalog.filter(**query) == scan(**query), query
+
+
+def test_page_is_stable_across_writes():
+    """Keyset pages neither repeat nor skip products when the catalog changes"""
+    catalog = ProductCatalog({"id": i, "name": f"P{i}", "price": i, "category": "a"}
+                             for i in range(10))
+    for filters in [{}, {"category": "a"}]:
+        page, after = catalog.page(**filters, limit=4)
+        assert [p["id"] for p in page] == [0, 1, 2, 3]
+        catalog.delete(4)
+        catalog.insert({"id": 4, "name": "P4", "price": 4, "category": "a"})
+        page, after = catalog.page(**filters, after=after, limit=4)
+        assert [p["id"] for p in page] == [5, 6, 7, 8]
+        page, after = catalog.page(**filters, after=after, limit=4)
+        assert [p["id"] for p in page] == [9, 4] and after is None
+        catalog.delete(4)
+        catalog.insert({"id": 4, "name": "P4", "price": 4, "category": "a"})
+    assert [p["id"] for p in catalog.iter_filter(max_price=3)] == [0, 1, 2, 3]
+
+
+def test_sorted_pages_match_full_sort():
+    """Top-k pages, walked with their keys, give the fully sorted result with id tie-breaks"""
+    import random
+    rng = random.Random(1)
+    products = [{"id": i, "name": rng.choice(["Desk", "Chair", "Lamp Pro"]),
+                 "price": rng.choice([10.0, 20.0, 30.0, 40.0]), "category": rng.choice("ab")}
+                for i in range(60)]
+    catalog = ProductCatalog(products)
+    catalog.update(5, price=25.0)
+    products[5] = catalog.get(5)
+
+    for filters in [{}, {"min_price": 15, "max_price": 35}, {"category": "a"}, {"name": "pro"}]:
+        for sort in ["price", "name", "id"]:
+            for descending in [False, True]:
+                expected = sorted(catalog.filter(**filters), key=lambda p: (p[sort], p["id"]),
+                                  reverse=descending)
+                assert catalog.filter(**filters, sort=sort, descending=descending) == expected
+                seen, after = [], None
+                while True:
+                    page, after = catalog.page(**filters, sort=sort, descending=descending,
+                                               after=after, limit=7)
+                    seen.extend(page)
+                    if after is None:
+                        break
+                assert seen == expected, (filters, sort, descending)
+
+
+def test_products_without_price():
+    """Products without a price never match a price filter and sort after the priced ones"""
+    catalog = ProductCatalog([
+        {"id": 1, "name": "Lamp", "category": "x"},
+        {"id": 2, "name": "Desk", "price": 20.0, "category": "x"},
+        {"id": 3, "name": "Chair", "price": 10.0, "category": "y"},
+        {"id": 4, "name": "Rug", "category": "y"},
+    ])
+    assert [p["id"] for p in catalog.filter(category="x", min_price=0)] == [2]
+    assert [p["id"] for p in catalog.filter(category="x", max_price=5)] == []
+    assert [p["id"] for p in catalog.filter(sort="price")] == [3, 2, 1, 4]
+    assert [p["id"] for p in catalog.filter(category="x", sort="price")] == [2, 1]
+    assert [p["id"] for p in catalog.filter(sort="price", descending=True)] == [2, 3, 4, 1]
+
+    seen, after = [], None
+    while True:
+        page, after = catalog.page(sort="price", after=after, limit=1)
+        seen.extend(p["id"] for p in page)
+        if after is None:
+            break
+    assert seen == [3, 2, 1, 4]
+
+
+def test_nan_price_bound_matches_nothing():
+    """A NaN price bound matches no product, like a full scan and ColumnarCatalog"""
+    catalog = ProductCatalog([{"id": 1, "name": "Lamp", "price": 10.0, "category": "x"}])
+    nan = float("nan")
+    assert catalog.filter(min_price=nan) == []
+    assert catalog.filter(category="x", max_price=nan) == []
+    assert catalog.facets(min_price=nan)["total"] == 0
+
+
+def brute_facets(products, buckets, category=None, min_price=None, max_price=None, name=None):
+    matches = [p for p in products
+               if (category is None or p["category"] == category)
+               and (min_price is None or p["price"] >= min_price)
+               and (max_price is None or p["price"] <= max_price)
+               and (name is None or name in p["name"].lower())]
+    categories = {}
+    for p in matches:
+        categories[p["category"]] = categories.get(p["category"], 0) + 1
+    highs = list(buckets[1:]) + [None]
+    return {
+        "total": len(matches),
+        "categories": categories,
+        "price_buckets": [
+            {"min": low, "max": high,
+             "count": sum(low <= p["price"] and (high is None or p["price"] < high) for p in matches)}
+            for low, high in zip(buckets, highs)
+        ],
+    }
+
+
+def test_facets_follow_writes():
+    """Facet counts match a full scan for every filter combination after inserts, updates and deletes"""
+    import random
+    rng = random.Random(2)
+    catalog = ProductCatalog(
+        {"id": i, "name": rng.choice(["Desk", "Chair", "Lamp Pro"]),
+         "price": rng.choice([5.0, 50.0, 100.0, 150.0, 600.0]), "category": rng.choice("abc")}
+        for i in range(80))
+    catalog.insert({"id": 100, "name": "Desk Pro", "price": 100.0, "category": "d"})
+    catalog.update(3, price=250.0, category="a")
+    catalog.update(4, category="d")
+    catalog.delete(5)
+    catalog.delete(100)
+
+    buckets = (0, 100, 250, 500)
+    products = list(catalog)
+    for filters in [{}, {"category": "a"}, {"category": "d"}, {"category": "z"},
+                    {"min_price": 50, "max_price": 250}, {"min_price": 120},
+                    {"category": "b", "max_price": 100}, {"name": "pro"},
+                    {"name": "pro", "min_price": 100, "category": "c"}]:
+        assert catalog.facets(**filters, buckets=buckets) == \
+            brute_facets(products, buckets, **filters), filters
+
+
+def test_price_stats_follow_writes():
+    """Per-category price stats stay equal to a full scan after inserts, updates and deletes"""
+    import random
+    rng = random.Random(4)
+    catalog = ProductCatalog(
+        {"id": i, "name": "P", "price": round(rng.uniform(0, 100), 2), "category": rng.choice("ab")}
+        for i in range(40))
+    for i in range(40, 60):
+        catalog.insert({"id": i, "name": "P", "price": round(rng.uniform(0, 100), 2), "category": "c"})
+    for i in rng.sample(range(60), 20):
+        catalog.delete(i)
+    cheapest = min((p for p in catalog if p["category"] == "a"), key=lambda p: p["price"])
+    catalog.delete(cheapest["id"])
+    catalog.update(next(p["id"] for p in catalog if p["category"] == "b"), category="a", price=500.0)
+
+    for category in "abc":
+        prices = [p["price"] for p in catalog if p["category"] == category]
+        assert catalog.price_stats(category) == {
+            "count": len(prices), "sum": round(sum(prices), 2), "min": min(prices),
+            "max": max(prices), "avg": round(sum(prices) / len(prices), 2),
+        }
+    assert catalog.price_stats()["a"]["max"] == 500.0
+    for i in [p["id"] for p in catalog if p["category"] == "c"]:
+        catalog.delete(i)
+    assert catalog.price_stats("c") is None
+    assert set(catalog.price_stats()) == {"a", "b"}
+
+
+def test_fuzzy_search_follows_writes():
+    """Fuzzy search finds misspelled names, applies the other filters and sees later writes"""
+    catalog = ProductCatalog([
+        {"id": 1, "name": "Smartphone X", "price": 699.99, "category": "electronics"},
+        {"id": 2, "name": "Smart Watch", "price": 199.99, "category": "electronics"},
+        {"id": 3, "name": "Office Desk", "price": 249.99, "category": "furniture"},
+    ])
+    assert [p["id"] for p, _ in catalog.search("smarphone")] == [1, 2]
+    catalog.insert({"id": 4, "name": "Smartphone Mini", "price": 399.99, "category": "electronics"})
+    catalog.update(1, name="Flip X")
+    assert [p["id"] for p, _ in catalog.search("smarphone")] == [4, 2]
+    assert [p["id"] for p, _ in catalog.search("smarphone", min_price=300)] == [4]
+    assert catalog.search("ofice desk", category="furniture")[0][0]["id"] == 3
+
+
+def test_explain_runs_most_selective_filter_first():
+    """The plan scans the smallest index, checks the rest by selectivity and reports real row counts"""
+    products = [{"id": i, "name": "Desk" if i % 50 else "Laptop Pro", "price": float(i % 100),
+                 "category": "a" if i % 2 else "b"} for i in range(1000)]
+    catalog = ProductCatalog(products)
+
+    result = catalog.explain(category="a", max_price=29, name="laptop")
+    plan = result["plan"]
+    assert plan[0]["operation"] == "scan" and plan[0]["filter"] == "name"
+    assert [step["filter"] for step in plan[-3:]] == ["price", "category", "name"]
+    assert plan[-1]["access"] == "substring"
+    assert [step["estimated_rows"] for step in plan[:-1]] == sorted(s["estimated_rows"] for s in plan[:-1])
+    expected = catalog.filter(category="a", max_price=29, name="laptop")
+    assert result["actual_rows"] == plan[-1]["actual_rows"] == len(expected)
+    assert result["estimated_rows"] == round(1000 * (20 / 1000) * (300 / 1000) * (500 / 1000))
+
+    result = catalog.explain(name="pr")
+    assert result["plan"][0]["access"] == "full scan" and result["actual_rows"] == 20
+
+
+def test_bodies_resolves_many_ids():
+    """bodies() returns the cached bodies in request order, once per id, plus the missing ids"""
+    catalog = ProductCatalog([{"id": 1, "name": "A"}, {"id": 2, "name": "B"}],
+                             encode=lambda p: json.dumps(p).encode())
+    found, missing = catalog.bodies([2, 7, 1, 2])
+    assert [json.loads(body)["id"] for body in found] == [2, 1]
+    assert missing == [7]
+    assert found[0] is catalog.body(2)
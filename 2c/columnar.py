@@ -0,0 +1,566 @@
+"""
+Catálogo de productos en columnas de NumPy con filtrado vectorizado.
+
+ProductCatalog guarda un diccionario por producto, y filtrar por categoría y precio
+recorre (o intersecta) conjuntos de ids en Python. ColumnarCatalog guarda cada campo
+en una columna:
+
+- ids: array int64
+- precios: array float64
+- categorías: array int32 con el código de cada categoría (la lista de nombres se
+  guarda aparte, una vez por categoría)
+- nombres: lista de Python
+
+Así, una consulta con category, min_price y max_price es una única máscara booleana
+calculada por NumPy sobre arrays contiguos, sin tocar los objetos de Python. La
+búsqueda por nombre se comprueba sólo en las filas que quedan tras la máscara.
+
+Los productos se añaden al final de las columnas (que crecen al doble cuando se
+llenan), se actualizan en su fila y al borrarlos se marcan como eliminados. Cada
+escritura incrementa `version`, como en ProductCatalog. Los resultados mantienen el
+orden de inserción, igual que ProductCatalog, y la fila de cada producto es su
+posición para paginar con page().
+
+Al ordenar por price o id (con empates por id), los k primeros se eligen con
+np.partition en O(n) y sólo se ordenan esos k con np.lexsort. Por name se usa un
+montículo, igual que ProductCatalog.
+
+Para los recuentos por faceta (facets()) se mantienen, en cada escritura, el número de
+productos de cada categoría y un array ordenado con sus precios: el número de productos
+de una categoría en un rango o intervalo de precios son dos np.searchsorted, sin
+recorrer las filas. Con el filtro de nombre, que no tiene recuentos precalculados, se
+cuentan las filas de la máscara con np.bincount y np.searchsorted.
+Con esos arrays y la suma de los precios de cada categoría, que también se actualiza en
+cada escritura, price_stats() devuelve count, sum, min, max y avg en O(1), igual que
+ProductCatalog: el mínimo y el máximo son el primer y el último elemento del array,
+también después de borrar.
+
+explain() devuelve los pasos de la máscara, del filtro más selectivo al menos, con las
+filas de cada filtro por separado (estimadas) y las que quedan tras cada paso (reales).
+
+search() busca por nombre de forma aproximada con un FuzzyIndex, igual que
+ProductCatalog; el índice se crea en la primera búsqueda.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import numpy as np
+from fuzzy import DEFAULT_THRESHOLD, FuzzyIndex
+
+# Campos que se guardan en columnas; el resto se guarda aparte por fila
+COLUMNS = ("id", "name", "price", "category")
+
+
+class ColumnarCatalog:
+    """
+    Productos guardados por columnas con filtros vectorizados
+    """
+
+    def __init__(self, products=()):
+        products = list(products)
+        categories = []
+        codes = {}
+        for product in products:
+            category = product.get("category")
+            if category not in codes:
+                codes[category] = len(categories)
+                categories.append(category)
+        self._setup(
+            ids=np.array([p["id"] for p in products], dtype=np.int64),
+            names=[p.get("name", "") for p in products],
+            prices=np.array([p.get("price", np.nan) for p in products], dtype=np.float64),
+            category_codes=np.array([codes[p.get("category")] for p in products], dtype=np.int32),
+            categories=categories,
+        )
+        for row, product in enumerate(products):
+            extra = {key: value for key, value in product.items() if key not in COLUMNS}
+            if extra:
+                self._extra[row] = extra
+
+    @classmethod
+    def from_columns(cls, ids, names, prices, category_codes, categories):
+        """
+        Crea el catálogo directamente a partir de sus columnas
+
+        category_codes[i] es la posición de la categoría del producto i en `categories`.
+        """
+        catalog = cls.__new__(cls)
+        catalog._setup(
+            ids=np.asarray(ids, dtype=np.int64),
+            names=list(names),
+            prices=np.asarray(prices, dtype=np.float64),
+            category_codes=np.asarray(category_codes, dtype=np.int32),
+            categories=list(categories),
+        )
+        return catalog
+
+    def _setup(self, ids, names, prices, category_codes, categories):
+        self._size = len(ids)
+        self._ids = ids
+        self._names = names
+        self._prices = prices
+        self._category_codes = category_codes
+        self._categories = categories
+        self._codes = {category: code for code, category in enumerate(categories)}
+        self._alive = np.ones(self._size, dtype=bool)
+        self._extra = {}
+        self._rows = {}
+        for row, product_id in enumerate(ids.tolist()):
+            if product_id in self._rows:
+                raise ValueError(f"Ya existe un producto con id {product_id}")
+            self._rows[product_id] = row
+        self._fuzzy = None
+        self._lock = threading.RLock()
+        self.version = 0
+        self._build_aggregates()
+
+    def _build_aggregates(self):
+        """
+        Calcula el número de productos de cada categoría, sus precios ordenados y su suma
+        (por código de categoría), que después se mantienen en cada escritura
+        """
+        codes = self._category_codes[:self._size]
+        prices = self._prices[:self._size]
+        self._category_counts = np.bincount(codes, minlength=len(self._categories)).tolist()
+        priced = ~np.isnan(prices)
+        codes, prices = codes[priced], prices[priced]
+        order = np.lexsort((prices, codes))
+        codes, prices = codes[order], prices[order]
+        bounds = np.searchsorted(codes, np.arange(len(self._categories) + 1))
+        self._category_prices = [prices[lo:hi].copy() for lo, hi in zip(bounds, bounds[1:])]
+        self._category_sums = [math.fsum(prices.tolist()) for prices in self._category_prices]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            return iter([self._product(row) for row in rows.tolist()])
+
+    def __contains__(self, product_id):
+        return product_id in self._rows
+
+    def get(self, product_id):
+        """
+        Devuelve el producto con ese id, o None si no existe
+        """
+        with self._lock:
+            row = self._rows.get(product_id)
+            return None if row is None else self._product(row)
+
+    def insert(self, product):
+        """
+        Añade un producto al final; lanza ValueError si ya existe uno con el mismo id
+        """
+        with self._lock:
+            if product["id"] in self._rows:
+                raise ValueError(f"Ya existe un producto con id {product['id']}")
+            if self._size == len(self._ids):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._ids[row] = product["id"]
+            self._names.append(product.get("name", ""))
+            self._alive[row] = True
+            if self._fuzzy is not None:
+                self._fuzzy.add(product["id"], self._names[row])
+            self._rows[product["id"]] = row
+            self._write(row, product)
+            self._add_aggregates(row)
+            self.version += 1
+            return self._product(row)
+
+    def update(self, product_id, **fields):
+        """
+        Modifica los campos de un producto en su fila; devuelve None si no existe
+        """
+        with self._lock:
+            row = self._rows.get(product_id)
+            if row is None:
+                return None
+            product = {**self._product(row), **fields, "id": product_id}
+            if self._fuzzy is not None:
+                self._fuzzy.remove(product_id, self._names[row])
+                self._fuzzy.add(product_id, product.get("name", ""))
+            self._names[row] = product.get("name", "")
+            self._remove_aggregates(row)
+            self._write(row, product)
+            self._add_aggregates(row)
+            self.version += 1
+            return self._product(row)
+
+    def delete(self, product_id):
+        """
+        Borra un producto; devuelve el producto borrado o None si no existía
+        """
+        with self._lock:
+            row = self._rows.pop(product_id, None)
+            if row is None:
+                return None
+            product = self._product(row)
+            self._remove_aggregates(row)
+            self._alive[row] = False
+            self._extra.pop(row, None)
+            if self._fuzzy is not None:
+                self._fuzzy.remove(product_id, self._names[row])
+            self.version += 1
+            return product
+
+    def filter(self, category=None, min_price=None, max_price=None, name=None, sort=None,
+               descending=False):
+        """
+        Devuelve los productos que cumplen todos los filtros dados, en orden de inserción
+        u ordenados por (sort, id)
+        """
+        with self._lock:
+            rows = self._match_any(category, min_price, max_price, name, sort, descending)
+            return [self._product(row) for row in rows.tolist()]
+
+    def filter_ids(self, category=None, min_price=None, max_price=None, name=None):
+        """
+        Como filter, pero devuelve sólo un array con los ids, sin crear los productos
+        """
+        with self._lock:
+            return self._ids[self._match(category, min_price, max_price, name)]
+
+    def iter_filter(self, category=None, min_price=None, max_price=None, name=None, sort=None,
+                    descending=False):
+        """
+        Como filter, pero crea y devuelve los productos de uno en uno
+        """
+        with self._lock:
+            rows = self._match_any(category, min_price, max_price, name, sort, descending).tolist()
+        for row in rows:
+            with self._lock:
+                product = self._product(row) if self._alive[row] else None
+            if product is not None:
+                yield product
+
+    def page(self, category=None, min_price=None, max_price=None, name=None, after=None,
+             limit=100, sort=None, descending=False):
+        """
+        Devuelve una página de resultados: (productos, clave para la siguiente página)
+
+        Sin `sort` la clave es la fila del último producto de la página, y la siguiente
+        página sólo calcula la máscara a partir de ella; con sort es su (valor, id). Si no
+        quedan más resultados es None.
+        """
+        with self._lock:
+            rows = self._match_any(category, min_price, max_price, name, sort, descending,
+                                   after, limit + 1).tolist()
+            more = len(rows) > limit
+            rows = rows[:limit]
+            products = [self._product(row) for row in rows]
+            if not more:
+                return products, None
+            if sort is None:
+                return products, rows[-1]
+            value = products[-1][sort]
+            if sort == "price" and math.isnan(value):
+                # Como en ProductCatalog, un producto sin precio tiene el valor None
+                value = None
+            return products, (value, products[-1]["id"])
+
+    def facets(self, category=None, min_price=None, max_price=None, name=None,
+               buckets=(0, 100, 250, 500, 1000)):
+        """
+        Devuelve cuántos productos cumplen los filtros, en total, por categoría y por
+        intervalo de precio, con el mismo formato que ProductCatalog.facets
+        """
+        edges = np.asarray(buckets, dtype=np.float64)
+        with self._lock:
+            if name is not None:
+                rows = self._match(category, min_price, max_price, name)
+                codes = np.bincount(self._category_codes[rows], minlength=len(self._categories))
+                prices = self._prices[rows]
+                index = np.searchsorted(edges, prices[~np.isnan(prices)], side="right") - 1
+                counts = np.bincount(index[index >= 0], minlength=len(edges))
+                total = len(rows)
+            else:
+                codes, counts = self._count_aggregates(category, min_price, max_price, edges)
+                total = sum(codes)
+            categories = {
+                self._categories[code]: int(count)
+                for code, count in enumerate(codes)
+                if count and self._categories[code] is not None
+            }
+        highs = list(buckets)[1:] + [None]
+        return {
+            "total": int(total),
+            "categories": categories,
+            "price_buckets": [
+                {"min": low, "max": high, "count": int(count)}
+                for low, high, count in zip(buckets, highs, np.asarray(counts).tolist())
+            ],
+        }
+
+    def _count_aggregates(self, category, min_price, max_price, edges):
+        """
+        Devuelve (productos por código de categoría, productos por intervalo de precio)
+        que cumplen los filtros de categoría y precio, a partir de los agregados
+        """
+        counts = np.zeros(len(edges), dtype=np.int64)
+        codes = [0] * len(self._categories)
+        if category is None:
+            scopes = range(len(self._categories))
+        else:
+            scopes = [self._codes[category]] if category in self._codes else []
+        if (min_price is not None and np.isnan(min_price)) or (max_price is not None
+                                                                and np.isnan(max_price)):
+            return codes, counts
+        lows = edges if min_price is None else np.maximum(edges, min_price)
+        highs = np.append(edges[1:], np.inf)
+        for code in scopes:
+            prices = self._category_prices[code]
+            if min_price is None and max_price is None:
+                # Sin rango de precios cuentan también los productos sin precio
+                codes[code] = self._category_counts[code]
+            else:
+                lo = 0 if min_price is None else np.searchsorted(prices, min_price, "left")
+                hi = len(prices) if max_price is None else np.searchsorted(prices, max_price,
+                                                                           "right")
+                codes[code] = int(max(0, hi - lo))
+            start = np.searchsorted(prices, lows, "left")
+            end = np.searchsorted(prices, highs, "left")
+            if max_price is not None:
+                end = np.minimum(end, np.searchsorted(prices, max_price, "right"))
+            counts += np.maximum(end - start, 0)
+        return codes, counts
+
+    def explain(self, category=None, min_price=None, max_price=None, name=None):
+        """
+        Devuelve el plan de la consulta con el mismo formato que ProductCatalog.explain
+        """
+        with self._lock:
+            size = self._size
+            alive = self._alive[:size]
+            masks = []
+            if category is not None:
+                code = self._codes.get(category)
+                masks.append(("category", self._category_codes[:size] == code))
+            if min_price is not None:
+                masks.append(("price", self._prices[:size] >= min_price))
+            if max_price is not None:
+                masks.append(("price", self._prices[:size] <= max_price))
+            masks = [(field, mask & alive, int(np.count_nonzero(mask & alive)))
+                     for field, mask in masks]
+            masks.sort(key=lambda step: step[2])
+
+            total = len(self._rows)
+            mask = alive.copy()
+            steps = [{"operation": "scan", "filter": None, "access": "full scan",
+                      "estimated_rows": total, "actual_rows": total}]
+            estimate = total
+            for field, field_mask, count in masks:
+                mask &= field_mask
+                estimate = estimate * count / total if total else 0
+                steps.append({"operation": "check", "filter": field, "access": "vectorized mask",
+                              "estimated_rows": count, "actual_rows": int(np.count_nonzero(mask))})
+            if name is not None:
+                rows = self._match(category, min_price, max_price, name)
+                steps.append({"operation": "check", "filter": "name", "access": "substring",
+                              "estimated_rows": steps[-1]["actual_rows"], "actual_rows": len(rows)})
+            return {"plan": steps, "estimated_rows": round(estimate),
+                    "actual_rows": steps[-1]["actual_rows"]}
+
+    def search(self, query, category=None, min_price=None, max_price=None,
+               threshold=DEFAULT_THRESHOLD, limit=100):
+        """
+        Devuelve los productos cuyo nombre se parece a `query`, como una lista de
+        (producto, puntuación), con el mismo criterio que ProductCatalog.search
+        """
+        with self._lock:
+            if self._fuzzy is None:
+                rows = np.flatnonzero(self._alive[:self._size]).tolist()
+                ids = self._ids[rows].tolist()
+                self._fuzzy = FuzzyIndex((product_id, self._names[row])
+                                         for product_id, row in zip(ids, rows))
+            accept = None
+            if category is not None or min_price is not None or max_price is not None:
+                code = self._codes.get(category)
+
+                def accept(product_id):
+                    row = self._rows[product_id]
+                    price = self._prices[row]
+                    return ((category is None or self._category_codes[row] == code)
+                            and (min_price is None or price >= min_price)
+                            and (max_price is None or price <= max_price))
+            matches = self._fuzzy.search(query, threshold, limit, accept)
+            return [(self._product(self._rows[product_id]), score) for product_id, score in matches]
+
+    def price_stats(self, category=None):
+        """
+        Devuelve count, sum, min, max y avg de los precios por categoría, con el mismo
+        formato que ProductCatalog.price_stats
+        """
+        with self._lock:
+            if category is not None:
+                code = self._codes.get(category)
+                return None if code is None else self._category_stats(code)
+            return {
+                self._categories[code]: self._category_stats(code)
+                for code in range(len(self._categories))
+                if self._categories[code] is not None and len(self._category_prices[code])
+            }
+
+    def _category_stats(self, code):
+        prices = self._category_prices[code]
+        if not len(prices):
+            return None
+        total = self._category_sums[code]
+        return {
+            "count": len(prices),
+            "sum": round(total, 2),
+            "min": float(prices[0]),
+            "max": float(prices[-1]),
+            "avg": round(total / len(prices), 2),
+        }
+
+    def _match_any(self, category, min_price, max_price, name, sort, descending, after=None,
+                   limit=None):
+        if sort is None:
+            return self._match(category, min_price, max_price, name, after, limit)
+        return self._match_sorted(category, min_price, max_price, name, sort, descending,
+                                  after, limit)
+
+    def _match_sorted(self, category, min_price, max_price, name, sort, descending,
+                      after=None, limit=None):
+        """
+        Devuelve las filas que cumplen los filtros ordenadas por (sort, id), detrás de la
+        clave `after` y como mucho `limit`
+        """
+        rows = self._match(category, min_price, max_price, name)
+        ids = self._ids[rows]
+
+        if sort == "name":
+            names = self._names
+            keyed = [(names[row], product_id, row)
+                     for row, product_id in zip(rows.tolist(), ids.tolist())]
+            if after is not None:
+                after = tuple(after)
+                if descending:
+                    keyed = [k for k in keyed if k[:2] < after]
+                else:
+                    keyed = [k for k in keyed if k[:2] > after]
+            if limit is None or limit >= len(keyed):
+                keyed.sort(reverse=descending)
+            else:
+                keyed = (heapq.nlargest if descending else heapq.nsmallest)(limit, keyed)
+            return np.array([row for _, _, row in keyed], dtype=np.intp)
+
+        values = self._prices[rows] if sort == "price" else ids
+        keys = ids
+        if descending:
+            # Orden descendente = ascendente sobre los valores cambiados de signo
+            values, keys = -values, -keys
+        # Los precios NaN (productos sin precio) van al final en los dos sentidos
+        missing = np.isnan(values)
+        if after is not None:
+            value, product_id = after
+            if descending:
+                product_id = -product_id
+            if value is None:
+                keep = missing & (keys > product_id)
+            else:
+                if descending:
+                    value = -value
+                keep = (values > value) | ((values == value) & (keys > product_id)) | missing
+            rows, values, keys = rows[keep], values[keep], keys[keep]
+        if limit is not None and limit < len(rows):
+            # Selección parcial: el k-ésimo valor y todos los que no lo superan (con
+            # empates); si es NaN, entre los k primeros hay filas sin precio y no se descarta
+            # ninguna
+            kth = np.partition(values, limit - 1)[limit - 1]
+            if not np.isnan(kth):
+                keep = values <= kth
+                rows, values, keys = rows[keep], values[keep], keys[keep]
+        order = np.lexsort((keys, values))[:limit]
+        return rows[order]
+
+    def _match(self, category, min_price, max_price, name, after=None, limit=None):
+        """
+        Devuelve las filas que cumplen los filtros, detrás de la fila `after` y como mucho `limit`
+        """
+        start = 0 if after is None else max(0, after + 1)
+        size = self._size
+        mask = self._alive[start:size].copy()
+        if category is not None:
+            code = self._codes.get(category)
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= self._category_codes[start:size] == code
+        if min_price is not None:
+            mask &= self._prices[start:size] >= min_price
+        if max_price is not None:
+            mask &= self._prices[start:size] <= max_price
+        rows = np.flatnonzero(mask) + start
+        if name is not None:
+            needle = name.lower()
+            names = self._names
+            rows = (row for row in rows.tolist() if needle in names[row].lower())
+            rows = np.fromiter(itertools.islice(rows, limit), dtype=np.intp)
+        return rows[:limit]
+
+    def _product(self, row):
+        product = {
+            "id": int(self._ids[row]),
+            "name": self._names[row],
+            "price": float(self._prices[row]),
+            "category": self._categories[self._category_codes[row]],
+        }
+        extra = self._extra.get(row)
+        if extra:
+            product.update(extra)
+        return product
+
+    def _add_aggregates(self, row):
+        """
+        Suma la fila a los agregados de su categoría
+        """
+        code = self._category_codes[row]
+        price = self._prices[row]
+        self._category_counts[code] += 1
+        if not np.isnan(price):
+            prices = self._category_prices[code]
+            self._category_prices[code] = np.insert(prices, np.searchsorted(prices, price), price)
+            self._category_sums[code] += float(price)
+
+    def _remove_aggregates(self, row):
+        """
+        Quita la fila de los agregados de su categoría
+        """
+        code = self._category_codes[row]
+        price = self._prices[row]
+        self._category_counts[code] -= 1
+        if not np.isnan(price):
+            prices = self._category_prices[code]
+            self._category_prices[code] = np.delete(prices, np.searchsorted(prices, price))
+            self._category_sums[code] -= float(price)
+
+    def _write(self, row, product):
+        category = product.get("category")
+        code = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self._categories)
+            self._categories.append(category)
+            self._category_counts.append(0)
+            self._category_prices.append(np.empty(0, dtype=np.float64))
+            self._category_sums.append(0.0)
+        self._prices[row] = product.get("price", np.nan)
+        self._category_codes[row] = code
+        extra = {key: value for key, value in product.items() if key not in COLUMNS}
+        if extra:
+            self._extra[row] = extra
+        else:
+            self._extra.pop(row, None)
+
+    def _grow(self):
+        capacity = max(8, 2 * len(self._ids))
+        for column in ("_ids", "_prices", "_category_codes", "_alive"):
+            old = getattr(self, column)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
@@ -0,0 +1,175 @@
+import random
+import pytest
+from catalog import ProductCatalog
+from columnar import ColumnarCatalog
+from ej2c3 import create_app
+
+
+def make_products(count, seed=0):
+    rng = random.Random(seed)
+    words = ["pro", "mini", "smart", "desk", "chair", "phone", "max"]
+    return [
+        {"id": i, "name": " ".join(rng.sample(words, 2)).title(),
+         "price": round(rng.uniform(1, 1000), 2), "category": rng.choice("abc")}
+        for i in range(count)
+    ]
+
+
+def test_filter_matches_indexed_catalog():
+    """Vectorized filters return the same products as ProductCatalog"""
+    products = make_products(300)
+    columnar = ColumnarCatalog(products)
+    indexed = ProductCatalog(products)
+    for catalog in (columnar, indexed):
+        for i in range(0, 300, 7):
+            catalog.update(i, price=i + 0.5, category="d")
+        for i in range(0, 300, 11):
+            catalog.delete(i)
+        catalog.insert({"id": 1000, "name": "Smart Desk", "price": 10.0, "category": "e"})
+
+    queries = [
+        {}, {"category": "a"}, {"category": "z"}, {"category": "e"}, {"min_price": 500},
+        {"min_price": 200, "max_price": 300}, {"name": "PRO"}, {"name": "t d"},
+        {"category": "d", "max_price": 150, "name": "a"},
+    ]
+    for query in queries:
+        assert columnar.filter(**query) == indexed.filter(**query), query
+        assert columnar.filter_ids(**query).tolist() == [p["id"] for p in indexed.filter(**query)]
+        assert list(columnar.iter_filter(**query)) == indexed.filter(**query)
+
+        # Las páginas de los dos catálogos coinciden aunque sus posiciones sean distintas
+        pages = []
+        for catalog in (columnar, indexed):
+            ids, after = [], None
+            while True:
+                page, after = catalog.page(**query, after=after, limit=7)
+                ids.append([p["id"] for p in page])
+                if after is None:
+                    break
+            pages.append(ids)
+        assert pages[0] == pages[1]
+
+        # Top-k ordenado: mismos resultados y mismas claves de página
+        for sort in ["price", "id", "name"]:
+            for descending in [False, True]:
+                ordering = {"sort": sort, "descending": descending}
+                assert columnar.filter(**query, **ordering) == indexed.filter(**query, **ordering)
+                after = None
+                while True:
+                    result = columnar.page(**query, **ordering, after=after, limit=5)
+                    assert result == indexed.page(**query, **ordering, after=after, limit=5)
+                    after = result[1]
+                    if after is None:
+                        break
+    assert len(columnar) == len(indexed)
+    assert list(columnar) == list(indexed)
+
+
+def test_from_columns():
+    """The catalog can be built from its columns without product dicts"""
+    catalog = ColumnarCatalog.from_columns(
+        ids=[10, 11, 12], names=["A", "B", "C"], prices=[5.0, 15.0, 25.0],
+        category_codes=[0, 1, 0], categories=["x", "y"],
+    )
+    assert catalog.filter_ids(category="x", min_price=10).tolist() == [12]
+    assert catalog.get(11) == {"id": 11, "name": "B", "price": 15.0, "category": "y"}
+    with pytest.raises(ValueError):
+        catalog.insert({"id": 10, "name": "D", "price": 1.0, "category": "x"})
+
+
+def test_app_with_columnar_catalog():
+    """GET /products gives the same answers with the columnar catalog"""
+    columnar = create_app(columnar=True).test_client()
+    indexed = create_app().test_client()
+    for query in ["", "?category=furniture", "?min_price=200&max_price=700",
+                  "?name=Pro&max_price=100", "?category=electronics&min_price=500",
+                  "?min_price=abc"]:
+        response = columnar.get("/products" + query)
+        assert response.status_code == 200
+        assert response.json == indexed.get("/products" + query).json
+
+
+def test_facets_match_indexed_catalog():
+    """Facet counts are the same with both catalogs"""
+    rng = random.Random(3)
+    products = [{"id": i, "name": rng.choice(["Desk", "Chair", "Lamp Pro"]),
+                 "price": rng.choice([5.0, 50.0, 100.0, 600.0]), "category": rng.choice("abc")}
+                for i in range(50)]
+    columnar, indexed = ColumnarCatalog(products), ProductCatalog(products)
+    for catalog in (columnar, indexed):
+        catalog.update(1, price=250.0)
+        catalog.delete(2)
+    for filters in [{}, {"category": "b"}, {"min_price": 50, "max_price": 250}, {"name": "pro"}]:
+        assert columnar.facets(**filters, buckets=(10, 100)) == \
+            indexed.facets(**filters, buckets=(10, 100))
+    assert columnar.price_stats() == indexed.price_stats()
+    for filters in [{}, {"category": "b"}, {"max_price": 60}]:
+        assert columnar.search("lamp pr", **filters) == indexed.search("lamp pr", **filters)
+    for catalog in (columnar, indexed):
+        catalog.update(3, name="Lamp Pro")
+        catalog.delete(4)
+    assert columnar.search("lamp pro", limit=5) == indexed.search("lamp pro", limit=5)
+    for filters in [{"category": "b", "min_price": 50}, {"name": "pro", "max_price": 60}]:
+        assert columnar.explain(**filters)["actual_rows"] == indexed.explain(**filters)["actual_rows"]
+    assert columnar.price_stats("a") == indexed.price_stats("a")
+
+
+def test_sorted_pages_with_missing_prices():
+    """Products without price sort last and are not lost by the top-k selection"""
+    products = make_products(40)
+    for product in products[::3]:
+        del product["price"]
+    indexed = ProductCatalog(products)
+    columnar = ColumnarCatalog(products)
+    for descending in [False, True]:
+        expected = [p["id"] for p in indexed.filter(sort="price", descending=descending)]
+        assert expected[-1] in [p["id"] for p in products[::3]]
+        assert [p["id"] for p in columnar.filter(sort="price", descending=descending)] == expected
+        for limit in [1, 5, 30, 39]:
+            seen, after = [], None
+            while True:
+                page, after = columnar.page(sort="price", descending=descending, after=after,
+                                            limit=limit)
+                seen.extend(p["id"] for p in page)
+                if after is None:
+                    break
+            assert seen == expected, (descending, limit)
+
+
+def test_aggregates_follow_writes():
+    """Facets read from the maintained aggregates match ProductCatalog after many writes"""
+    rng = random.Random(5)
+    products = make_products(60)
+    for product in products[::7]:
+        del product["price"]
+    columnar, indexed = ColumnarCatalog(products), ProductCatalog(products)
+    next_id = 1000
+    for _ in range(200):
+        action = rng.random()
+        product_id = rng.choice([p["id"] for p in indexed])
+        if action < 0.3:
+            product = {"id": next_id, "name": "New", "category": rng.choice("abcd")}
+            if rng.random() < 0.8:
+                product["price"] = round(rng.uniform(1, 1000), 2)
+            next_id += 1
+            changes = [("insert", product)]
+        elif action < 0.7:
+            fields = rng.choice([{"price": round(rng.uniform(1, 1000), 2)},
+                                 {"category": rng.choice("abcde")},
+                                 {"price": 50.0, "category": "a"}])
+            changes = [("update", product_id, fields)]
+        else:
+            changes = [("delete", product_id)]
+        for catalog in (columnar, indexed):
+            for change in changes:
+                if change[0] == "update":
+                    catalog.update(change[1], **change[2])
+                else:
+                    getattr(catalog, change[0])(change[1])
+    for filters in [{}, {"category": "e"}, {"category": "z"}, {"min_price": 100},
+                    {"max_price": 500, "category": "a"}, {"min_price": 200, "max_price": 800}]:
+        assert columnar.facets(**filters, buckets=(0, 250, 600)) == \
+            indexed.facets(**filters, buckets=(0, 250, 600)), filters
+    assert columnar.price_stats() == indexed.price_stats()
+    for category in "abcdez":
+        assert columnar.price_stats(category) == indexed.price_stats(category)
@@ -28,7 +28,8 @@ Ejemplo:
 2. Una solicitud `GET /product/999` debe devolver un mensaje de error con código 404.
 """
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
+from catalog import ProductCatalog
 
 # Lista de productos predefinida
 products = [
@@ -37,12 +38,39 @@ products = [
     {"id": 3, "name": "Tablet", "price": 349.99}
 ]
 
+# Número máximo de ids en una consulta por lotes
+MAX_BATCH_SIZE = 1000
+
+
+def parse_ids(values):
+    """
+    Convierte una lista de ids en enteros; lanza ValueError si alguno no lo es o si hay
+    más de MAX_BATCH_SIZE
+    """
+    if len(values) > MAX_BATCH_SIZE:
+        raise ValueError(f"Se admiten como mucho {MAX_BATCH_SIZE} ids")
+    ids = []
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"id no válido: {value!r}")
+        try:
+            ids.append(int(value))
+        except ValueError:
+            raise ValueError(f"id no válido: {value!r}") from None
+    return ids
+
+
 def create_app():
     """
     Crea y configura la aplicación Flask
     """
     app = Flask(__name__)
 
+    # Productos indexados por id, con la respuesta JSON de cada uno codificada una sola vez
+    # (con el mismo formato que jsonify)
+    catalog = ProductCatalog(products, encode=lambda p: (app.json.dumps(p) + "\n").encode("utf-8"))
+    app.extensions["catalog"] = catalog
+
     @app.route('/product/<int:product_id>', methods=['GET'])
     def get_product(product_id):
         """
@@ -51,16 +79,60 @@ def create_app():
         - Si no existe: devuelve un error con código 404 (Not Found)
         """
         # Implementa este endpoint
-        # Buscar el producto por id
-        product = next((p for p in products if p["id"] == product_id), None)
+        # Buscar el producto por id (O(1)) y obtener su JSON ya codificado
+        body = catalog.body(product_id)
 
-        if product is not None:
+        if body is not None:
             # Producto encontrado -> 200 OK
-            return jsonify(product), 200
+            return app.response_class(body, mimetype=app.json.mimetype), 200
         else:
             # Producto no encontrado -> 404 Not Found
             return jsonify({"error": "Product not found"}), 404
 
+    def batch_response(product_ids):
+        """
+        Devuelve {"products": [...], "missing": [...]} uniendo las respuestas ya
+        codificadas de cada producto, sin volver a serializarlos
+        """
+        found, missing = catalog.bodies(product_ids)
+        body = b"".join([
+            b'{"products":[',
+            b",".join(body.rstrip(b"\n") for body in found),
+            b'],"missing":',
+            app.json.dumps(missing).encode("utf-8"),
+            b"}\n",
+        ])
+        return app.response_class(body, mimetype=app.json.mimetype), 200
+
+    @app.route('/products', methods=['GET'])
+    def get_products():
+        """
+        Devuelve varios productos por id en una sola petición: GET /products?ids=1,2,3
+        - Los productos encontrados van en "products", en el orden pedido
+        - Los ids que no existen van en "missing"
+        """
+        if not request.args.get("ids"):
+            return jsonify({"error": "Falta el parámetro ids"}), 400
+        try:
+            product_ids = parse_ids(request.args["ids"].split(","))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return batch_response(product_ids)
+
+    @app.route('/products/batch', methods=['POST'])
+    def post_products_batch():
+        """
+        Como GET /products?ids=..., con los ids en el cuerpo: {"ids": [1, 2, 3]}
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get("ids"), list):
+            return jsonify({"error": "El cuerpo debe ser {\"ids\": [...]}"}), 400
+        try:
+            product_ids = parse_ids(data["ids"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return batch_response(product_ids)
+
 
     return app
 
@@ -26,3 +26,25 @@ def test_get_product_not_found(client):
     response = client.get("/product/999")
     assert response.status_code == 404
     assert "error" in response.json
+
+def test_get_products_batch(client):
+    """Test GET /products?ids=... (found products in order plus missing ids)"""
+    response = client.get("/products?ids=3,999,1,3")
+    assert response.status_code == 200
+    assert response.json == {
+        "products": [{"id": 3, "name": "Tablet", "price": 349.99},
+                     {"id": 1, "name": "Laptop", "price": 999.99}],
+        "missing": [999],
+    }
+    assert client.get("/products").status_code == 400
+    assert client.get("/products?ids=1,abc").status_code == 400
+
+def test_post_products_batch(client):
+    """Test POST /products/batch (same result as the GET with the ids in the body)"""
+    response = client.post("/products/batch", json={"ids": [2, 5]})
+    assert response.status_code == 200
+    assert response.json == {"products": [{"id": 2, "name": "Smartphone", "price": 699.99}],
+                             "missing": [5]}
+    assert client.post("/products/batch", json={"ids": []}).json == {"products": [], "missing": []}
+    assert client.post("/products/batch", json=[1, 2]).status_code == 400
+    assert client.post("/products/batch", json={"ids": [1.5]}).status_code == 400
@@ -27,26 +27,82 @@ Si la lista de tareas inicial está vacía:
 Tu tarea es implementar esta API en Flask.
 """
 
+import os
+import secrets
 from flask import Flask, jsonify, request
+from task_log import TaskLog
+from task_store import TaskStore
 
-# Esta lista almacenará todas las tareas
-tasks = []
-# Este contador se usará para asignar IDs únicos
-next_id = 1
+# Almacén en memoria de todas las tareas: indexado por id, en orden de inserción y con
+# los ids asignados de forma atómica
+default_store = TaskStore()
 
-def create_app():
+# Número máximo de operaciones en un lote de POST /tasks/batch
+MAX_BATCH_OPERATIONS = 1000
+
+
+def parse_operation(item):
+    """
+    Convierte una operación del lote en (op, id, nombre); lanza ValueError si no es válida
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Cada operación debe ser un objeto JSON")
+    op = item.get("op")
+    if op not in ("create", "update", "delete"):
+        raise ValueError("Field 'op' must be create, update or delete")
+    task_id = item.get("id")
+    name = item.get("name")
+    if op != "create" and (not isinstance(task_id, int) or isinstance(task_id, bool)):
+        raise ValueError("Field 'id' is required")
+    if op != "delete" and not name:
+        raise ValueError("Field 'name' is required")
+    return op, task_id, name
+
+
+def create_app(data_dir=None):
     """
     Crea y configura la aplicación Flask
+
+    Sin data_dir las tareas se guardan sólo en memoria, en el almacén del módulo. Con
+    data_dir se guardan en disco en ese directorio (registro de cambios y snapshots) y
+    se recuperan al crear la aplicación.
     """
     app = Flask(__name__)
 
+    store = default_store if data_dir is None else TaskStore(TaskLog(data_dir))
+    app.extensions["task_store"] = store
+
+    # Lista de tareas ya codificada y su versión. El ETag es la versión del almacén con
+    # un prefijo propio de esta aplicación, para que no se repita si el almacén vuelve a
+    # empezar desde la versión 0 (por ejemplo, al reiniciar con data_dir)
+    etag_prefix = secrets.token_hex(4)
+    encoded = (None, None)
+
     @app.route('/tasks', methods=['GET'])
     def get_tasks():
         """
         Devuelve la lista completa de tareas
+        La respuesta lleva un ETag con la versión de la lista; si la petición trae ese
+        ETag en If-None-Match (con comparación débil, también como W/"...") se
+        responde 304 sin cuerpo
         """
         # Implementa este endpoint
-        return jsonify(tasks), 200
+        nonlocal encoded
+        # Si el cliente ya tiene esta versión se responde 304 sin leer las tareas
+        etag = f"{etag_prefix}-{store.version}"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        version, body = encoded
+        if version != store.version:
+            version, tasks = store.snapshot()
+            body = (app.json.dumps(tasks) + "\n").encode("utf-8")
+            encoded = (version, body)
+        response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+        response.set_etag(f"{etag_prefix}-{version}")
+        return response
 
     @app.route('/tasks', methods=['POST'])
     def add_task():
@@ -55,8 +111,6 @@ def create_app():
         El cuerpo de la solicitud debe incluir un JSON con el campo "name"
         """
         # Implementa este endpoint
-        global next_id, tasks
-
         data = request.get_json(silent=True) or {}
         name = data.get("name")
 
@@ -64,9 +118,7 @@ def create_app():
             # Petición mal formada
             return jsonify({"error": "Field 'name' is required"}), 400
 
-        task = {"id": next_id, "name": name}
-        tasks.append(task)
-        next_id += 1
+        task = store.add(name)
 
         # 201 Created tiene sentido para POST que crea recursos
         return jsonify(task), 201
@@ -76,12 +128,8 @@ def create_app():
         """
         Elimina una tarea específica por su ID
         """
-        global tasks
-
-        for i, task in enumerate(tasks):
-            if task["id"] == task_id:
-                tasks.pop(i)
-                return jsonify({"message": "Task deleted"}), 200
+        if store.delete(task_id) is not None:
+            return jsonify({"message": "Task deleted"}), 200
 
         # No encontrada
         return jsonify({"error": "Task not found"}), 404
@@ -99,15 +147,67 @@ def create_app():
         if not name:
             return jsonify({"error": "Field 'name' is required"}), 400
 
-        for task in tasks:
-            if task["id"] == task_id:
-                task["name"] = name
-                return jsonify(task), 200
+        task = store.update(task_id, name)
+        if task is not None:
+            return jsonify(task), 200
 
         return jsonify({"error": "Task not found"}), 404
 
+    @app.route('/tasks/batch', methods=['POST'])
+    def batch_tasks():
+        """
+        Aplica un lote de operaciones sobre las tareas en una sola petición
+        El cuerpo debe ser {"operations": [...], "atomic": false}, con operaciones como
+        {"op": "create", "name": ...}, {"op": "update", "id": ..., "name": ...} o
+        {"op": "delete", "id": ...}
+        Devuelve el código y el resultado de cada operación en "results"
+        Con "atomic": true se aplican todas o ninguna: si alguna está mal formada se
+        devuelve 400 y si alguna tarea no existe, 409 (las demás tienen código 424)
+        """
+        data = request.get_json(silent=True)
+        operations = data.get("operations") if isinstance(data, dict) else None
+        if not isinstance(operations, list):
+            return jsonify({"error": "Field 'operations' must be a list"}), 400
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return jsonify({"error": f"At most {MAX_BATCH_OPERATIONS} operations per batch"}), 400
+        atomic = data.get("atomic", False)
+        if not isinstance(atomic, bool):
+            return jsonify({"error": "Field 'atomic' must be true or false"}), 400
+
+        # Las operaciones mal formadas no se aplican; en modo atómico invalidan el lote
+        parsed = []
+        errors = {}
+        for i, item in enumerate(operations):
+            try:
+                parsed.append(parse_operation(item))
+            except ValueError as e:
+                errors[i] = str(e)
+        if atomic and errors:
+            results = [{"status": 400, "error": errors[i]} if i in errors else {"status": 424}
+                       for i in range(len(operations))]
+            return jsonify({"applied": False, "results": results}), 400
+
+        # Todas las operaciones válidas se aplican con una sola toma del cerrojo
+        tasks, applied = store.apply(parsed, atomic=atomic)
+        tasks = iter(tasks)
+        results = []
+        for i, item in enumerate(operations):
+            if i in errors:
+                results.append({"status": 400, "error": errors[i]})
+                continue
+            task = next(tasks)
+            if task is None:
+                results.append({"status": 404, "error": "Task not found"})
+            elif not applied:
+                # Operación válida que no se aplica porque falló otra del lote
+                results.append({"status": 424})
+            else:
+                status = 201 if item["op"] == "create" else 200
+                results.append({"status": status, "task": task})
+        return jsonify({"applied": applied, "results": results}), 200 if applied else 409
+
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    app = create_app(os.environ.get("TASKS_DATA_DIR"))
     app.run(debug=True)
\ No newline at end of file
@@ -62,3 +62,81 @@ def test_update_nonexistent_task(client):
     response = client.put("/tasks/999", json={"name": "Tarea inexistente"})
     assert response.status_code == 404
     assert response.json == {"error": "Task not found"}
+
+
+def test_batch_operations(client):
+    """Test POST /tasks/batch (each operation reports its own status)"""
+    task_id = client.post("/tasks", json={"name": "Tarea del lote"}).json["id"]
+    response = client.post("/tasks/batch", json={"operations": [
+        {"op": "create", "name": "Nueva"},
+        {"op": "update", "id": task_id, "name": "Renombrada"},
+        {"op": "delete", "id": 999},
+        {"op": "update", "id": task_id},
+    ]})
+    assert response.status_code == 200
+    results = response.json["results"]
+    assert [result["status"] for result in results] == [201, 200, 404, 400]
+    assert results[1]["task"] == {"id": task_id, "name": "Renombrada"}
+    tasks = client.get("/tasks").json
+    assert {"id": task_id, "name": "Renombrada"} in tasks
+    assert results[0]["task"] in tasks
+
+
+def test_batch_atomic(client):
+    """Test POST /tasks/batch with atomic=true (nothing is applied if one operation fails)"""
+    task_id = client.post("/tasks", json={"name": "Tarea atómica"}).json["id"]
+    before = client.get("/tasks").json
+    response = client.post("/tasks/batch", json={"atomic": True, "operations": [
+        {"op": "create", "name": "No se crea"},
+        {"op": "delete", "id": task_id},
+        {"op": "update", "id": 999, "name": "No existe"},
+    ]})
+    assert response.status_code == 409
+    assert [result["status"] for result in response.json["results"]] == [424, 424, 404]
+    assert client.get("/tasks").json == before
+
+    response = client.post("/tasks/batch", json={"atomic": True, "operations": [
+        {"op": "create", "name": "Se crea"}, {"op": "delete", "id": task_id},
+    ]})
+    assert response.status_code == 200 and response.json["applied"]
+    assert client.post("/tasks/batch", json={"operations": {}}).status_code == 400
+    for atomic in ["false", "no", 1, None]:
+        response = client.post("/tasks/batch", json={"atomic": atomic, "operations": [
+            {"op": "create", "name": "No se crea"},
+        ]})
+        assert response.status_code == 400
+    assert client.get("/tasks").json[-1]["name"] == "Se crea"
+
+
+def test_persistent_tasks(tmp_path):
+    """Test create_app(data_dir) (tasks are recovered by a new app on the same directory)"""
+    app = create_app(data_dir=str(tmp_path))
+    client = app.test_client()
+    task_id = client.post("/tasks", json={"name": "Persistente"}).json["id"]
+    client.post("/tasks/batch", json={"operations": [{"op": "create", "name": "Otra"}]})
+    app.extensions["task_store"].close()
+
+    client = create_app(data_dir=str(tmp_path)).test_client()
+    assert client.get("/tasks").json == [{"id": task_id, "name": "Persistente"},
+                                         {"id": task_id + 1, "name": "Otra"}]
+
+
+def test_get_tasks_etag(client):
+    """Test GET /tasks with If-None-Match (304 until the list changes)"""
+    response = client.get("/tasks")
+    etag = response.headers["ETag"]
+    assert not response.headers["ETag"].startswith("W/")
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    # If-None-Match usa la comparación débil: un W/ delante del ETag también vale
+    response = client.get("/tasks", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    response = client.get("/tasks", headers={"If-None-Match": f'"otro", W/{etag}'})
+    assert response.status_code == 304
+
+    client.post("/tasks", json={"name": "Cambia la versión"})
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert {"name": "Cambia la versión"}.items() <= response.json[-1].items()
@@ -30,7 +30,15 @@ Ejemplos:
 4. `GET /products?name=pro` debe devolver productos cuyo nombre contenga "pro" (como "Laptop Pro").
 """
 
-from flask import Flask, jsonify, request
+import base64
+import binascii
+import json
+import math
+from flask import Flask, Response, jsonify, request, url_for
+from catalog import ProductCatalog
+from columnar import ColumnarCatalog
+from fuzzy import DEFAULT_THRESHOLD
+from result_cache import ResultCache
 
 # Lista de productos predefinida con categorías
 products = [
@@ -44,12 +52,167 @@ products = [
     {"id": 8, "name": "Smart Watch", "price": 199.99, "category": "electronics"}
 ]
 
-def create_app():
+# Tamaño de página por defecto y máximo cuando se pagina con limit/cursor
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Productos codificados en cada trozo de una respuesta en streaming
+STREAM_CHUNK_SIZE = 100
+
+# Campos por los que se puede ordenar con el parámetro sort
+SORT_FIELDS = ("id", "name", "price")
+
+# Consultas distintas cuyas respuestas se guardan en la caché de resultados
+RESULT_CACHE_SIZE = 256
+
+# Límites de los intervalos de precio de /products/facets si no se indica buckets, y
+# número máximo de límites que se aceptan
+DEFAULT_PRICE_BUCKETS = (0, 100, 250, 500, 1000)
+MAX_PRICE_BUCKETS = 50
+
+
+def parse_filters(args):
+    """
+    Devuelve los filtros de category, min_price, max_price y name de los parámetros de
+    consulta, normalizados para usarlos como clave de la caché
+
+    Los precios que no son números finitos (tampoco "nan" ni "inf") no filtran, y el
+    nombre se pasa a minúsculas porque la búsqueda no distingue mayúsculas.
+    """
+    prices = {}
+    for arg in ("min_price", "max_price"):
+        prices[arg] = None
+        if args.get(arg) is not None:
+            try:
+                price = float(args[arg])
+            except ValueError:
+                continue
+            if math.isfinite(price):
+                prices[arg] = price
+    name = args.get("name")
+    return {
+        "category": args.get("category") or None,
+        "min_price": prices["min_price"],
+        "max_price": prices["max_price"],
+        "name": name.lower() if name else None,
+    }
+
+
+def parse_buckets(value):
+    """
+    Convierte "0,100,500" en los límites (0.0, 100.0, 500.0); lanza ValueError si no son
+    números finitos en orden estrictamente creciente
+    """
+    try:
+        edges = tuple(float(edge) for edge in value.split(","))
+    except ValueError:
+        raise ValueError(f"buckets no válido: {value!r}") from None
+    if not all(math.isfinite(edge) for edge in edges):
+        raise ValueError("Los límites de buckets deben ser números finitos")
+    if len(edges) > MAX_PRICE_BUCKETS:
+        raise ValueError(f"buckets admite como mucho {MAX_PRICE_BUCKETS} límites")
+    if any(low >= high for low, high in zip(edges, edges[1:])):
+        raise ValueError("Los límites de buckets deben estar en orden creciente")
+    return edges
+
+
+def is_int(value):
+    """
+    Indica si un valor de JSON es un entero (no un booleano)
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_price(value):
+    """
+    Indica si un valor de JSON es un precio: un número finito
+    """
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value))
+
+
+# Comprobación del valor de la clave de un cursor para cada campo de sort
+CURSOR_VALUES = {
+    "id": is_int,
+    "name": lambda value: isinstance(value, str),
+    "price": is_price,
+}
+
+
+def encode_cursor(key, sort=None, order="asc"):
+    """
+    Convierte la clave del último producto de una página en un cursor opaco
+
+    La clave es su posición en el catálogo o, si se ordena por un campo, su (valor, id).
+    El cursor guarda también la ordenación, porque la clave sólo sirve para esa.
+    """
+    raw = json.dumps([sort, order, key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort=None, order="asc"):
+    """
+    Devuelve la clave guardada en un cursor; lanza ValueError si no es válido o si
+    corresponde a otra ordenación
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_order, key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"Cursor no válido: {cursor!r}") from None
+    if [cursor_sort, cursor_order] != [sort, order]:
+        raise ValueError("El cursor corresponde a otra ordenación")
+    if sort is None:
+        valid = is_int(key)
+    else:
+        # (valor, id): el valor es del tipo del campo, o null si el producto no lo tiene
+        valid = (isinstance(key, list) and len(key) == 2 and is_int(key[1])
+                 and (key[0] is None and sort != "id" or CURSOR_VALUES[sort](key[0])))
+    if not valid:
+        raise ValueError(f"Cursor no válido: {cursor!r}")
+    return key
+
+
+def iter_json_array(items, dumps, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Genera un array JSON por trozos de `chunk_size` elementos
+
+    Sólo hay un trozo en memoria a la vez, y el primero se envía antes de codificar el
+    último elemento.
+    """
+    yield "["
+    first = True
+    chunk = []
+    for item in items:
+        chunk.append(dumps(item))
+        if len(chunk) == chunk_size:
+            yield ("" if first else ",") + ",".join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield ("" if first else ",") + ",".join(chunk)
+    yield "]\n"
+
+
+def create_app(columnar=False):
     """
     Crea y configura la aplicación Flask
+
+    Con columnar=True los productos se guardan en columnas de NumPy y los filtros de
+    categoría y precio se calculan como una única máscara vectorizada, lo que compensa
+    en catálogos grandes.
     """
     app = Flask(__name__)
 
+    # Catálogo con índices por categoría, precio y trigramas del nombre, o por columnas
+    catalog = ColumnarCatalog(products) if columnar else ProductCatalog(products)
+    app.extensions["catalog"] = catalog
+
+    # Respuestas ya codificadas de las consultas recientes; se invalida con cada
+    # escritura en el catálogo (catalog.version)
+    cache = ResultCache(RESULT_CACHE_SIZE)
+    app.extensions["result_cache"] = cache
+
     @app.route('/products', methods=['GET'])
     def get_products():
         """
@@ -59,48 +222,175 @@ def create_app():
         - min_price: Precio mínimo
         - max_price: Precio máximo
         - name: Buscar por nombre (coincidencia parcial)
+        - limit: Número máximo de productos por página
+        - cursor: Cursor de la página siguiente (cabecera X-Next-Cursor de la anterior)
+        - sort: Ordenar por id, name o price (los empates se ordenan por id)
+        - order: asc (por defecto) o desc; desc necesita sort
+        - fuzzy: si es true, name se busca de forma aproximada (tolerante a erratas) y
+          los productos se devuelven de más a menos parecidos, con su puntuación en
+          "score"; admite limit y min_score (entre 0 y 1, por defecto 0.3), pero no
+          sort ni cursor
+        - explain: si es true, en lugar de los productos se devuelve el plan de la
+          consulta, con las filas estimadas y reales de cada paso
+
+        Sin limit ni cursor se devuelven todos los productos en streaming. Con sort y
+        limit sólo se seleccionan los `limit` primeros, sin ordenar todo el resultado.
         """
         # Implementa aquí el filtrado de productos según los parámetros de consulta
         # 1. Obtén los parámetros de consulta usando request.args
         # 2. Filtra la lista de productos según los parámetros proporcionados
         # 3. Devuelve la lista filtrada en formato JSON con código 200
-        # 1. Obtener parámetros de consulta
-        category = request.args.get("category")
-        min_price = request.args.get("min_price")
-        max_price = request.args.get("max_price")
-        name = request.args.get("name")
+        # 1-2. Obtener los filtros de los parámetros de consulta, ya convertidos
+        filters = parse_filters(request.args)
 
-        # 2. Empezamos con todos los productos
-        filtered = products
+        if request.args.get("fuzzy", "").lower() in ("1", "true", "yes"):
+            return search_products(filters)
+        if request.args.get("explain", "").lower() in ("1", "true", "yes"):
+            return jsonify(catalog.explain(**filters)), 200
 
-        # 3. Aplicar filtros uno a uno si están presentes
+        sort = request.args.get("sort")
+        order = request.args.get("order", "asc").lower()
+        if sort is not None:
+            sort = sort.lower()
+            if sort not in SORT_FIELDS:
+                return jsonify({"error": f"sort debe ser uno de: {', '.join(SORT_FIELDS)}"}), 400
+        if order not in ("asc", "desc"):
+            return jsonify({"error": "order debe ser asc o desc"}), 400
+        if order == "desc" and sort is None:
+            # Sin sort los productos van en el orden del catálogo, que no se invierte
+            return jsonify({"error": "order=desc necesita el parámetro sort"}), 400
+        ordering = {"sort": sort, "descending": order == "desc"}
 
-        if category:
-            filtered = [p for p in filtered if p["category"] == category]
-
-        if min_price is not None:
+        limit = request.args.get("limit")
+        cursor = request.args.get("cursor")
+        paginated = limit is not None or cursor is not None
+        if paginated:
             try:
-                min_val = float(min_price)
-                filtered = [p for p in filtered if p["price"] >= min_val]
-            except ValueError:
-                # Si min_price no es numérico, simplemente no filtramos por precio mínimo
-                pass
+                size = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+                after = None if cursor is None else decode_cursor(cursor, sort, order)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if size < 1:
+                return jsonify({"error": "limit debe ser mayor que 0"}), 400
+            size = min(size, MAX_PAGE_SIZE)
 
-        if max_price is not None:
-            try:
-                max_val = float(max_price)
-                filtered = [p for p in filtered if p["price"] <= max_val]
-            except ValueError:
-                # Si max_price no es numérico, no filtramos por precio máximo
-                pass
+        # 3. Buscar la respuesta en la caché con los argumentos ya normalizados. La
+        # versión se lee antes de consultar el catálogo: si hay una escritura mientras
+        # tanto, la respuesta se guarda con la versión antigua y no se usa
+        key = (*filters.values(), sort, order, size if paginated else None, cursor)
+        version = catalog.version
+        cached = cache.get(key, version)
+        if cached is not None:
+            body, headers = cached
+            response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+            response.headers.update(headers)
+            response.headers["X-Cache"] = "HIT"
+            return response
+
+        if not paginated:
+            # 4. Sin paginar: el array se codifica y se envía por trozos (y se guarda en la
+            # caché al terminar si no es demasiado grande)
+            items = catalog.iter_filter(**filters, **ordering)
+            chunks = (chunk.encode("utf-8") for chunk in iter_json_array(items, app.json.dumps))
+            response = Response(cache.store_stream(key, version, chunks),
+                                status=200, mimetype=app.json.mimetype)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        # 4. Paginado: la página empieza detrás de la clave guardada en el cursor
+        page, next_key = catalog.page(**filters, **ordering, after=after, limit=size)
+        headers = {}
+        if next_key is not None:
+            next_cursor = encode_cursor(next_key, sort, order)
+            headers["X-Next-Cursor"] = next_cursor
+            args = {arg: value for arg, value in request.args.items() if arg != "cursor"}
+            link = url_for("get_products", **args, cursor=next_cursor)
+            headers["Link"] = f'<{link}>; rel="next"'
+        body = (app.json.dumps(page) + "\n").encode("utf-8")
+        cache.put(key, version, body, headers)
+
+        response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+        response.headers.update(headers)
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    def search_products(filters):
+        """
+        Devuelve los productos cuyo nombre se parece a filters["name"], ordenados por
+        puntuación
+        """
+        if not filters["name"]:
+            return jsonify({"error": "fuzzy necesita el parámetro name"}), 400
+        if "sort" in request.args or "cursor" in request.args:
+            return jsonify({"error": "fuzzy no admite sort ni cursor"}), 400
+        try:
+            size = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            threshold = float(request.args.get("min_score", DEFAULT_THRESHOLD))
+        except ValueError:
+            return jsonify({"error": "limit y min_score deben ser numéricos"}), 400
+        if size < 1 or not 0 < threshold <= 1:
+            return jsonify({"error": "limit debe ser mayor que 0 y min_score estar entre 0 y 1"}), 400
+        size = min(size, MAX_PAGE_SIZE)
 
-        if name:
-            name_lower = name.lower()
-            filtered = [p for p in filtered if name_lower in p["name"].lower()]
+        key = ("fuzzy", *filters.values(), threshold, size)
+        version = catalog.version
+        cached = cache.get(key, version)
+        if cached is None:
+            query = filters.pop("name")
+            matches = catalog.search(query, **filters, threshold=threshold, limit=size)
+            results = [{**product, "score": score} for product, score in matches]
+            body = (app.json.dumps(results) + "\n").encode("utf-8")
+            cache.put(key, version, body)
+        else:
+            body = cached[0]
+        response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+        response.headers["X-Cache"] = "MISS" if cached is None else "HIT"
+        return response
 
-        # 4. Devolver lista filtrada (aunque esté vacía) con código 200
-        return jsonify(filtered), 200
+    @app.route('/products/facets', methods=['GET'])
+    def get_product_facets():
+        """
+        Devuelve cuántos productos cumplen los filtros de /products, en total, por
+        categoría y por intervalo de precio.
+        Parámetros admitidos: los filtros de /products y
+        - buckets: límites de los intervalos de precio separados por comas (0,100,500
+          da [0, 100), [100, 500) y [500, ∞))
+        """
+        filters = parse_filters(request.args)
+        buckets = DEFAULT_PRICE_BUCKETS
+        if request.args.get("buckets"):
+            try:
+                buckets = parse_buckets(request.args["buckets"])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        key = ("facets", *filters.values(), buckets)
+        version = catalog.version
+        cached = cache.get(key, version)
+        if cached is None:
+            body = (app.json.dumps(catalog.facets(**filters, buckets=buckets)) + "\n").encode("utf-8")
+            cache.put(key, version, body)
+        else:
+            body = cached[0]
+        response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+        response.headers["X-Cache"] = "MISS" if cached is None else "HIT"
+        return response
 
+    @app.route('/products/stats', methods=['GET'])
+    def get_product_stats():
+        """
+        Devuelve count, sum, min, max y avg de los precios de cada categoría.
+        Parámetros admitidos:
+        - category: devolver sólo las estadísticas de esa categoría (404 si no tiene
+          productos con precio)
+        """
+        category = request.args.get("category")
+        if not category:
+            return jsonify(catalog.price_stats()), 200
+        stats = catalog.price_stats(category)
+        if stats is None:
+            return jsonify({"error": "Category not found"}), 404
+        return jsonify(stats), 200
 
     return app
 
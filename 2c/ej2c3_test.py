@@ -1,3 +1,5 @@
+import base64
+import json
 import pytest
 from flask.testing import FlaskClient
 from ej2c3 import create_app
@@ -99,6 +101,15 @@ def test_combined_filters(client):
     assert data[0]["name"] == "Coffee Maker Pro"
     assert data[0]["price"] <= 100
 
+def test_non_finite_prices_are_ignored(client):
+    """
+    Prueba que min_price y max_price no finitos (nan, inf) no filtran, como los no numéricos
+    """
+    everything = client.get("/products").json
+    for value in ["nan", "inf", "-inf", "NaN"]:
+        assert client.get(f"/products?min_price={value}").json == everything
+        assert client.get(f"/products?max_price={value}").json == everything
+
 def test_filter_no_results(client):
     """
     Prueba filtrar con criterios que no devuelven resultados
@@ -114,3 +125,178 @@ def test_filter_no_results(client):
     assert response.status_code == 200
     data = response.json
     assert len(data) == 0  # No debería haber productos
+
+def test_pagination_with_cursor(client):
+    """
+    Prueba paginar con limit y el cursor de la cabecera X-Next-Cursor
+    """
+    seen = []
+    response = client.get("/products?category=electronics&limit=2")
+    while True:
+        assert response.status_code == 200
+        assert len(response.json) <= 2
+        seen.extend(p["id"] for p in response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        assert f"cursor={cursor}" in response.headers["Link"]
+        response = client.get(f"/products?category=electronics&limit=2&cursor={cursor}")
+    assert seen == [1, 2, 3, 7, 8]
+
+def test_pagination_errors(client):
+    """
+    Prueba que un limit o un cursor no válidos devuelven 400
+    """
+    assert client.get("/products?limit=0").status_code == 400
+    assert client.get("/products?limit=abc").status_code == 400
+    assert client.get("/products?cursor=%%%").status_code == 400
+
+def test_forged_cursor(client):
+    """
+    Prueba que un cursor con una clave del tipo equivocado devuelve 400
+    """
+    def cursor(sort, order, key):
+        raw = json.dumps([sort, order, key]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    for sort, key in [("price", ["abc", 1]), ("price", [10.0, "1"]), ("price", [10.0, True]),
+                      ("name", [5, 1]), ("id", [None, 1]), ("id", [1.5, 1]), (None, "3"),
+                      (None, True), ("price", [10.0]), ("price", [float("nan"), 1])]:
+        url = f"/products?limit=2&cursor={cursor(sort, 'asc', key)}"
+        if sort is not None:
+            url += f"&sort={sort}"
+        assert client.get(url).status_code == 400, (sort, key)
+    assert client.get(f"/products?sort=price&limit=2&cursor={cursor('price', 'asc', [10, 1])}").status_code == 200
+
+def test_streamed_response(client):
+    """
+    Prueba que la respuesta sin paginar se envía en streaming y es un array JSON válido
+    """
+    response = client.get("/products?max_price=200")
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    assert [p["id"] for p in response.json] == [5, 6, 7, 8]
+
+def test_sort_and_top_k(client):
+    """
+    Prueba ordenar con sort/order y seleccionar los primeros con limit
+    """
+    response = client.get("/products?sort=price&order=desc&limit=3")
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json] == [1, 2, 3]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/products?sort=price&order=desc&limit=3&cursor={cursor}")
+    assert [p["id"] for p in response.json] == [4, 8, 5]
+
+    # Un cursor sólo sirve para la ordenación con la que se generó
+    assert client.get(f"/products?sort=name&limit=3&cursor={cursor}").status_code == 400
+
+    response = client.get("/products?category=furniture&sort=name")
+    assert [p["name"] for p in response.json] == ["Ergonomic Chair", "Office Desk"]
+
+    assert client.get("/products?sort=color").status_code == 400
+    assert client.get("/products?sort=price&order=up").status_code == 400
+    # Sin sort no se puede invertir el orden del catálogo
+    assert client.get("/products?order=desc").status_code == 400
+    assert client.get("/products?order=desc&limit=2").status_code == 400
+    assert client.get("/products?order=asc&limit=2").status_code == 200
+
+def test_result_cache(client):
+    """
+    Prueba que las consultas equivalentes comparten la respuesta guardada y que una
+    escritura en el catálogo la invalida
+    """
+    first = client.get("/products?category=electronics&max_price=700&limit=10")
+    assert first.headers["X-Cache"] == "MISS"
+    again = client.get("/products?max_price=700.0&limit=10&category=electronics")
+    assert again.headers["X-Cache"] == "HIT"
+    assert again.json == first.json
+
+    # La respuesta en streaming se guarda cuando se termina de enviar
+    response = client.get("/products?name=PRO")
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(response.json) == 2
+    response = client.get("/products?name=pro")
+    assert response.headers["X-Cache"] == "HIT"
+    assert len(response.json) == 2
+
+    client.application.extensions["catalog"].update(2, price=799.99)
+    response = client.get("/products?category=electronics&max_price=700&limit=10")
+    assert response.headers["X-Cache"] == "MISS"
+    assert 2 not in [p["id"] for p in response.json]
+    stats = client.application.extensions["result_cache"].stats()
+    assert stats["hits"] == 2 and stats["invalidations"] == 1
+
+def test_facets(client):
+    """
+    Prueba los recuentos por categoría e intervalo de precio de /products/facets
+    """
+    response = client.get("/products/facets?max_price=700&buckets=0,200,500")
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json == {
+        "total": 7,
+        "categories": {"electronics": 4, "furniture": 2, "appliances": 1},
+        "price_buckets": [
+            {"min": 0, "max": 200, "count": 4},
+            {"min": 200, "max": 500, "count": 2},
+            {"min": 500, "max": None, "count": 1},
+        ],
+    }
+    assert client.get("/products/facets?max_price=700.0&buckets=0,200,500").headers["X-Cache"] == "HIT"
+
+    response = client.get("/products/facets?category=furniture&name=desk")
+    assert response.json["total"] == 1
+    assert response.json["categories"] == {"furniture": 1}
+
+    assert client.get("/products/facets?buckets=100,0").status_code == 400
+    assert client.get("/products/facets?buckets=a,b").status_code == 400
+    for buckets in ["nan,1", "0,inf", "-inf,0", "0,nan"]:
+        response = client.get(f"/products/facets?buckets={buckets}")
+        assert response.status_code == 400, buckets
+
+def test_price_stats(client):
+    """
+    Prueba las estadísticas de precio por categoría de /products/stats
+    """
+    response = client.get("/products/stats")
+    assert response.status_code == 200
+    assert response.json["furniture"] == {
+        "count": 2, "sum": 439.98, "min": 189.99, "max": 249.99, "avg": 219.99,
+    }
+    assert response.json["appliances"]["count"] == 1
+
+    client.application.extensions["catalog"].delete(5)
+    response = client.get("/products/stats?category=furniture")
+    assert response.json["min"] == 249.99 and response.json["count"] == 1
+
+    assert client.get("/products/stats?category=toys").status_code == 404
+
+def test_fuzzy_name_search(client):
+    """
+    Prueba la búsqueda aproximada por nombre con fuzzy=true
+    """
+    assert client.get("/products?name=smarphone").json == []
+    response = client.get("/products?name=smarphone&fuzzy=true")
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json] == [2, 8]
+    assert response.json[0]["score"] > response.json[1]["score"] >= 0.3
+
+    response = client.get("/products?name=smart&fuzzy=true&min_score=0.2&limit=1")
+    assert len(response.json) == 1
+
+    assert client.get("/products?fuzzy=true").status_code == 400
+    assert client.get("/products?name=desk&fuzzy=true&sort=price").status_code == 400
+    assert client.get("/products?name=desk&fuzzy=true&min_score=2").status_code == 400
+
+def test_explain(client):
+    """
+    Prueba que explain=true devuelve el plan de la consulta en lugar de los productos
+    """
+    response = client.get("/products?category=electronics&min_price=500&name=pro&explain=true")
+    assert response.status_code == 200
+    plan = response.json["plan"]
+    assert plan[0]["operation"] == "scan"
+    assert {step["filter"] for step in plan} == {"category", "price", "name"}
+    assert response.json["actual_rows"] == 1
@@ -0,0 +1,222 @@
+"""
+Búsqueda aproximada de productos por nombre, tolerante a erratas.
+
+El filtro name de /products busca una subcadena exacta, así que "smarphone" no encuentra
+"Smartphone X". FuzzyIndex compara las palabras de la búsqueda con las palabras de los
+nombres por similitud de trigramas, como pg_trgm: cada palabra se rodea de espacios
+("  smartphone ") y la similitud de dos palabras es la proporción de trigramas que
+comparten, |A ∩ B| / |A ∪ B|.
+
+Para no comparar la búsqueda con todos los nombres se mantienen dos índices:
+
+- vocabulario: palabra -> ids de los productos cuyo nombre la contiene
+- trigramas: trigrama -> palabras del vocabulario que lo contienen
+
+Así, sólo se calcula la similitud de las palabras del vocabulario que comparten algún
+trigrama con la búsqueda, y el coste depende del tamaño del vocabulario que se parece a
+la búsqueda, no del número de productos. La puntuación de un producto es la media, para
+cada palabra de la búsqueda, de la mejor similitud con una palabra de su nombre; sólo
+cuentan las palabras del vocabulario que llegan al umbral.
+
+Los productos que tienen la misma mejor similitud para cada palabra de la búsqueda
+tienen la misma puntuación, así que se agrupan con operaciones de conjuntos y se
+recorren los grupos de mayor a menor puntuación hasta completar el límite pedido, sin
+puntuar uno a uno todos los productos parecidos.
+"""
+
+import heapq
+import itertools
+import math
+import re
+
+# Similitud mínima por defecto, la misma que usa pg_trgm
+DEFAULT_THRESHOLD = 0.3
+
+# Combinaciones de grupos de similitud a partir de las cuales search() suma la
+# puntuación de cada producto en lugar de recorrer las combinaciones
+MAX_COMBINATIONS = 1000
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text):
+    """
+    Devuelve las palabras de un texto en minúsculas
+    """
+    return _WORD.findall(text.lower())
+
+
+def word_trigrams(word):
+    """
+    Devuelve los trigramas de una palabra rodeada de espacios (dos delante y uno detrás)
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Índice de las palabras de los nombres para buscar por similitud de trigramas
+    """
+
+    def __init__(self, items=()):
+        self._postings = {}
+        self._by_trigram = {}
+        for key, name in items:
+            self.add(key, name)
+
+    def __len__(self):
+        return len(self._postings)
+
+    def add(self, key, name):
+        """
+        Indexa las palabras del nombre `name` del producto `key`
+        """
+        for word in set(words(name)):
+            keys = self._postings.get(word)
+            if keys is None:
+                keys = self._postings[word] = set()
+                for gram in word_trigrams(word):
+                    self._by_trigram.setdefault(gram, set()).add(word)
+            keys.add(key)
+
+    def remove(self, key, name):
+        """
+        Quita el producto `key`, indexado con el nombre `name`
+        """
+        for word in set(words(name)):
+            keys = self._postings.get(word)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._postings[word]
+                for gram in word_trigrams(word):
+                    similar = self._by_trigram[gram]
+                    similar.discard(word)
+                    if not similar:
+                        del self._by_trigram[gram]
+
+    def similar_words(self, word, threshold=DEFAULT_THRESHOLD):
+        """
+        Devuelve las palabras del vocabulario con similitud >= threshold con `word`, como
+        un diccionario palabra -> similitud
+        """
+        grams = word_trigrams(word)
+        shared = {}
+        for gram in grams:
+            for candidate in self._by_trigram.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        similar = {}
+        for candidate, common in shared.items():
+            score = common / (len(grams) + len(word_trigrams(candidate)) - common)
+            if score >= threshold:
+                similar[candidate] = score
+        return similar
+
+    def search(self, query, threshold=DEFAULT_THRESHOLD, limit=None, accept=None):
+        """
+        Devuelve los productos más parecidos a `query` como una lista de (clave, puntuación),
+        de mayor a menor puntuación y, con empates, de menor a mayor clave
+
+        Sólo se devuelven los productos con puntuación >= threshold y, si se da, para los
+        que accept(clave) es cierto; como mucho `limit`.
+        """
+        terms = words(query)
+        if not terms:
+            return []
+        if len(terms) == 1:
+            # Con una palabra cada grupo de similitud es un grupo de resultados
+            return self._collect(self._groups(terms[0], threshold), limit, accept)
+
+        # Para cada palabra de la búsqueda, los productos agrupados por su mejor similitud
+        # (de mayor a menor, sin repetir productos) y todos los que tienen alguna
+        groups = []
+        for term in terms:
+            term_groups = list(self._groups(term, threshold))
+            groups.append((term_groups, set().union(*(keys for _, keys in term_groups))))
+        if math.prod(len(term_groups) + 1 for term_groups, _ in groups) > MAX_COMBINATIONS:
+            return self._search_scores(groups, threshold, limit, accept)
+
+        # Cada combinación elige un grupo por palabra (o ninguno, -1) y todos sus
+        # productos tienen la misma puntuación, así que se recorren de mayor a menor y
+        # sólo se calculan las intersecciones hasta completar `limit`
+        combos = {}
+        for choice in itertools.product(*(range(-1, len(term_groups)) for term_groups, _ in groups)):
+            total = sum(groups[t][0][i][0] for t, i in enumerate(choice) if i >= 0)
+            score = round(total / len(terms), 9)
+            if score > 0 and score >= threshold:
+                combos.setdefault(score, []).append(choice)
+        batches = (
+            (score, set().union(*(self._combination(groups, choice) for choice in combos[score])))
+            for score in sorted(combos, reverse=True)
+        )
+        return self._collect(batches, limit, accept)
+
+    @staticmethod
+    def _collect(batches, limit, accept):
+        """
+        Devuelve [(clave, puntuación), ...] a partir de grupos (puntuación, claves) que
+        llegan de mayor a menor puntuación, con empates de menor a mayor clave; deja de
+        pedir grupos al completar `limit`
+        """
+        results = []
+        for score, keys in batches:
+            if accept is not None:
+                keys = filter(accept, keys)
+            if limit is None:
+                found = sorted(keys)
+            else:
+                found = heapq.nsmallest(limit - len(results), keys)
+            results.extend((key, round(score, 4)) for key in found)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def _groups(self, term, threshold):
+        """
+        Genera (similitud, claves) de los productos con alguna palabra parecida a `term`,
+        agrupados por su mejor similitud de mayor a menor
+        """
+        similar = self.similar_words(term, threshold)
+        seen = set()
+        for score in sorted(set(similar.values()), reverse=True):
+            keys = set().union(*(self._postings[word] for word, similarity in similar.items()
+                                 if similarity == score))
+            keys -= seen
+            seen |= keys
+            yield score, keys
+
+    @staticmethod
+    def _combination(groups, choice):
+        """
+        Productos que están en el grupo elegido de cada palabra y en ninguno de las
+        palabras con -1
+        """
+        included = sorted((groups[t][0][i][1] for t, i in enumerate(choice) if i >= 0), key=len)
+        keys = included[0].intersection(*included[1:])
+        for t, i in enumerate(choice):
+            if i < 0 and keys:
+                keys -= groups[t][1]
+        return keys
+
+    @staticmethod
+    def _search_scores(groups, threshold, limit, accept):
+        """
+        search() sumando la puntuación de cada producto, para búsquedas con demasiadas
+        combinaciones de grupos
+        """
+        scores = {}
+        for term_groups, _ in groups:
+            for similarity, keys in term_groups:
+                for key in keys:
+                    scores[key] = scores.get(key, 0.0) + similarity
+        ranked = (
+            (-round(total / len(groups), 9), key) for key, total in scores.items()
+            if round(total / len(groups), 9) >= threshold and (accept is None or accept(key))
+        )
+        if limit is None:
+            ranked = sorted(ranked)
+        else:
+            ranked = heapq.nsmallest(limit, ranked)
+        return [(key, round(-score, 4)) for score, key in ranked]
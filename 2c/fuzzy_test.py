@@ -0,0 +1,45 @@
+from fuzzy import FuzzyIndex, word_trigrams, words
+
+
+def test_words_and_trigrams():
+    """Names are split into lowercase words and each word is padded before taking trigrams"""
+    assert words("Coffee Maker-Pro 2") == ["coffee", "maker", "pro", "2"]
+    assert word_trigrams("pro") == {"  p", " pr", "pro", "ro "}
+
+
+def test_search_tolerates_typos_and_ranks_by_score():
+    """Misspelled words find the closest names first and unrelated names are left out"""
+    index = FuzzyIndex([(1, "Smartphone X"), (2, "Smart Watch"), (3, "Laptop Pro"),
+                        (4, "Smartphone Mini")])
+    results = index.search("smarphone")
+    # "smart" comparte el principio de la palabra y queda por debajo
+    assert [key for key, _ in results] == [1, 4, 2]
+    assert results[0][1] == results[1][1] > results[2][1] >= 0.3
+    assert index.search("smartphone mini")[0] == (4, 1.0)
+    assert index.search("smarphone", threshold=0.9) == []
+    assert index.search("smarphone", accept=lambda key: key != 1, limit=1) == [results[1]]
+
+
+def test_remove_updates_vocabulary():
+    """Removing the last product with a word drops the word from the vocabulary"""
+    index = FuzzyIndex([(1, "Office Desk"), (2, "Standing Desk")])
+    index.remove(1, "Office Desk")
+    assert len(index) == 2
+    assert index.search("ofice") == []
+    assert [key for key, _ in index.search("desk")] == [2]
+
+
+def test_combinations_match_per_product_scores(monkeypatch):
+    """Multi-word searches give the same ranking walking score groups as scoring every product"""
+    import random
+    import fuzzy
+    rng = random.Random(5)
+    vocabulary = ["smart", "smartphone", "phone", "wireless", "wired", "headphones", "head", "desk"]
+    index = FuzzyIndex((i, " ".join(rng.sample(vocabulary, 3))) for i in range(300))
+    queries = ["smarphone hedphones", "wireles desk", "smart head phone"]
+    grouped = [index.search(query, limit=25) for query in queries]
+    grouped_all = [index.search(query, threshold=0.4) for query in queries]
+    monkeypatch.setattr(fuzzy, "MAX_COMBINATIONS", 0)
+    assert grouped == [index.search(query, limit=25) for query in queries]
+    assert grouped_all == [index.search(query, threshold=0.4) for query in queries]
+    assert all(grouped)
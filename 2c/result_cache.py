@@ -0,0 +1,119 @@
+"""
+Caché LRU de respuestas ya codificadas para consultas repetidas.
+
+Las consultas a /products se repiten mucho (las mismas categorías y rangos de precio),
+así que ResultCache guarda la respuesta de cada consulta ya codificada: sus bytes y sus
+cabeceras propias. La clave la construye quien usa la caché a partir de los argumentos
+ya normalizados (convertidos a su tipo, en un orden fijo), de modo que
+`?max_price=100&category=a` y `?category=a&max_price=100.0` comparten entrada.
+
+Cada entrada se guarda con la versión del catálogo en el momento de la consulta. El
+catálogo incrementa su versión en cada escritura; cuando la caché ve una versión más
+nueva descarta todas las entradas, así que nunca se devuelve un resultado anterior a
+una escritura. Cuando se llena, se descarta la entrada usada hace más tiempo.
+
+Las respuestas en streaming se guardan con store_stream(), que deja pasar los trozos
+y guarda la respuesta al terminar si no supera max_entry_bytes.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class ResultCache:
+    """
+    Caché LRU de tamaño fijo invalidada por la versión del catálogo
+    """
+
+    def __init__(self, maxsize=256, max_entry_bytes=1024 * 1024):
+        self.maxsize = maxsize
+        self.max_entry_bytes = max_entry_bytes
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, version):
+        """
+        Devuelve (cuerpo, cabeceras) guardados para la clave, o None si no están o son
+        de una versión anterior del catálogo
+        """
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, body, headers=None):
+        """
+        Guarda la respuesta calculada con la versión `version` del catálogo
+        """
+        if len(body) > self.max_entry_bytes:
+            return
+        value = (body, dict(headers or {}))
+        with self._lock:
+            self._check_version(version)
+            if version != self._version:
+                # Calculado antes de una escritura posterior: ya no es válido
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def store_stream(self, key, version, chunks, headers=None):
+        """
+        Devuelve los trozos de `chunks` según llegan y, al terminar, guarda la respuesta
+        completa si no ha superado max_entry_bytes
+        """
+        parts = []
+        size = 0
+        for chunk in chunks:
+            yield chunk
+            if parts is not None:
+                size += len(chunk)
+                if size > self.max_entry_bytes:
+                    parts = None
+                else:
+                    parts.append(chunk)
+        if parts is not None:
+            self.put(key, version, b"".join(parts), headers)
+
+    def clear(self):
+        """
+        Descarta todas las entradas
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Devuelve los contadores de la caché
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _check_version(self, version):
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
@@ -0,0 +1,33 @@
+from result_cache import ResultCache
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted when the cache is full"""
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 0, b"A")
+    cache.put("b", 0, b"B")
+    assert cache.get("a", 0) == (b"A", {})
+    cache.put("c", 0, b"C", {"X-Test": "1"})
+    assert cache.get("b", 0) is None
+    assert cache.get("c", 0) == (b"C", {"X-Test": "1"})
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1,
+                             "evictions": 1, "invalidations": 0}
+
+
+def test_version_invalidates():
+    """A newer catalog version drops every entry and older results are not stored"""
+    cache = ResultCache()
+    cache.put("a", 1, b"A")
+    assert cache.get("a", 2) is None
+    assert len(cache) == 0 and cache.invalidations == 1
+    cache.put("a", 1, b"stale")
+    assert cache.get("a", 2) is None
+
+
+def test_store_stream():
+    """Streamed responses pass through and are stored only if small enough"""
+    cache = ResultCache(max_entry_bytes=4)
+    assert list(cache.store_stream("small", 0, iter([b"ab", b"cd"]))) == [b"ab", b"cd"]
+    assert cache.get("small", 0) == (b"abcd", {})
+    assert list(cache.store_stream("big", 0, iter([b"abc", b"def"]))) == [b"abc", b"def"]
+    assert cache.get("big", 0) is None
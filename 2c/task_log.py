@@ -0,0 +1,264 @@
+"""
+Persistencia de las tareas: registro de escritura anticipada (WAL) con group commit y
+snapshots.
+
+Cada cambio de TaskStore se añade como una línea JSON al final de un segmento del
+registro ({"seq": 7, "op": "update", "id": 3, "name": "..."}) y la petición no responde
+hasta que su línea está en disco (fsync). Un fsync cuesta milisegundos, así que cuando
+varias peticiones escriben a la vez no hace uno cada una (group commit): la primera que
+llega escribe y sincroniza todas las líneas pendientes en ese momento, y las que
+llegan mientras tanto esperan y se sincronizan juntas en el siguiente fsync.
+
+El orden del registro es el orden en que TaskStore aplica los cambios: write() sólo
+encola la línea y se llama con el cerrojo del almacén tomado, y wait() espera al fsync
+después de soltarlo.
+
+Cada `snapshot_every` cambios se guarda un snapshot con todas las tareas
+(snapshot-<seq>.json, escrito en un fichero temporal y renombrado) y el registro pasa a
+un segmento nuevo (log-<seq>.jsonl, con el primer seq que puede contener). Después se
+borran los segmentos y snapshots anteriores. Al arrancar se carga el último snapshot y
+sólo se reproducen las líneas posteriores a él; una última línea incompleta (el proceso
+se paró mientras la escribía) se descarta y se borra del segmento antes de seguir
+escribiendo.
+"""
+
+import json
+import os
+import re
+import threading
+
+_SEGMENT = re.compile(r"log-(\d+)\.jsonl$")
+_SNAPSHOT = re.compile(r"snapshot-(\d+)\.json$")
+
+
+class TaskLog:
+    """
+    Registro de cambios de las tareas con group commit y snapshots periódicos
+    """
+
+    def __init__(self, directory, snapshot_every=10000, fsync=True):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._cond = threading.Condition()
+        self._pending = []
+        self._seq = 0
+        self._durable = 0
+        self._flushing = False
+        self._error = None
+        self._file = None
+        self._snapshot_seq = 0
+        self._snapshot_lock = threading.Lock()
+        # Número de fsync y de líneas escritas, para medir el efecto del group commit
+        self.syncs = 0
+        self.entries = 0
+
+    def recover(self):
+        """
+        Lee el último snapshot y las líneas posteriores del registro
+
+        Devuelve (tareas [(id, nombre), ...], siguiente id, cambios) y deja el registro
+        listo para escribir a continuación.
+        """
+        tasks = {}
+        next_id = 1
+        snapshots = self._files(_SNAPSHOT)
+        if snapshots:
+            self._snapshot_seq, path = snapshots[-1]
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            tasks = {task_id: name for task_id, name in snapshot["tasks"]}
+            next_id = snapshot["next_id"]
+        self._seq = self._durable = self._snapshot_seq
+
+        replayed = 0
+        for _, path in self._files(_SEGMENT):
+            with open(path, "rb") as f:
+                lines = f.readlines()
+            complete = 0
+            for i, line in enumerate(lines):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Línea sin terminar")
+                    entry = json.loads(line)
+                except ValueError:
+                    if i == len(lines) - 1:
+                        self._truncate(path, complete)
+                        break
+                    raise
+                complete += len(line)
+                if entry["seq"] <= self._seq:
+                    continue
+                self._seq = self._durable = entry["seq"]
+                replayed += 1
+                if entry["op"] == "create":
+                    tasks[entry["id"]] = entry["name"]
+                    next_id = max(next_id, entry["id"] + 1)
+                elif entry["op"] == "update":
+                    tasks[entry["id"]] = entry["name"]
+                else:
+                    tasks.pop(entry["id"], None)
+
+        # Las escrituras nuevas van a un segmento nuevo, detrás de lo que ya hay en disco
+        self._open_segment(self._seq + 1)
+        return sorted(tasks.items()), next_id, replayed
+
+    def write(self, entries):
+        """
+        Encola cambios ({"op", "id", "name"}) y devuelve el seq del último para wait()
+
+        Se llama con el cerrojo del almacén tomado, así que el orden del registro es el
+        de los cambios. No escribe nada en disco.
+        """
+        with self._cond:
+            for entry in entries:
+                self._seq += 1
+                line = json.dumps({"seq": self._seq, **entry}, ensure_ascii=False)
+                self._pending.append(line + "\n")
+            return self._seq
+
+    def wait(self, seq):
+        """
+        Espera a que el cambio `seq` esté en disco
+
+        Si no hay otro hilo sincronizando, este escribe todas las líneas pendientes con
+        un solo fsync; si lo hay, espera a que termine y vuelve a comprobar.
+        """
+        with self._cond:
+            while self._durable < seq:
+                if self._error is not None:
+                    raise OSError("No se pudo escribir el registro de tareas") from self._error
+                if self._flushing:
+                    self._cond.wait()
+                else:
+                    self._flush()
+
+    def needs_snapshot(self):
+        """
+        Indica si desde el último snapshot se han registrado snapshot_every cambios
+        """
+        return self._seq - self._snapshot_seq >= self.snapshot_every
+
+    def rotate(self):
+        """
+        Sincroniza lo pendiente y pasa a un segmento nuevo; devuelve el seq del último
+        cambio del segmento anterior
+
+        Se llama con el cerrojo del almacén tomado, junto con la copia de las tareas del
+        snapshot, para que el snapshot corresponda exactamente a ese seq.
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flush()
+            self._open_segment(self._seq + 1)
+            self._snapshot_seq = self._seq
+            return self._seq
+
+    def snapshot(self, seq, tasks, next_id):
+        """
+        Guarda el snapshot de las tareas tras el cambio `seq` y borra los segmentos y
+        snapshots anteriores
+
+        Si ya se está guardando otro snapshot no hace nada.
+        """
+        if not self._snapshot_lock.acquire(blocking=False):
+            return
+        try:
+            path = os.path.join(self.directory, f"snapshot-{seq:012d}.json")
+            temporary = path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "next_id": next_id, "tasks": tasks}, f,
+                          ensure_ascii=False, separators=(",", ":"))
+                self._sync(f)
+            os.replace(temporary, path)
+            self._sync_directory()
+
+            for old_seq, old_path in self._files(_SNAPSHOT):
+                if old_seq < seq:
+                    os.remove(old_path)
+            for first_seq, old_path in self._files(_SEGMENT):
+                if first_seq <= seq:
+                    os.remove(old_path)
+        finally:
+            self._snapshot_lock.release()
+
+    def close(self):
+        """
+        Sincroniza lo pendiente y cierra el segmento actual
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush(self):
+        """
+        Escribe y sincroniza las líneas pendientes (se llama con self._cond tomado)
+
+        Suelta el cerrojo durante la escritura para que otros hilos puedan seguir
+        encolando; esas líneas irán en el siguiente fsync.
+        """
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        last = self._seq
+        self._flushing = True
+        self._cond.release()
+        try:
+            self._file.write("".join(lines))
+            self._sync(self._file)
+        except OSError as e:
+            self._error = e
+            raise
+        finally:
+            self._cond.acquire()
+            self._flushing = False
+            self._cond.notify_all()
+        self.syncs += 1
+        self.entries += len(lines)
+        self._durable = last
+
+    def _sync(self, f):
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def _sync_directory(self):
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _truncate(self, path, size):
+        """
+        Quita la última línea incompleta de un segmento, para que la siguiente escritura
+        no quede pegada a ella
+        """
+        with open(path, "r+b") as f:
+            f.truncate(size)
+            self._sync(f)
+
+    def _open_segment(self, first_seq):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"log-{first_seq:012d}.jsonl")
+        self._file = open(path, "a", encoding="utf-8")
+        self._sync_directory()
+
+    def _files(self, pattern):
+        """
+        Devuelve [(seq, ruta), ...] de los ficheros del directorio con ese patrón, por seq
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                files.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(files)
@@ -0,0 +1,89 @@
+import os
+import threading
+from task_log import TaskLog
+from task_store import TaskStore
+
+
+def test_tasks_survive_restart(tmp_path):
+    """Changes are replayed from the log when the store is opened again"""
+    store = TaskStore(TaskLog(str(tmp_path)))
+    store.add("Comprar leche")
+    store.add("Comprar pan")
+    store.update(1, "Comprar café")
+    store.delete(2)
+    store.apply([("create", None, "Tercera"), ("update", 9, "x")])
+    store.close()
+
+    store = TaskStore(TaskLog(str(tmp_path)))
+    assert store.list() == [{"id": 1, "name": "Comprar café"}, {"id": 3, "name": "Tercera"}]
+    assert store.add("Cuarta")["id"] == 4
+
+
+def test_snapshot_compacts_log(tmp_path):
+    """A snapshot replaces older segments and only the tail of the log is replayed"""
+    store = TaskStore(TaskLog(str(tmp_path), snapshot_every=10))
+    for i in range(25):
+        store.add(f"Tarea {i}")
+    store.delete(1)
+    store.close()
+    files = sorted(os.listdir(tmp_path))
+    assert files == ["log-000000000021.jsonl", "snapshot-000000000020.json"]
+
+    log = TaskLog(str(tmp_path))
+    tasks, next_id, replayed = log.recover()
+    log.close()
+    assert replayed == 6
+    assert len(tasks) == 24 and next_id == 26
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    """A partially written last line (a crash mid-write) is dropped on recovery"""
+    store = TaskStore(TaskLog(str(tmp_path)))
+    store.add("Completa")
+    store.close()
+    segment = os.path.join(tmp_path, sorted(os.listdir(tmp_path))[-1])
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "op": "crea')
+    store = TaskStore(TaskLog(str(tmp_path)))
+    assert store.list() == [{"id": 1, "name": "Completa"}]
+
+
+def test_writes_after_torn_line_survive_restart(tmp_path):
+    """A torn first line of the next segment is truncated, so later writes stay readable"""
+    store = TaskStore(TaskLog(str(tmp_path)))
+    store.add("a")
+    store.add("b")
+    store.close()
+    with open(os.path.join(tmp_path, "log-000000000003.jsonl"), "w", encoding="utf-8") as f:
+        f.write('{"seq": 3, "op": "cre')
+
+    store = TaskStore(TaskLog(str(tmp_path)))
+    store.add("c")
+    store.close()
+    store = TaskStore(TaskLog(str(tmp_path)))
+    assert [task["name"] for task in store.list()] == ["a", "b", "c"]
+    store.add("d")
+    store.add("e")
+    store.close()
+
+    store = TaskStore(TaskLog(str(tmp_path)))
+    assert [task["name"] for task in store.list()] == ["a", "b", "c", "d", "e"]
+
+
+def test_group_commit_shares_fsyncs(tmp_path):
+    """Concurrent writers are all durable and share fsyncs"""
+    log = TaskLog(str(tmp_path))
+    store = TaskStore(log)
+
+    def worker():
+        for i in range(50):
+            store.add(f"Tarea {i}")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+    assert log.entries == 400 and log.syncs <= 400
+    assert len(TaskStore(TaskLog(str(tmp_path)))) == 400
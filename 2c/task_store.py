@@ -0,0 +1,230 @@
+"""
+Almacén de tareas indexado por id y seguro entre hilos para la API de tareas.
+
+Con una lista global, borrar o actualizar una tarea recorre la lista entera, y el
+contador global de ids se incrementa sin cerrojo, así que dos peticiones simultáneas
+pueden recibir el mismo id. TaskStore guarda las tareas en un diccionario por id, que
+en Python mantiene el orden de inserción: buscar, actualizar y borrar son O(1) y
+GET /tasks las devuelve en el orden en que se crearon.
+
+Un único cerrojo protege el diccionario y el siguiente id, que se asigna dentro de la
+misma sección crítica que la inserción. Las secciones críticas sólo tocan el
+diccionario: las tareas se devuelven como diccionarios nuevos y la serialización a
+JSON se hace fuera del cerrojo, así que los hilos de las peticiones apenas esperan.
+
+apply() aplica un lote de operaciones (create, update, delete) tomando el cerrojo una
+sola vez. En modo atómico, si alguna operación falla se deshacen las anteriores del
+lote y el almacén queda como estaba.
+
+Cada cambio incrementa `version`; snapshot() devuelve la versión junto con las tareas,
+así que quien guarde la lista codificada sabe a qué versión corresponde.
+
+Con un TaskLog (task_log.py) los cambios se guardan en disco: cada cambio se encola en
+el registro con el cerrojo tomado, para que el orden del registro sea el de los
+cambios, y la operación espera al fsync (group commit) después de soltarlo.
+"""
+
+import threading
+
+
+class Task:
+    """
+    Tarea con __slots__: sin un diccionario por instancia ocupa bastante menos que
+    {"id": ..., "name": ...}, y sólo se convierte en diccionario al serializarla
+    """
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name}
+
+
+class TaskStore:
+    """
+    Tareas indexadas por id en orden de inserción, con ids asignados de forma atómica
+    """
+
+    def __init__(self, log=None):
+        self._tasks = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._log = log
+        self.version = 0
+        if log is not None:
+            tasks, self._next_id, _ = log.recover()
+            self._tasks = {task_id: Task(task_id, name) for task_id, name in tasks}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def list(self):
+        """
+        Devuelve todas las tareas en orden de inserción
+        """
+        with self._lock:
+            return [task.to_dict() for task in self._tasks.values()]
+
+    def snapshot(self):
+        """
+        Devuelve (versión, tareas en orden de inserción) leídas a la vez
+        """
+        with self._lock:
+            return self.version, [task.to_dict() for task in self._tasks.values()]
+
+    def get(self, task_id):
+        """
+        Devuelve la tarea con ese id, o None si no existe
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return None if task is None else task.to_dict()
+
+    def add(self, name):
+        """
+        Crea una tarea con el siguiente id libre y la devuelve
+        """
+        with self._lock:
+            task = Task(self._next_id, name)
+            self._tasks[task.id] = task
+            self._next_id += 1
+            self.version += 1
+            seq = self._record([{"op": "create", "id": task.id, "name": name}])
+            result = task.to_dict()
+        self._commit(seq)
+        return result
+
+    def update(self, task_id, name):
+        """
+        Cambia el nombre de una tarea; devuelve la tarea actualizada o None si no existe
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            task.name = name
+            self.version += 1
+            seq = self._record([{"op": "update", "id": task_id, "name": name}])
+            result = task.to_dict()
+        self._commit(seq)
+        return result
+
+    def delete(self, task_id):
+        """
+        Borra una tarea; devuelve la tarea borrada o None si no existía
+        """
+        with self._lock:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return None
+            self.version += 1
+            seq = self._record([{"op": "delete", "id": task_id}])
+        self._commit(seq)
+        return task.to_dict()
+
+    def apply(self, operations, atomic=False):
+        """
+        Aplica un lote de operaciones (op, id, nombre) con una sola toma del cerrojo
+
+        op es "create" (sin id), "update" o "delete" (sin nombre). Devuelve (resultados,
+        aplicado): por cada operación la tarea creada, actualizada o borrada, o None si
+        no existe. Con atomic=True, si alguna no existe se deshace todo el lote y aplicado
+        es False.
+        """
+        operations = list(operations)
+        for op, _, _ in operations:
+            if op not in ("create", "update", "delete"):
+                raise ValueError(f"Operación no válida: {op!r}")
+        results = []
+        undo = []
+        with self._lock:
+            next_id = self._next_id
+            for op, task_id, name in operations:
+                task = self._tasks.get(task_id)
+                if op == "create":
+                    task = Task(self._next_id, name)
+                    self._tasks[task.id] = task
+                    self._next_id += 1
+                    undo.append((task.id, None))
+                elif task is None:
+                    results.append(None)
+                    continue
+                elif op == "update":
+                    undo.append((task_id, task.name))
+                    task.name = name
+                else:
+                    undo.append((task_id, task))
+                    del self._tasks[task_id]
+                results.append(task.to_dict())
+
+            if atomic and None in results:
+                self._rollback(undo, next_id)
+                return results, False
+            if undo:
+                self.version += 1
+            seq = self._record([
+                {"op": op, "id": result["id"], **({} if op == "delete" else {"name": result["name"]})}
+                for (op, _, _), result in zip(operations, results) if result is not None
+            ])
+        self._commit(seq)
+        return results, True
+
+    def _record(self, entries):
+        """
+        Encola los cambios en el registro, si lo hay (se llama con el cerrojo tomado)
+        """
+        if self._log is None or not entries:
+            return None
+        return self._log.write(entries)
+
+    def _commit(self, seq):
+        """
+        Espera a que los cambios hasta `seq` estén en disco y, si toca, guarda un snapshot
+        """
+        if seq is None:
+            return
+        self._log.wait(seq)
+        if self._log.needs_snapshot():
+            with self._lock:
+                if not self._log.needs_snapshot():
+                    return
+                seq = self._log.rotate()
+                tasks = [[task.id, task.name] for task in self._tasks.values()]
+                next_id = self._next_id
+            # El snapshot se escribe sin el cerrojo: corresponde exactamente al cambio seq
+            self._log.snapshot(seq, tasks, next_id)
+
+    def close(self):
+        """
+        Cierra el registro, si lo hay, después de sincronizar los cambios pendientes
+        """
+        if self._log is not None:
+            self._log.close()
+
+    def _rollback(self, undo, next_id):
+        """
+        Deshace los cambios de un lote en orden inverso (se llama con el cerrojo tomado)
+
+        Las tareas borradas se vuelven a poner en su sitio: los ids crecen en orden de
+        inserción, así que basta con reordenar por id.
+        """
+        restored = {}
+        for task_id, previous in reversed(undo):
+            if isinstance(previous, Task):
+                restored[task_id] = previous
+            elif previous is None:
+                if restored.pop(task_id, None) is None:
+                    del self._tasks[task_id]
+            else:
+                task = self._tasks.get(task_id)
+                (restored[task_id] if task is None else task).name = previous
+        if restored:
+            tasks = sorted([*self._tasks.values(), *restored.values()], key=lambda task: task.id)
+            self._tasks = {task.id: task for task in tasks}
+        self._next_id = next_id
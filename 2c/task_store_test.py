@@ -0,0 +1,64 @@
+import threading
+from task_store import TaskStore
+
+
+def test_crud_keeps_insertion_order():
+    """Tasks are listed in insertion order and get, update and delete work by id"""
+    store = TaskStore()
+    first = store.add("Comprar leche")
+    second = store.add("Comprar pan")
+    assert [first["id"], second["id"]] == [1, 2]
+    assert store.update(1, "Comprar café") == {"id": 1, "name": "Comprar café"}
+    assert store.list() == [{"id": 1, "name": "Comprar café"}, {"id": 2, "name": "Comprar pan"}]
+    assert store.delete(1) == {"id": 1, "name": "Comprar café"}
+    assert store.get(1) is None and store.delete(1) is None and store.update(1, "x") is None
+    assert store.add("Otra")["id"] == 3
+
+
+def test_concurrent_adds_get_unique_ids():
+    """Ids stay unique when many threads add tasks at once"""
+    store = TaskStore()
+
+    def worker():
+        for i in range(500):
+            store.add(f"Tarea {i}")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [task["id"] for task in store.list()]
+    assert len(store) == 4000
+    assert sorted(ids) == list(range(1, 4001))
+
+
+def test_atomic_batch_rolls_back():
+    """A failing atomic batch leaves tasks, order and the next id as they were"""
+    store = TaskStore()
+    for name in ["a", "b", "c"]:
+        store.add(name)
+    before = store.list()
+    results, applied = store.apply([
+        ("update", 2, "B"), ("delete", 2, None), ("create", None, "d"), ("delete", 4, None),
+        ("delete", 1, None), ("update", 9, "x"),
+    ], atomic=True)
+    assert not applied and results[-1] is None
+    assert store.list() == before
+    assert store.add("e")["id"] == 4
+
+    results, applied = store.apply([("delete", 1, None), ("update", 9, "x")])
+    assert applied and results == [{"id": 1, "name": "a"}, None]
+    assert [task["id"] for task in store.list()] == [2, 3, 4]
+
+
+def test_version_counts_changes():
+    """Every change bumps the version; failed lookups and rolled-back batches do not"""
+    store = TaskStore()
+    store.add("a")
+    store.update(1, "b")
+    store.delete(7)
+    store.apply([("create", None, "c"), ("delete", 9, None)], atomic=True)
+    assert store.snapshot() == (2, [{"id": 1, "name": "b"}])
+    store.apply([("create", None, "c"), ("delete", 1, None)])
+    assert store.version == 3
@@ -33,26 +33,56 @@ Tu tarea es implementar esta API en Flask con el manejo adecuado de errores.
 
 from flask import Flask, jsonify, request, abort
 import logging
+import secrets
+import sys
 
 # Configuración del registro (logging)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class Animal:
+    """
+    Animal con __slots__ en lugar de un diccionario por animal
+
+    La especie se interna con sys.intern: los animales de la misma especie comparten una
+    sola cadena. Sólo se convierte en diccionario al serializarlo.
+    """
+
+    __slots__ = ("id", "name", "species")
+
+    def __init__(self, id, name, species):
+        self.id = id
+        self.name = name
+        self.species = sys.intern(species)
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "species": self.species}
+
+
 # Lista de animales predefinida
 animals = [
-    {"id": 1, "name": "León", "species": "Panthera leo"},
-    {"id": 2, "name": "Elefante", "species": "Loxodonta africana"},
-    {"id": 3, "name": "Jirafa", "species": "Giraffa camelopardalis"}
+    Animal(1, "León", "Panthera leo"),
+    Animal(2, "Elefante", "Loxodonta africana"),
+    Animal(3, "Jirafa", "Giraffa camelopardalis")
 ]
 
 # Este contador se usará para asignar IDs únicos
 next_id = 4
 
+# Versión de la lista de animales: aumenta con cada alta o baja y se usa como ETag
+animals_version = 0
+
 def create_app():
     """
     Crea y configura la aplicación Flask con manejadores de errores personalizados
     """
     app = Flask(__name__)
+
+    # Lista de animales ya codificada y su versión; el prefijo del ETag distingue esta
+    # aplicación de otras (o de un reinicio) que empiecen también en la versión 0
+    etag_prefix = secrets.token_hex(4)
+    encoded = (None, None)
     
     # Manejador de errores 400 - Bad Request
     @app.errorhandler(400)
@@ -111,9 +141,26 @@ def create_app():
     def get_animals():
         """
         Devuelve la lista completa de animales
+        La respuesta lleva un ETag con la versión de la lista; si la petición trae ese
+        ETag en If-None-Match (con comparación débil, también como W/"...") se
+        responde 304 sin cuerpo
         """
         # Implementa este endpoint para devolver la lista de animales
-        return jsonify(animals),200
+        nonlocal encoded
+        version = animals_version
+        etag = f"{etag_prefix}-{version}"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        cached_version, body = encoded
+        if cached_version != version:
+            body = (app.json.dumps([animal.to_dict() for animal in animals]) + "\n").encode("utf-8")
+            encoded = (version, body)
+        response = app.response_class(body, status=200, mimetype=app.json.mimetype)
+        response.set_etag(etag)
+        return response
 
     @app.route('/animals/<int:animal_id>', methods=['GET'])
     def get_animal(animal_id):
@@ -123,10 +170,10 @@ def create_app():
         """
         # Implementa este endpoint para devolver un animal por su ID
         # si no existe, usa abort(404) para lanzar un error 404
-        animal = next ((a for a in animals if a["id"] == animal_id),None)
+        animal = next ((a for a in animals if a.id == animal_id),None)
         if animal is None:
             abort(404)
-        return jsonify(animal),200
+        return jsonify(animal.to_dict()),200
 
     @app.route('/animals', methods=['POST'])
     def add_animal():
@@ -140,7 +187,7 @@ def create_app():
         # 2. Verifica que los campos "name" y "species" estén presentes
         # 3. Si falta algún campo, usa abort(400) para lanzar un error
         # 4. Si todo está correcto, agrega el nuevo animal a la lista y devuelve una respuesta adecuada (código 201)
-        global next_id
+        global next_id, animals_version
         # check jason
         data = request.get_json(silent = True)
         if not isinstance(data,dict):
@@ -149,14 +196,15 @@ def create_app():
         # check field
         name = data.get("name")
         species = data.get("species")
-        if not name or not species:
+        if not name or not species or not isinstance(species, str):
             abort(400)
         
-        new_animal = {"id":next_id, "name":name, "species":species}
+        new_animal = Animal(next_id, name, species)
         animals.append(new_animal)
         next_id += 1
+        animals_version += 1
 
-        return jsonify(new_animal),201
+        return jsonify(new_animal.to_dict()),201
     
 
 
@@ -170,11 +218,13 @@ def create_app():
         # 1. Verifica si el animal existe
         # 2. Si no existe, usa abort(404) para lanzar un error 404
         # 3. Si existe, elimínalo de la lista y devuelve una respuesta adecuada
-        idx = next ((i for i, a in enumerate(animals) if a["id"] == animal_id), None)
+        global animals_version
+        idx = next ((i for i, a in enumerate(animals) if a.id == animal_id), None)
         if idx is None:
             abort(404)
 
         deleted = animals.pop(idx)
+        animals_version += 1
         return "", 204
 
     # Endpoint adicional que lanza un error 500 para probar el manejador
@@ -121,3 +121,22 @@ def test_method_not_allowed(client):
 #     assert "ERROR:" in logs, "Debe registrarse un mensaje de nivel ERROR para errores 500"
 #     assert "test-error" in logs, "El log debe incluir información de la ruta que causó el error"
 
+
+def test_get_animals_etag(client):
+    """Test GET /animals with If-None-Match - should return 304 until the list changes"""
+    response = client.get("/animals")
+    etag = response.headers["ETag"]
+    response = client.get("/animals", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    # If-None-Match usa la comparación débil: un W/ delante del ETag también vale
+    response = client.get("/animals", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    response = client.get("/animals", headers={"If-None-Match": f'"otro", W/{etag}'})
+    assert response.status_code == 304
+
+    client.post("/animals", json={"name": "Lobo", "species": "Canis lupus"})
+    response = client.get("/animals", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json[-1]["name"] == "Lobo"
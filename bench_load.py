@@ -0,0 +1,315 @@
+"""
+Benchmark de carga HTTP de las aplicaciones de los ejercicios (2a a 2f).
+
+Cada aplicación se arranca en un puerto libre de la interfaz local: los servidores de 2a
+con su create_server y las aplicaciones Flask con su create_app servidas por el servidor
+con hilos de werkzeug. Un generador de carga con varios clientes concurrentes hace
+peticiones durante un tiempo fijo, con conexiones persistentes o con una conexión por
+petición, siguiendo una mezcla de peticiones con pesos.
+
+Para cada aplicación y modo de conexión se informa de las peticiones por segundo, los
+errores y las latencias p50, p95 y p99. Los resultados se pueden guardar en JSON y
+compararse con una ejecución anterior para detectar regresiones.
+
+Uso:
+    python bench_load.py                            # todas las aplicaciones
+    python bench_load.py ej2a2 ej2c3 -c 16 -d 10    # algunas, 16 clientes, 10 s
+    python bench_load.py ej2a1 --workers 8 --backend async
+    python bench_load.py ej2a2 --mix "GET /product/1=9,GET /product/999=1"
+    python bench_load.py -o actual.json --compare base.json
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Aplicación -> (carpeta, mezcla por defecto)
+# Cada elemento de la mezcla es (método, ruta, peso) o (método, ruta, peso, cuerpo JSON)
+TARGETS = {
+    "ej2a1": ("2a", [("GET", "/", 9), ("GET", "/invalid", 1)]),
+    "ej2a2": ("2a", [("GET", "/product/1", 8), ("GET", "/product/999", 1), ("GET", "/invalid", 1)]),
+    "ej2a3": ("2a", [("GET", "/product/1", 8), ("GET", "/product/999", 1), ("GET", "/invalid", 1)]),
+    "product_server": ("2a", [("GET", "/product/1", 4), ("GET", "/product/2.xml", 4),
+                              ("GET", "/product/999", 1), ("GET", "/invalid", 1)]),
+    "ej2b1": ("2b", [("GET", "/", 1)]),
+    "ej2b2": ("2b", [("GET", "/hello", 4), ("GET", "/goodbye", 3), ("GET", "/greet/Ana", 3)]),
+    "ej2b3": ("2b", [("GET", "/search?q=flask&category=tutorial", 8),
+                     ("POST", "/json", 2, {"name": "Ana"})]),
+    "ej2b4": ("2b", [("GET", "/greet/Ana", 1)]),
+    "ej2c1": ("2c", [("GET", "/product/1", 9), ("GET", "/product/999", 1)]),
+    "ej2c2": ("2c", [("GET", "/tasks", 1)]),
+    "ej2c3": ("2c", [("GET", "/products", 2), ("GET", "/products?category=electronics", 3),
+                     ("GET", "/products?min_price=100&max_price=500", 3),
+                     ("GET", "/products?name=phone", 2)]),
+    "ej2d1": ("2d", [("GET", "/status", 1)]),
+    "ej2d2": ("2d", [("GET", "/resource/5", 8), ("GET", "/resource/500", 1),
+                     ("GET", "/admin?key=secret123", 1)]),
+    "ej2d3": ("2d", [("GET", "/animals", 5), ("GET", "/animals/1", 4), ("GET", "/animals/999", 1)]),
+    "ej2e1": ("2e", [("GET", "/headers", 5), ("GET", "/browser", 5)]),
+    "ej2e2": ("2e", [("GET", "/text", 3), ("GET", "/json", 3), ("GET", "/xml", 2), ("GET", "/html", 2)]),
+    "ej2e3": ("2e", [("POST", "/json", 1, {"name": "Ana", "age": 30})]),
+    "ej2f1": ("2f", [("GET", "/", 4), ("GET", "/about", 3), ("GET", "/user/list", 3)]),
+}
+
+
+def load_module(name, folder):
+    """
+    Importa el módulo de un ejercicio a partir de su fichero
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(ROOT, folder)
+    # Los módulos auxiliares de cada carpeta se importan por su nombre
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(path, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def start_target(name, workers=8, backend="thread", quiet=True):
+    """
+    Arranca la aplicación en un puerto libre y devuelve (puerto, función para pararla)
+    """
+    module = load_module(name, TARGETS[name][0])
+    if hasattr(module, "create_server"):
+        server = module.create_server(host="127.0.0.1", port=0, workers=workers, backend=backend)
+        handler = getattr(server, "RequestHandlerClass", None)
+        if quiet and handler is not None:
+            # http.server escribe una línea en stderr por petición
+            server.RequestHandlerClass = type(handler.__name__, (handler,),
+                                              {"log_message": lambda self, *args: None})
+    else:
+        from werkzeug.serving import make_server
+        server = make_server("127.0.0.1", 0, module.create_app(), threaded=True)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+        thread.join(5)
+
+    return server.server_port, stop
+
+
+def parse_mix(text):
+    """
+    Convierte "GET /a=3,POST /b=1" en una mezcla [(método, ruta, peso), ...]
+    """
+    mix = []
+    for item in text.split(","):
+        request, _, weight = item.strip().rpartition("=")
+        method, path = request.split(None, 1)
+        mix.append((method.upper(), path, int(weight)))
+    return mix
+
+
+def percentile(sorted_values, p):
+    """
+    Percentil p (0-100) por el método del rango más cercano
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Client(threading.Thread):
+    """
+    Cliente que repite peticiones de la mezcla hasta el instante `deadline`
+    """
+
+    def __init__(self, port, mix, deadline, keep_alive, seed):
+        super().__init__(daemon=True)
+        self.port = port
+        self.deadline = deadline
+        self.keep_alive = keep_alive
+        self.random = random.Random(seed)
+        self.requests = [self.prepare(item) for item in mix]
+        self.weights = [item[2] for item in mix]
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def prepare(self, item):
+        method, path, _, *payload = item
+        headers = {"Host": "127.0.0.1"}
+        body = None
+        if payload:
+            body = json.dumps(payload[0]).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        return method, path, body, headers
+
+    def run(self):
+        conn = None
+        while time.perf_counter() < self.deadline:
+            method, path, body, headers = self.random.choices(self.requests, self.weights)[0]
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - start
+                if not self.keep_alive or response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                if conn is not None:
+                    conn.close()
+                conn = None
+                continue
+            self.latencies.append(elapsed)
+            self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+        if conn is not None:
+            conn.close()
+
+
+def run_load(port, mix, clients=8, duration=5.0, keep_alive=True, warmup=0.5, seed=0):
+    """
+    Lanza la carga contra el puerto y devuelve las métricas de la ejecución
+    """
+    if warmup:
+        run_load(port, mix, clients, warmup, keep_alive, warmup=0, seed=seed)
+
+    deadline = time.perf_counter() + duration
+    workers = [Client(port, mix, deadline, keep_alive, seed + i) for i in range(clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for worker in workers for latency in worker.latencies)
+    statuses = {}
+    for worker in workers:
+        for status, count in worker.statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    return {
+        "requests": len(latencies),
+        "errors": sum(worker.errors for worker in workers),
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Devuelve las regresiones respecto a una ejecución anterior
+
+    Es una regresión que las peticiones por segundo bajen o que la p99 suba más que
+    `tolerance` (por ejemplo 0.1 = 10%).
+    """
+    previous = {(r["app"], r["keep_alive"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["app"], result["keep_alive"]))
+        if before is None:
+            continue
+        if result["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{result['app']} keep_alive={result['keep_alive']}: "
+                               f"rps {before['rps']} -> {result['rps']}")
+        if result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{result['app']} keep_alive={result['keep_alive']}: "
+                               f"p99 {before['p99_ms']} ms -> {result['p99_ms']} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga de los ejercicios")
+    parser.add_argument("apps", nargs="*", help="aplicaciones a probar (por defecto, todas)")
+    parser.add_argument("-c", "--clients", type=int, default=8, help="clientes concurrentes")
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="segundos por prueba")
+    parser.add_argument("--keep-alive", choices=["on", "off", "both"], default="both",
+                        help="conexiones persistentes o una conexión por petición")
+    parser.add_argument("--mix", help='mezcla de peticiones, p. ej. "GET /product/1=9,GET /x=1"')
+    parser.add_argument("--workers", type=int, default=8, help="hilos de los servidores de 2a")
+    parser.add_argument("--backend", choices=["thread", "async"], default="thread",
+                        help="tipo de servidor de 2a")
+    parser.add_argument("--log", action="store_true", help="mantiene los logs de las aplicaciones")
+    parser.add_argument("-o", "--output", help="fichero JSON con los resultados")
+    parser.add_argument("--compare", help="fichero JSON de una ejecución anterior")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="variación admitida al comparar (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    apps = args.apps or list(TARGETS)
+    unknown = [app for app in apps if app not in TARGETS]
+    if unknown:
+        parser.error(f"aplicaciones desconocidas: {', '.join(unknown)}")
+    modes = {"on": [True], "off": [False], "both": [True, False]}[args.keep_alive]
+    custom_mix = parse_mix(args.mix) if args.mix else None
+
+    if not args.log:
+        # Escribir un log por petición mediría la consola, no la aplicación
+        logging.disable(logging.CRITICAL)
+
+    results = []
+    print(f"{'Aplicación':<16}{'keep-alive':>11}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'errores':>9}")
+    for app in apps:
+        port, stop = start_target(app, workers=args.workers, backend=args.backend,
+                                  quiet=not args.log)
+        try:
+            for keep_alive in modes:
+                mix = custom_mix or TARGETS[app][1]
+                result = run_load(port, mix, args.clients, args.duration, keep_alive)
+                result = {"app": app, "keep_alive": keep_alive, **result}
+                results.append(result)
+                print(f"{app:<16}{'sí' if keep_alive else 'no':>11}{result['rps']:>10.1f}"
+                      f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                      f"{result['p99_ms']:>10.2f}{result['errors']:>9}")
+        finally:
+            stop()
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "clients": args.clients,
+            "duration": args.duration,
+            "workers": args.workers,
+            "backend": args.backend,
+            "mix": args.mix,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print("Regresión:", regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark de memoria de los registros de los ejercicios: diccionarios frente a
+representaciones compactas.
+
+Para cada tipo de registro se crean N registros con cadenas nuevas (como al leerlos de
+un JSON) y se mide con tracemalloc la memoria que ocupan, en bytes por registro:
+
+- productos (2c): lista de diccionarios, ProductCatalog (diccionarios con la categoría
+  internada más sus índices) y ColumnarCatalog (columnas de NumPy con las categorías
+  codificadas)
+- tareas (2c/task_store): diccionarios frente a Task con __slots__
+- animales (2d/ej2d3): diccionarios frente a Animal con __slots__ y la especie internada
+
+Uso:
+    python bench_memory.py                 # 100.000 registros
+    python bench_memory.py -n 1000000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from bench_load import load_module
+
+CATEGORIES = ["electronics", "furniture", "appliances", "books", "toys"]
+SPECIES = ["Panthera leo", "Loxodonta africana", "Giraffa camelopardalis", "Canis lupus"]
+
+
+def fresh(text):
+    """
+    Devuelve una copia nueva de la cadena, como las que crea json.loads
+    """
+    return (text + " ")[:-1]
+
+
+def measure(build, n):
+    """
+    Devuelve los bytes por registro que ocupa lo que devuelve build()
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / n
+
+
+def product_dicts(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {"id": i, "name": f"Product {i}", "price": round(rng.uniform(0, 1000), 2),
+         "category": fresh(rng.choice(CATEGORIES))}
+        for i in range(n)
+    ]
+
+
+def main(n):
+    catalog = load_module("catalog", "2c")
+    columnar = load_module("columnar", "2c")
+    tasks = load_module("task_store", "2c")
+    animals = load_module("ej2d3", "2d")
+
+    rows = [
+        ("productos", "diccionarios", lambda: product_dicts(n)),
+        ("productos", "ProductCatalog", lambda: catalog.ProductCatalog(product_dicts(n))),
+        ("productos", "ColumnarCatalog", lambda: columnar.ColumnarCatalog(product_dicts(n))),
+        ("tareas", "diccionarios", lambda: [{"id": i, "name": f"Tarea {i}"} for i in range(n)]),
+        ("tareas", "Task", lambda: [tasks.Task(i, f"Tarea {i}") for i in range(n)]),
+        ("animales", "diccionarios", lambda: [
+            {"id": i, "name": f"Animal {i}", "species": fresh(SPECIES[i % len(SPECIES)])}
+            for i in range(n)
+        ]),
+        ("animales", "Animal", lambda: [
+            animals.Animal(i, f"Animal {i}", fresh(SPECIES[i % len(SPECIES)])) for i in range(n)
+        ]),
+    ]
+    print(f"{'registro':<12}{'representación':<18}{'bytes/registro':>16}")
+    for record, representation, build in rows:
+        print(f"{record:<12}{representation:<18}{measure(build, n):>16.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de los registros")
+    parser.add_argument("-n", type=int, default=100000, help="número de registros")
+    args = parser.parse_args()
+    main(args.n)